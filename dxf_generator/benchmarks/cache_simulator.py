@@ -0,0 +1,385 @@
+"""
+Cache policy simulator.
+
+Replays cache accesses from a captured trace (see merge_captures) or from
+the structured log (logs/app.json.log, DEBUG cache hit/miss lines) against
+FIFO (what CacheManager does today), LRU, LFU and TinyLFU at many
+capacities. Prints miss-ratio curves and the entries/bytes each policy needs
+for a target hit rate. Run with:
+
+    python -m dxf_generator.benchmarks.cache_simulator --log logs/app.json.log
+    python -m dxf_generator.benchmarks.cache_simulator --trace trace.jsonl --target-hit-rate 0.9 --json
+
+Objects are sized per cache (--object-bytes generation=15600); batch
+entries scale with their item count. Byte figures are therefore estimates
+from typical DXF/ZIP/parse-result sizes, not measurements.
+"""
+import argparse
+import json
+import re
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from dxf_generator.monitoring.hyperloglog import hash_item
+
+# Typical cached value sizes (bytes): a generated DXF, a parse result dict,
+# and one DXF inside a stored batch ZIP
+DEFAULT_OBJECT_BYTES = {"generation": 15_600, "parse": 900, "parse_semantic": 900, "batch": 15_700}
+
+POLICIES = ("fifo", "lru", "lfu", "tinylfu")
+
+_LOG_ACCESS = re.compile(r"^\[(\w+)\] Cache (hit|miss): (.+)$")
+
+# (cache name, key, item count)
+Access = Tuple[str, str, int]
+
+
+def accesses_from_log(path: str) -> List[Access]:
+    """
+    Cache lookups recorded in the structured JSON log.
+
+    CacheManager logs every get() at DEBUG as a cache.hit or cache.miss event
+    (older logs: "[name] Cache hit|miss: key"), so the log holds the full
+    lookup sequence of each cache.
+
+    Raises:
+        ValueError: If the lookups were sampled (LOG_SAMPLE_RATES)
+    """
+    accesses = []
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("event") in ("cache.hit", "cache.miss"):
+                fields = entry.get("fields", {})
+                if "sample_rate" in fields:
+                    raise ValueError(f"{entry['event']} events were sampled; log them with rate 1 to simulate")
+                accesses.append((fields["cache"], str(fields["key"]), 1))
+                continue
+            match = _LOG_ACCESS.match(entry.get("message", ""))
+            if match:
+                accesses.append((match.group(1), match.group(3), 1))
+    return accesses
+
+
+def accesses_from_trace(records: Iterable[Dict]) -> List[Access]:
+    """
+    Cache lookups implied by captured requests.
+
+    Single generation requests look up the generation cache. Batch requests
+    look up the batch cache and, as on a batch miss, the generation cache
+    for every item. Uploads look up the parse cache by filename and size.
+    """
+    accesses = []
+    for record in records:
+        path, spec = record.get("path", ""), record.get("json")
+        kind = path.rstrip("/").split("/")[-1]
+        if path.endswith("/batch") and isinstance(spec, dict):
+            component = path.rstrip("/").split("/")[-2]
+            items = spec.get("items", [])
+            item_keys = sorted(f"{component}:{json.dumps(i, sort_keys=True)}" for i in items)
+            accesses.append(("batch", "|".join(item_keys), len(items)))
+            accesses.extend(("generation", key, 1) for key in item_keys)
+        elif kind in ("ibeam", "column") and isinstance(spec, dict):
+            accesses.append(("generation", f"{kind}:{json.dumps(spec, sort_keys=True)}", 1))
+        elif kind == "parse" and record.get("upload"):
+            upload = record["upload"]
+            accesses.append(("parse", f"{upload.get('filename')}:{upload.get('bytes')}", 1))
+    return accesses
+
+
+class FIFOCache:
+    """Evicts in insertion order; hits do not reorder (CacheManager today)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def access(self, key: str) -> bool:
+        if key in self._keys:
+            return True
+        self._keys[key] = None
+        if len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+        return False
+
+
+class LRUCache(FIFOCache):
+    """Evicts the least recently used entry."""
+
+    def access(self, key: str) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return super().access(key)
+
+
+class LFUCache:
+    """Evicts the least frequently used resident entry (oldest among ties), O(1) per access."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = defaultdict(OrderedDict)
+        self._min_freq = 0
+
+    def access(self, key: str) -> bool:
+        freq = self._freq.get(key)
+        if freq is not None:
+            bucket = self._buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[freq]
+                if self._min_freq == freq:
+                    self._min_freq = freq + 1
+            self._freq[key] = freq + 1
+            self._buckets[freq + 1][key] = None
+            return True
+        if len(self._freq) >= self.capacity:
+            bucket = self._buckets[self._min_freq]
+            victim, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_freq]
+            del self._freq[victim]
+        self._freq[key] = 1
+        self._buckets[1][key] = None
+        self._min_freq = 1
+        return False
+
+
+class CountMinSketch:
+    """4-row count-min sketch; counters saturate at 15 and are halved periodically (aging)."""
+
+    ROWS = 4
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(64, capacity * 8):
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [[0] * width for _ in range(self.ROWS)]
+        self._sample_size = max(10 * capacity, 100)
+        self._additions = 0
+
+    def _slots(self, key: str):
+        # Stable across processes (unlike hash()), so a trace always gives the same curve
+        h = hash_item(key)
+        for row in range(self.ROWS):
+            yield row, (h ^ (h >> (16 + row * 7)) ^ (row * 0x9E3779B1)) & self._mask
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[row][slot] for row, slot in self._slots(key))
+
+    def increment(self, key: str) -> None:
+        for row, slot in self._slots(key):
+            if self._rows[row][slot] < self.MAX_COUNT:
+                self._rows[row][slot] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for counters in self._rows:
+                for i, value in enumerate(counters):
+                    counters[i] = value >> 1
+            self._additions //= 2
+
+
+class TinyLFUCache:
+    """
+    Window TinyLFU: new keys enter a small LRU window (1% of capacity), and a
+    key leaving the window joins the LRU main area only if its sketched
+    frequency beats the main area's victim. One-off keys thus cannot flush
+    popular ones, while the window still catches short bursts of reuse.
+    """
+
+    WINDOW_SHARE = 0.01
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.window_capacity = max(1, int(capacity * self.WINDOW_SHARE))
+        self.main_capacity = capacity - self.window_capacity
+        self._window: "OrderedDict[str, None]" = OrderedDict()
+        self._main: "OrderedDict[str, None]" = OrderedDict()
+        self._sketch = CountMinSketch(capacity)
+
+    def access(self, key: str) -> bool:
+        self._sketch.increment(key)
+        for area in (self._window, self._main):
+            if key in area:
+                area.move_to_end(key)
+                return True
+        self._window[key] = None
+        if len(self._window) > self.window_capacity:
+            candidate, _ = self._window.popitem(last=False)
+            if len(self._main) < self.main_capacity:
+                self._main[candidate] = None
+            elif self._main:
+                victim = next(iter(self._main))
+                if self._sketch.estimate(candidate) > self._sketch.estimate(victim):
+                    del self._main[victim]
+                    self._main[candidate] = None
+        return False
+
+
+_POLICY_CLASSES = {"fifo": FIFOCache, "lru": LRUCache, "lfu": LFUCache, "tinylfu": TinyLFUCache}
+
+
+def simulate(keys: List[str], policy: str, capacity: int) -> float:
+    """Miss ratio of `policy` at `capacity` entries over the key sequence."""
+    cache = _POLICY_CLASSES[policy](capacity)
+    misses = sum(1 for key in keys if not cache.access(key))
+    return misses / len(keys) if keys else 0.0
+
+
+def capacity_grid(distinct: int, points: int = 16, extra: Iterable[int] = ()) -> List[int]:
+    """Roughly geometric capacities from 1 to the number of distinct keys."""
+    capacities = {max(1, distinct)}
+    for i in range(points):
+        capacities.add(max(1, round(distinct ** (i / max(1, points - 1)))))
+    capacities.update(c for c in extra if c > 0)
+    return sorted(capacities)
+
+
+def analyze(
+    accesses: List[Access],
+    object_bytes: Dict[str, int],
+    current: Dict[str, int],
+    target_hit_rate: float = 0.9,
+    policies: Iterable[str] = POLICIES,
+    points: int = 16
+) -> Dict:
+    """
+    Miss-ratio curves and target sizing per cache.
+
+    Args:
+        accesses: (cache, key, items) lookups in order
+        object_bytes: Estimated bytes per cached object (per item for batch)
+        current: Configured capacity of each cache, added to the grid
+        target_hit_rate: Hit rate to size for
+        policies: Policies to simulate
+        points: Capacities per curve
+
+    Returns:
+        Dict keyed by cache name
+    """
+    by_cache: Dict[str, List[Access]] = defaultdict(list)
+    for access in accesses:
+        by_cache[access[0]].append(access)
+
+    report = {}
+    for name, cache_accesses in sorted(by_cache.items()):
+        keys = [key for _, key, _ in cache_accesses]
+        items = {key: count for _, key, count in cache_accesses}
+        distinct = len(items)
+        mean_bytes = object_bytes.get(name, 1000) * sum(items.values()) / distinct
+        grid = capacity_grid(distinct, points, [current.get(name, 0)])
+
+        curves, sizing = {}, {}
+        for policy in policies:
+            curve = [{"capacity": c, "miss_ratio": round(simulate(keys, policy, c), 4)} for c in grid]
+            curves[policy] = curve
+            # Smallest grid capacity reaching the target (FIFO and TinyLFU are not
+            # guaranteed monotonic, so this is read off the curve, not bisected)
+            needed = next((p["capacity"] for p in curve if 1 - p["miss_ratio"] >= target_hit_rate), None)
+            sizing[policy] = {
+                "entries": needed,
+                "bytes": round(needed * mean_bytes) if needed else None,
+            }
+
+        entry = {
+            "accesses": len(keys),
+            "distinct_keys": distinct,
+            "compulsory_miss_ratio": round(distinct / len(keys), 4),
+            "mean_object_bytes": round(mean_bytes),
+            "current_capacity": current.get(name),
+            "curves": curves,
+            "target_hit_rate": target_hit_rate,
+            "sizing": sizing,
+        }
+        if name in current:
+            entry["current_miss_ratio"] = {
+                policy: round(simulate(keys, policy, current[name]), 4) for policy in policies
+            }
+        report[name] = entry
+    return report
+
+
+def current_capacities() -> Dict[str, int]:
+    """Configured capacity of each DXFService cache, by cache name."""
+    from dxf_generator.services.dxf_service import DXFService
+    caches = (
+        DXFService._generation_cache, DXFService._parse_cache,
+        DXFService._semantic_parse_cache, DXFService._batch_cache
+    )
+    return {cache._name: cache._max_size for cache in caches}
+
+
+def format_report(report: Dict) -> str:
+    lines = []
+    for name, entry in report.items():
+        policies = list(entry["curves"])
+        lines.append(
+            f"[{name}] {entry['accesses']} accesses, {entry['distinct_keys']} distinct keys, "
+            f"compulsory miss ratio {entry['compulsory_miss_ratio']:.3f}, "
+            f"~{entry['mean_object_bytes']} bytes/object, configured capacity {entry['current_capacity']}"
+        )
+        lines.append(f"{'capacity':>9} " + " ".join(f"{p:>8}" for p in policies))
+        for i, point in enumerate(entry["curves"][policies[0]]):
+            lines.append(
+                f"{point['capacity']:>9} " + " ".join(f"{entry['curves'][p][i]['miss_ratio']:>8.3f}" for p in policies)
+            )
+        target = entry["target_hit_rate"]
+        for policy, size in entry["sizing"].items():
+            if size["entries"]:
+                lines.append(f"  {policy}: {target:.0%} hits needs {size['entries']} entries (~{size['bytes'] / 1024 / 1024:.1f} MB)")
+            elif 1 - entry["compulsory_miss_ratio"] < target:
+                lines.append(f"  {policy}: {target:.0%} hits not reachable (too many one-off keys)")
+            else:
+                lines.append(f"  {policy}: {target:.0%} hits not reached on the simulated capacities")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _parse_object_bytes(values: Optional[List[str]]) -> Dict[str, int]:
+    sizes = dict(DEFAULT_OBJECT_BYTES)
+    for value in values or []:
+        name, _, size = value.partition("=")
+        sizes[name] = int(size)
+    return sizes
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", help="Captured trace (JSONL, see merge_captures)")
+    source.add_argument("--log", help="Structured log (logs/app.json.log) with DEBUG cache lines")
+    parser.add_argument("--caches", nargs="+", help="Only these caches (e.g. generation parse batch)")
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=list(POLICIES))
+    parser.add_argument("--target-hit-rate", type=float, default=0.9)
+    parser.add_argument("--points", type=int, default=16, help="Capacities per curve")
+    parser.add_argument("--object-bytes", nargs="+", metavar="CACHE=BYTES", help="Override object size estimates")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    if args.log:
+        try:
+            accesses = accesses_from_log(args.log)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        with open(args.trace) as f:
+            accesses = accesses_from_trace(json.loads(line) for line in f if line.strip())
+    if args.caches:
+        accesses = [a for a in accesses if a[0] in args.caches]
+    if not accesses:
+        parser.error("no cache accesses found")
+
+    report = analyze(
+        accesses, _parse_object_bytes(args.object_bytes), current_capacities(),
+        args.target_hit_rate, args.policies, args.points
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
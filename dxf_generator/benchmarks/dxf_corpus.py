@@ -0,0 +1,351 @@
+"""
+Synthetic DXF corpus generator.
+
+Writes deterministic DXF files for parser benchmarks: the same parameters
+and seed always give byte-identical output. A file holds filler entities of
+a chosen mix (POINT, LINE, ARC, CIRCLE, TEXT) followed by one column
+profile. The profile is the last modelspace LWPOLYLINE, or is placed
+through a chain of `block_depth` nested block references. Files are ASCII
+or binary and can be deliberately malformed. Run with:
+
+    python -m dxf_generator.benchmarks.dxf_corpus corpus/ --quick
+    python -m dxf_generator.benchmarks.dxf_corpus corpus/ --sizes 1KB 1MB 100MB 500MB --binary --malformed
+
+Size a file either by entity count (--entities) or by target bytes
+(--sizes); the profile and closing sections come on top. Every run writes
+corpus/manifest.json with each file's parameters, size, entity count and
+SHA-256, so a corpus can be rebuilt or checked later.
+
+Malformations:
+    truncated       file cut off at two thirds of its length
+    missing_eof     no closing ENDSEC/EOF
+    unclosed_block  the outermost block has no ENDBLK (needs block_depth >= 1)
+    bad_number      a coordinate of the middle filler entity is not a number (ASCII only)
+    odd_tags        a value line of the middle filler entity is missing (ASCII only)
+
+When sizing by bytes the first filler entity is the broken one.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Tag = Tuple[int, object]
+
+DEFAULT_MIX = {"POINT": 3, "CIRCLE": 2, "TEXT": 2, "LINE": 2, "ARC": 1}
+MALFORMATIONS = ("truncated", "missing_eof", "unclosed_block", "bad_number", "odd_tags")
+BINARY_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+_LAYERS = ("0", "STEEL", "ANNOTATION", "GRID", "HIDDEN")
+_WORDS = ("BEAM", "COLUMN", "PLATE", "WELD", "BOLT", "GRID", "LEVEL", "SECTION")
+_SIZE_UNITS = {"KB": 2**10, "MB": 2**20, "GB": 2**30, "B": 1}
+
+# Most entities written between size checks, and the assumed size of one before any is written
+_CHUNK = 2000
+_FIRST_ENTITY_GUESS = 256
+
+# Column profile (300 x 400) used as the one identifiable shape in every file
+_PROFILE: List[Tag] = [
+    (0, "LWPOLYLINE"), (100, "AcDbEntity"), (8, "STEEL"), (100, "AcDbPolyline"), (90, 4), (70, 1),
+    (10, 0.0), (20, 0.0), (10, 300.0), (20, 0.0), (10, 300.0), (20, 400.0), (10, 0.0), (20, 400.0),
+]
+
+
+def parse_size(value: str) -> int:
+    """Bytes from '512', '1KB', '100MB' or '1GB'."""
+    text = value.strip().upper()
+    for unit, factor in _SIZE_UNITS.items():
+        if text.endswith(unit) and text[:-len(unit)]:
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def _filler(kind: str, rng: random.Random) -> List[Tag]:
+    """Tags of one filler entity with coordinates on a 0.001 grid."""
+    layer = rng.choice(_LAYERS)
+    x, y = round(rng.uniform(-5000, 5000), 3), round(rng.uniform(-5000, 5000), 3)
+    head = [(0, kind), (100, "AcDbEntity"), (8, layer)]
+    if kind == "POINT":
+        return head + [(100, "AcDbPoint"), (10, x), (20, y), (30, 0.0)]
+    if kind == "LINE":
+        return head + [
+            (100, "AcDbLine"), (10, x), (20, y), (30, 0.0),
+            (11, round(x + rng.uniform(-200, 200), 3)), (21, round(y + rng.uniform(-200, 200), 3)), (31, 0.0),
+        ]
+    if kind == "CIRCLE":
+        return head + [(100, "AcDbCircle"), (10, x), (20, y), (30, 0.0), (40, round(rng.uniform(1, 100), 3))]
+    if kind == "ARC":
+        return head + [
+            (100, "AcDbCircle"), (10, x), (20, y), (30, 0.0), (40, round(rng.uniform(1, 100), 3)),
+            (100, "AcDbArc"), (50, round(rng.uniform(0, 180), 3)), (51, round(rng.uniform(180, 360), 3)),
+        ]
+    if kind == "TEXT":
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+        return head + [
+            (100, "AcDbText"), (10, x), (20, y), (30, 0.0), (40, 2.5), (1, f"{words} {rng.randint(1, 999)}"),
+            (100, "AcDbText"),
+        ]
+    raise ValueError(f"Unsupported filler entity type: {kind}")
+
+
+def _insert(name: str, x: float, y: float) -> List[Tag]:
+    return [
+        (0, "INSERT"), (100, "AcDbEntity"), (8, "0"), (100, "AcDbBlockReference"),
+        (2, name), (10, x), (20, y), (30, 0.0),
+    ]
+
+
+def _block(name: str, content: List[Tag], closed: bool = True) -> List[Tag]:
+    tags = [
+        (0, "BLOCK"), (100, "AcDbEntity"), (8, "0"), (100, "AcDbBlockBegin"),
+        (2, name), (70, 0), (10, 0.0), (20, 0.0), (30, 0.0), (3, name), (1, ""),
+    ] + content
+    if closed:
+        tags += [(0, "ENDBLK"), (100, "AcDbEntity"), (8, "0"), (100, "AcDbBlockEnd")]
+    return tags
+
+
+def _ascii(tags: List[Tag]) -> bytes:
+    return "".join(
+        f"{code:>3}\n{value:.3f}\n" if isinstance(value, float) else f"{code:>3}\n{value}\n"
+        for code, value in tags
+    ).encode("ascii")
+
+
+def _binary_value(code: int, value) -> bytes:
+    """Encode a value by its group code type (DXF R2000+ binary, 2-byte group codes)."""
+    if 10 <= code <= 59 or 110 <= code <= 149 or 210 <= code <= 239 or 460 <= code <= 469:
+        return struct.pack("<d", float(value))
+    if 60 <= code <= 79 or 170 <= code <= 179 or 270 <= code <= 289 or 370 <= code <= 389 or 400 <= code <= 409:
+        return struct.pack("<h", int(value))
+    if 90 <= code <= 99 or 420 <= code <= 429 or 440 <= code <= 459:
+        return struct.pack("<i", int(value))
+    if 160 <= code <= 169:
+        return struct.pack("<q", int(value))
+    if 290 <= code <= 299:
+        return struct.pack("<B", int(value))
+    return str(value).encode("ascii") + b"\x00"
+
+
+def _binary(tags: List[Tag]) -> bytes:
+    return b"".join(struct.pack("<H", code) + _binary_value(code, value) for code, value in tags)
+
+
+def _break_entity(tags: List[Tag], malformed: str) -> bytes:
+    """ASCII of an entity with a bad coordinate or a missing value line."""
+    index = next(i for i, (code, _) in enumerate(tags) if code == 10)
+    if malformed == "bad_number":
+        return _ascii(tags[:index] + [(10, "1.0.0e")] + tags[index + 1:])
+    text = _ascii(tags).decode("ascii").split("\n")
+    # Drop the value line of the first coordinate so every later tag is misaligned
+    del text[2 * index + 1]
+    return "\n".join(text).encode("ascii")
+
+
+def generate(
+    entities: Optional[int] = None,
+    target_bytes: Optional[int] = None,
+    mix: Optional[Dict[str, float]] = None,
+    block_depth: int = 0,
+    binary: bool = False,
+    malformed: Optional[str] = None,
+    seed: int = 0
+) -> Iterator[bytes]:
+    """
+    Stream a synthetic DXF as byte chunks.
+
+    Args:
+        entities: Number of filler entities (ignored when target_bytes is set)
+        target_bytes: Stop adding filler once this many bytes are written
+        mix: Relative weights of filler entity types (default DEFAULT_MIX)
+        block_depth: Place the profile through this many nested blocks (0 = in modelspace)
+        binary: Binary DXF instead of ASCII
+        malformed: One of MALFORMATIONS
+        seed: Random seed
+
+    Returns:
+        (as the generator's return value) the number of filler entities written
+
+    Raises:
+        ValueError: For an unknown entity type or malformation, or one that does not apply
+    """
+    if malformed is not None and malformed not in MALFORMATIONS:
+        raise ValueError(f"Unknown malformation: {malformed}")
+    if malformed in ("bad_number", "odd_tags") and binary:
+        raise ValueError(f"{malformed} applies to ASCII files only")
+    if malformed == "unclosed_block" and block_depth < 1:
+        raise ValueError("unclosed_block needs block_depth >= 1")
+    if entities is None and target_bytes is None:
+        raise ValueError("Give either entities or target_bytes")
+    mix = mix or DEFAULT_MIX
+    for kind in mix:
+        _filler(kind, random.Random(0))
+
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    encode = _binary if binary else _ascii
+    written = 0
+
+    def emit(chunk: bytes) -> bytes:
+        nonlocal written
+        written += len(chunk)
+        return chunk
+
+    if binary:
+        yield emit(BINARY_SENTINEL)
+    yield emit(encode([
+        (0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1015"), (9, "$INSUNITS"), (70, 4), (0, "ENDSEC"),
+    ]))
+
+    if block_depth:
+        blocks = [(0, "SECTION"), (2, "BLOCKS")]
+        content = list(_PROFILE)
+        for level in range(block_depth):
+            name = f"NEST_{level}"
+            blocks += _block(name, content, closed=not (malformed == "unclosed_block" and level == block_depth - 1))
+            content = _insert(name, 10.0, 10.0)
+        yield emit(encode(blocks + [(0, "ENDSEC")]))
+
+    yield emit(encode([(0, "SECTION"), (2, "ENTITIES")]))
+    broken_at = (entities // 2) if entities is not None else None
+    count = filler_bytes = 0
+    while (written < target_bytes) if target_bytes is not None else (count < entities):
+        if target_bytes is not None:
+            # Size chunks from the average entity so far, so small files do not overshoot the target
+            average = filler_bytes / count if count else _FIRST_ENTITY_GUESS
+            size = max(1, min(_CHUNK, int((target_bytes - written) / average)))
+        else:
+            size = min(_CHUNK, entities - count)
+        parts = []
+        for kind in rng.choices(kinds, weights, k=size):
+            tags = _filler(kind, rng)
+            if malformed in ("bad_number", "odd_tags") and (count == broken_at or (broken_at is None and count == 0)):
+                parts.append(_break_entity(tags, malformed))
+            else:
+                parts.append(encode(tags))
+            count += 1
+        chunk = b"".join(parts)
+        filler_bytes += len(chunk)
+        yield emit(chunk)
+
+    profile = _insert(f"NEST_{block_depth - 1}", 0.0, 0.0) if block_depth else _PROFILE
+    yield emit(encode(profile))
+    if malformed != "missing_eof":
+        yield emit(encode([(0, "ENDSEC"), (0, "EOF")]))
+    return count
+
+
+def write_dxf(path: str, **params) -> Dict:
+    """
+    Write one corpus file (parameters as for generate()).
+
+    Returns:
+        Manifest entry: file name, parameters, filler entity count, bytes, sha256
+    """
+    digest = hashlib.sha256()
+    chunks = generate(**params)
+    with open(path, "wb") as f:
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as done:
+                count = done.value
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    if params.get("malformed") == "truncated":
+        size = os.path.getsize(path) * 2 // 3
+        os.truncate(path, size)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(2**20), b""):
+                digest.update(chunk)
+    return {
+        "file": os.path.basename(path),
+        **{k: v for k, v in params.items() if v is not None},
+        "filler_entities": count,
+        "bytes": os.path.getsize(path),
+        "sha256": digest.hexdigest(),
+    }
+
+
+def corpus_specs(
+    sizes: List[int],
+    block_depths: Tuple[int, ...] = (0, 3),
+    binary: bool = False,
+    malformed: bool = False,
+    seed: int = 0
+) -> List[Dict]:
+    """
+    Parameters of a corpus grid: every size at every block depth, ASCII and
+    optionally binary, plus one malformed variant per malformation at the
+    smallest size.
+    """
+    specs = []
+    formats = (False, True) if binary else (False,)
+    for size in sizes:
+        for depth in block_depths:
+            for is_binary in formats:
+                suffix = "_bin" if is_binary else ""
+                specs.append({
+                    "name": f"size{size}_depth{depth}{suffix}.dxf",
+                    "target_bytes": size, "block_depth": depth, "binary": is_binary, "seed": seed,
+                })
+    if malformed:
+        for kind in MALFORMATIONS:
+            specs.append({
+                "name": f"malformed_{kind}.dxf",
+                "entities": 200, "block_depth": 1, "malformed": kind, "seed": seed,
+            })
+    return specs
+
+
+def build_corpus(directory: str, specs: List[Dict]) -> List[Dict]:
+    """Write every spec into `directory` and a manifest.json listing them."""
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for spec in specs:
+        params = {k: v for k, v in spec.items() if k != "name"}
+        manifest.append(write_dxf(os.path.join(directory, spec["name"]), **params))
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Output directory")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=None,
+                        help="Target file sizes, e.g. 1KB 1MB 100MB 500MB")
+    parser.add_argument("--entities", type=int, help="Write a single file with this many filler entities")
+    parser.add_argument("--block-depths", type=int, nargs="+", default=[0, 3])
+    parser.add_argument("--binary", action="store_true", help="Also write binary DXF variants")
+    parser.add_argument("--malformed", action="store_true", help="Also write one file per malformation")
+    parser.add_argument("--quick", action="store_true", help="Sizes 1KB to 4MB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the manifest as JSON")
+    args = parser.parse_args(argv)
+
+    if args.entities:
+        specs = [{
+            "name": f"entities{args.entities}_depth{depth}.dxf",
+            "entities": args.entities, "block_depth": depth, "seed": args.seed,
+        } for depth in args.block_depths]
+    else:
+        sizes = args.sizes or [parse_size(s) for s in (
+            ("1KB", "64KB", "1MB", "4MB") if args.quick else ("1KB", "1MB", "16MB", "128MB", "500MB")
+        )]
+        specs = corpus_specs(sizes, tuple(args.block_depths), args.binary, args.malformed, args.seed)
+    manifest = build_corpus(args.directory, specs)
+    if args.json:
+        print(json.dumps(manifest, indent=2))
+        return
+    for entry in manifest:
+        print(f"{entry['file']:<40} {entry['bytes']:>12} bytes  {entry['sha256'][:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Executor lane isolation benchmark.
+
+Measures single-request latency from the interactive routes while bulk
+batches keep the BatchProcessor busy, once with the configured lanes
+(BATCH_LANES) and once with every lane at the same priority and the full
+thread count, so interactive requests queue behind batch tasks. An idle
+run with no batches gives the floor. Requests are sent open-loop and every
+one misses the generation cache; batch clients back off for Retry-After
+when shed. Run with:
+
+    python -m dxf_generator.benchmarks.lane_isolation
+    python -m dxf_generator.benchmarks.lane_isolation --duration 20 --rate 20 --bulk-clients 4 --json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from dxf_generator.benchmarks.load_generator import _client, _percentiles
+from dxf_generator.config.env_config import config
+from dxf_generator.services.batch_processor import BatchProcessor, parse_lanes
+from dxf_generator.services.dxf_service import DXFService
+
+_sizes = itertools.count()
+
+
+def _column() -> Dict:
+    """A column spec no earlier request has used, so it always generates."""
+    return {"width": round(400 + next(_sizes) * 0.001, 3), "height": 600}
+
+
+def flat_lanes(lanes: Dict[str, tuple], threads: int) -> Dict[str, tuple]:
+    """The same lanes with one priority and the whole pool each, i.e. no isolation."""
+    return {name: (threads, 0) for name in lanes}
+
+
+async def _interactive(client, duration: float, rate: float) -> List[float]:
+    """Send single-column requests open-loop; latency is measured from the scheduled time."""
+    start = time.perf_counter()
+    latencies, tasks = [], []
+
+    async def send(intended: float) -> None:
+        response = await client.post("/api/v1/column", json=_column())
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - intended) * 1000)
+
+    for i in range(int(duration * rate)):
+        intended = start + i / rate
+        await asyncio.sleep(max(0.0, intended - time.perf_counter()))
+        tasks.append(asyncio.create_task(send(intended)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def _bulk(client, stop: asyncio.Event, items: int, counts: Dict[str, int]) -> None:
+    """Post batches back to back until stopped, backing off for Retry-After when shed."""
+    while not stop.is_set():
+        response = await client.post("/api/v1/column/batch", json={"items": [_column() for _ in range(items)]})
+        if response.status_code == 429:
+            counts["shed"] += items
+            try:
+                await asyncio.wait_for(stop.wait(), float(response.headers.get("retry-after", 1)))
+            except asyncio.TimeoutError:
+                pass
+        else:
+            counts["items"] += items
+
+
+async def measure(lanes: Optional[Dict[str, tuple]], duration: float, rate: float,
+                  bulk_clients: int, batch_items: int) -> Dict:
+    """Run one configuration; lanes=None leaves the batch clients out."""
+    processor = BatchProcessor(lanes=lanes or parse_lanes(config.BATCH_LANES))
+    previous, DXFService._batch_processor = DXFService._batch_processor, processor
+    counts = {"items": 0, "shed": 0}
+    try:
+        async with _client(None, 60.0) as client:
+            stop = asyncio.Event()
+            background = [
+                asyncio.create_task(_bulk(client, stop, batch_items, counts))
+                for _ in range(bulk_clients if lanes else 0)
+            ]
+            latencies = await _interactive(client, duration, rate)
+            stop.set()
+            await asyncio.gather(*background)
+        processor.shutdown(wait=True)
+    finally:
+        DXFService._batch_processor = previous
+    return {
+        "requests": len(latencies),
+        **_percentiles(latencies),
+        "batch_items_per_s": round(counts["items"] / duration, 1),
+        "batch_items_shed": counts["shed"],
+        "lanes": {name: s["submitted"] for name, s in processor.stats["lanes"].items()},
+    }
+
+
+async def run(duration: float, rate: float, bulk_clients: int, batch_items: int) -> Dict:
+    """Measure idle, flat and laned configurations from a temporary working directory."""
+    lanes = parse_lanes(config.BATCH_LANES)
+    threads = config.MAX_THREADS
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="dxf_lanes_") as tmp:
+        os.chdir(tmp)
+        try:
+            for name, spec in (("idle", None), ("flat", flat_lanes(lanes, threads)), ("lanes", lanes)):
+                results[name] = await measure(spec, duration, rate, bulk_clients, batch_items)
+        finally:
+            os.chdir(cwd)
+    return {"rate": rate, "duration_s": duration, "bulk_clients": bulk_clients, "results": results}
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"interactive requests at {report['rate']} req/s for {report['duration_s']}s, "
+        f"{report['bulk_clients']} bulk clients",
+        f"{'mode':<6} {'req':>5} {'p50':>9} {'p90':>9} {'p99':>9} {'batch items/s':>14} {'shed':>6}",
+    ]
+    for mode, r in report["results"].items():
+        lines.append(
+            f"{mode:<6} {r['requests']:>5} {r['p50_ms'] or 0:>9.1f} {r['p90_ms'] or 0:>9.1f} "
+            f"{r['p99_ms'] or 0:>9.1f} {r['batch_items_per_s']:>14} {r['batch_items_shed']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per configuration")
+    parser.add_argument("--rate", type=float, default=20.0, help="Interactive requests per second")
+    parser.add_argument("--bulk-clients", type=int, default=4, help="Concurrent clients posting batches")
+    parser.add_argument("--batch-items", type=int, default=config.MAX_BATCH_SIZE, help="Items per batch")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.duration, args.rate, args.bulk_clients, args.batch_items))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Large-file parse benchmark.
+
+Measures wall time and peak RSS of DXFParser on synthetic ASCII DXF files of
+growing size, comparing the memory-mapped scanner with the ezdxf document
+path. Each parse runs in a fresh interpreter so peak RSS is not shared. Run with:
+
+    python -m dxf_generator.benchmarks.large_file_parse --sizes-mb 16 64 256
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+# Filler entity repeated until the target size is reached
+POINT_ENTITY = "  0\nPOINT\n  8\n0\n 10\n{x:.3f}\n 20\n0.0\n 30\n0.0\n"
+COLUMN_ENTITY = (
+    "  0\nLWPOLYLINE\n100\nAcDbEntity\n  8\n0\n100\nAcDbPolyline\n 90\n4\n 70\n1\n"
+    " 10\n0.0\n 20\n0.0\n 10\n300.0\n 20\n0.0\n"
+    " 10\n300.0\n 20\n400.0\n 10\n0.0\n 20\n400.0\n"
+)
+
+_CHILD = """
+import json, resource, sys, time
+from dxf_generator.config.logging_config import flush_logging
+from dxf_generator.services.dxf_parser import DXFParser
+start = time.perf_counter()
+result = DXFParser.parse(sys.argv[1], large_file=sys.argv[2] == "1")
+elapsed = time.perf_counter() - start
+flush_logging()
+print("RESULT " + json.dumps({
+    "type": result["type"],
+    "seconds": round(elapsed, 3),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+}))
+"""
+
+
+def make_file(path: str, size_mb: int) -> int:
+    """
+    Write an ASCII DXF of roughly `size_mb` whose only profile is the last entity.
+
+    Returns:
+        File size in bytes
+    """
+    target = size_mb * 1024 * 1024
+    with open(path, "w") as f:
+        f.write("  0\nSECTION\n  2\nENTITIES\n")
+        index = 0
+        while f.tell() < target:
+            f.write("".join(POINT_ENTITY.format(x=i) for i in range(index, index + 10_000)))
+            index += 10_000
+        f.write(COLUMN_ENTITY)
+        f.write("  0\nENDSEC\n  0\nEOF\n")
+    return os.path.getsize(path)
+
+
+def measure(path: str, large_file: bool) -> Dict:
+    """Parse `path` in a fresh interpreter and return its timing and peak RSS."""
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, path, "1" if large_file else "0"],
+        capture_output=True, text=True, check=True
+    ).stdout
+    # Application logging also goes to stdout; the child flushes it before printing the result
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def run(sizes_mb: List[int], compare: bool = True) -> List[Dict]:
+    """
+    Benchmark each file size in large-file mode (and the ezdxf path if `compare`).
+
+    Returns:
+        One result dict per size
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in sizes_mb:
+            path = os.path.join(tmp, f"large_{size_mb}mb.dxf")
+            file_bytes = make_file(path, size_mb)
+            result = {"file_mb": round(file_bytes / (1024 * 1024), 1), "mmap": measure(path, True)}
+            if compare:
+                result["ezdxf"] = measure(path, False)
+            results.append(result)
+            os.remove(path)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--no-compare", action="store_true", help="Skip the ezdxf document path")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes_mb, compare=not args.no_compare)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'File (MB)':<10} {'Mode':<7} {'Time (sec)':<12} {'Peak RSS (MB)':<14}")
+    print("-" * 45)
+    for r in results:
+        for mode in ("mmap", "ezdxf"):
+            if mode in r:
+                print(f"{r['file_mb']:<10} {mode:<7} {r[mode]['seconds']:<12} {r[mode]['peak_rss_mb']:<14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Trace-replay load generator.
+
+Replays a workload against the ASGI app, in-process or over HTTP, with an
+async client and reports throughput, latency percentiles, error rate and
+cache hit ratio per time interval. Run with:
+
+    python -m dxf_generator.benchmarks.load_generator --synthetic 2000 --rate 50
+    python -m dxf_generator.benchmarks.load_generator --workload trace.jsonl --speed 2 --url http://localhost:8000
+    python -m dxf_generator.benchmarks.load_generator --synthetic 500 --concurrency 16
+
+A workload file has one JSON request per line:
+
+    {"t": 0.125, "method": "POST", "path": "/api/v1/ibeam", "json": {...}}
+    {"t": 0.300, "method": "POST", "path": "/api/v1/parse", "file": "drawings/part.dxf"}
+
+'t' (seconds from the start of the trace) is optional; 'file' uploads the
+named file as multipart field 'file'. Lines without 'method' and 'path' are
+skipped, as are captured uploads ('upload') with no 'file' to send. Traces
+recorded by workload capture (see merge_captures) use this format.
+
+With --rate, or a trace with timestamps, the run is open-loop: every request
+is sent at its scheduled time whether or not earlier ones have finished, and
+latency is measured from that scheduled time. A stalled server therefore
+shows up as tail latency instead of as fewer requests sent (coordinated
+omission). --concurrency runs closed-loop workers instead, for comparison.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def load_workload(path: str) -> List[Dict]:
+    """
+    Read a JSONL workload, skipping lines that are not request records.
+
+    Returns:
+        Request dicts in file order
+    """
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict) or "method" not in record or "path" not in record:
+                continue
+            if "upload" in record and "file" not in record:
+                continue
+            records.append(record)
+    return records
+
+
+def synthesize_workload(count: int, seed: int = 0, distinct: int = 200, skew: float = 1.1) -> List[Dict]:
+    """
+    Build a workload of single and batch generation requests.
+
+    Sizes are drawn from `distinct` shapes with Zipf-like popularity, so
+    the mix has a realistic share of repeat (cacheable) requests.
+
+    Args:
+        count: Number of requests
+        seed: Random seed
+        distinct: Number of distinct shapes per component type
+        skew: Zipf exponent (higher = more repeats)
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank ** skew) for rank in range(1, distinct + 1)]
+
+    def ibeam(rank):
+        return {"total_depth": 300 + rank * 0.5, "flange_width": 150, "web_thickness": 8, "flange_thickness": 12}
+
+    def column(rank):
+        return {"width": 300 + rank * 0.5, "height": 400}
+
+    records = []
+    for _ in range(count):
+        rank = rng.choices(range(distinct), weights)[0]
+        kind = rng.random()
+        if kind < 0.6:
+            records.append({"method": "POST", "path": "/api/v1/ibeam", "json": ibeam(rank)})
+        elif kind < 0.9:
+            records.append({"method": "POST", "path": "/api/v1/column", "json": column(rank)})
+        else:
+            size = rng.randint(2, 10)
+            items = [ibeam(rng.choices(range(distinct), weights)[0]) for _ in range(size)]
+            records.append({"method": "POST", "path": "/api/v1/ibeam/batch", "json": {"items": items}})
+    return records
+
+
+def schedule(records: List[Dict], rate: Optional[float], speed: float = 1.0) -> List[float]:
+    """
+    Intended send time (seconds from start) of every record.
+
+    A fixed rate spaces requests evenly; otherwise recorded 't' offsets are
+    used, compressed by `speed`.
+    """
+    if rate:
+        return [i / rate for i in range(len(records))]
+    if any("t" not in r for r in records):
+        raise ValueError("Open-loop replay needs --rate or a 't' offset on every record")
+    first = records[0]["t"] if records else 0.0
+    return [(r["t"] - first) / speed for r in records]
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {f"p{p:g}_ms": None for p in PERCENTILES}
+    ordered = sorted(values)
+    return {
+        f"p{p:g}_ms": round(ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)], 3)
+        for p in PERCENTILES
+    }
+
+
+def _summarize(samples: List[Dict], duration: float) -> Dict:
+    """Aggregate samples into counts, rates and latency percentiles."""
+    errors = sum(1 for s in samples if s["status"] == 0 or s["status"] >= 500)
+    client_errors = sum(1 for s in samples if 400 <= s["status"] < 500)
+    cached = [s["cache"] for s in samples if s["cache"] in ("HIT", "MISS")]
+    summary = {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / duration, 2) if duration > 0 else None,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "client_error_rate": round(client_errors / len(samples), 4) if samples else 0.0,
+        "cache_hit_ratio": round(cached.count("HIT") / len(cached), 4) if cached else None,
+    }
+    summary.update(_percentiles([s["latency_ms"] for s in samples]))
+    summary["max_ms"] = round(max((s["latency_ms"] for s in samples), default=0.0), 3)
+    return summary
+
+
+def build_report(samples: List[Dict], duration: float, interval: float, mode: str) -> Dict:
+    """
+    Overall and per-interval statistics.
+
+    In open-loop mode 'latency_ms' counts from the scheduled send time and
+    'service_ms' from the actual send; the gap is client-side queueing.
+    """
+    overall = _summarize(samples, duration)
+    overall.update({f"service_{k}": v for k, v in _percentiles([s["service_ms"] for s in samples]).items()})
+
+    timeline = []
+    buckets = max(1, math.ceil(duration / interval))
+    by_bucket: List[List[Dict]] = [[] for _ in range(buckets)]
+    for s in samples:
+        by_bucket[min(buckets - 1, int(s["finished_at"] / interval))].append(s)
+    for index, bucket in enumerate(by_bucket):
+        width = min(interval, duration - index * interval) if duration > index * interval else interval
+        timeline.append({"t": round(index * interval, 3), **_summarize(bucket, width)})
+
+    return {"mode": mode, "duration_s": round(duration, 3), "overall": overall, "timeline": timeline}
+
+
+class LoadGenerator:
+    """
+    Sends workload records through an httpx AsyncClient and records one
+    sample per request (status, X-Cache header, latency).
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.samples: List[Dict] = []
+        self._files: Dict[str, bytes] = {}
+        self._start = 0.0
+
+    async def _send(self, record: Dict, intended: float) -> None:
+        sent = time.perf_counter()
+        kwargs = {}
+        if "json" in record:
+            kwargs["json"] = record["json"]
+        if "file" in record:
+            path = record["file"]
+            if path not in self._files:
+                with open(path, "rb") as f:
+                    self._files[path] = f.read()
+            kwargs["files"] = {"file": (path.rsplit("/", 1)[-1], self._files[path], "application/dxf")}
+        try:
+            response = await self.client.request(record["method"], record["path"], **kwargs)
+            status, cache = response.status_code, response.headers.get("x-cache")
+        except httpx.HTTPError:
+            status, cache = 0, None
+        finished = time.perf_counter()
+        self.samples.append({
+            "path": record["path"],
+            "status": status,
+            "cache": cache,
+            "latency_ms": (finished - intended) * 1000,
+            "service_ms": (finished - sent) * 1000,
+            "finished_at": finished - self._start,
+        })
+
+    async def open_loop(self, records: List[Dict], offsets: List[float]) -> float:
+        """Send each record at its scheduled offset; returns the run duration."""
+        self._start = time.perf_counter()
+        tasks = []
+        for record, offset in zip(records, offsets):
+            intended = self._start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._send(record, intended)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - self._start
+
+    async def closed_loop(self, records: List[Dict], concurrency: int) -> float:
+        """Run `concurrency` workers that each send their next request on completion."""
+        self._start = time.perf_counter()
+        queue = iter(records)
+
+        async def worker():
+            for record in queue:
+                await self._send(record, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - self._start
+
+
+def _client(url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+    from dxf_generator.interface.web import app
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://loadgen", timeout=timeout, limits=limits
+    )
+
+
+async def run_load(
+    records: List[Dict],
+    url: Optional[str] = None,
+    rate: Optional[float] = None,
+    speed: float = 1.0,
+    concurrency: Optional[int] = None,
+    interval: float = 1.0,
+    timeout: float = 60.0
+) -> Dict:
+    """
+    Replay `records` and return the report.
+
+    Args:
+        records: Workload records
+        url: Server base URL; None drives the app in-process
+        rate: Open-loop request rate (req/s); None uses recorded 't' offsets
+        speed: Replay speed-up for recorded offsets
+        concurrency: Closed-loop worker count (overrides open-loop)
+        interval: Timeline bucket width in seconds
+        timeout: Per-request timeout in seconds
+    """
+    async with _client(url, timeout) as client:
+        generator = LoadGenerator(client)
+        if concurrency:
+            duration = await generator.closed_loop(records, concurrency)
+            mode = f"closed-loop x{concurrency}"
+        else:
+            duration = await generator.open_loop(records, schedule(records, rate, speed))
+            mode = f"open-loop {rate} req/s" if rate else f"open-loop trace x{speed}"
+    report = build_report(generator.samples, duration, interval, mode)
+    report["target"] = url or "in-process"
+    return report
+
+
+def format_report(report: Dict) -> str:
+    o = report["overall"]
+    lines = [
+        f"{report['mode']} against {report['target']}: {o['requests']} requests in {report['duration_s']}s",
+        f"throughput {o['throughput_rps']} req/s, errors {o['error_rate']:.2%}, "
+        f"4xx {o['client_error_rate']:.2%}, cache hit ratio {o['cache_hit_ratio']}",
+        "latency (ms): " + ", ".join(f"{k[:-3]}={o[k]}" for k in o if k.startswith("p")) + f", max={o['max_ms']}",
+        "service (ms): " + ", ".join(f"{k[8:-3]}={o[k]}" for k in o if k.startswith("service_")),
+        "",
+        f"{'t (s)':>7} {'req':>6} {'rps':>8} {'p50':>9} {'p99':>9} {'err%':>6} {'hit%':>6}",
+    ]
+    for b in report["timeline"]:
+        hit = f"{b['cache_hit_ratio'] * 100:.0f}" if b["cache_hit_ratio"] is not None else "-"
+        lines.append(
+            f"{b['t']:>7} {b['requests']:>6} {b['throughput_rps'] or 0:>8.1f} {b['p50_ms'] or 0:>9.1f} "
+            f"{b['p99_ms'] or 0:>9.1f} {b['error_rate'] * 100:>6.1f} {hit:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--workload", help="JSONL workload file")
+    source.add_argument("--synthetic", type=int, help="Generate this many requests instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Server base URL (default: drive the app in-process)")
+    parser.add_argument("--rate", type=float, help="Open-loop rate in req/s")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed for recorded offsets")
+    parser.add_argument("--concurrency", type=int, help="Closed-loop workers instead of open-loop")
+    parser.add_argument("--interval", type=float, default=1.0, help="Timeline bucket width (s)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Application log level (in-process runs)")
+    args = parser.parse_args(argv)
+
+    records = load_workload(args.workload) if args.workload else synthesize_workload(args.synthetic, args.seed)
+    if not records:
+        parser.error("workload contains no request records")
+    if not args.rate and not args.concurrency and args.synthetic:
+        parser.error("--synthetic needs --rate or --concurrency")
+
+    if not args.url:
+        from dxf_generator.config.logging_config import logger
+        logger.setLevel(args.log_level.upper())
+    report = asyncio.run(run_load(
+        records, args.url, args.rate, args.speed, args.concurrency, args.interval, args.timeout
+    ))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
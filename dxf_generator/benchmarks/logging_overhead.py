@@ -0,0 +1,109 @@
+"""
+Logging overhead benchmark.
+
+Measures in-process request latency with the log level at DEBUG and at INFO,
+through the queued pipeline (callers enqueue, a listener thread writes) and
+with the same handlers called synchronously. Run with:
+
+    python -m dxf_generator.benchmarks.logging_overhead
+    python -m dxf_generator.benchmarks.logging_overhead --requests 2000 --levels DEBUG INFO WARNING --json
+
+Console output goes to os.devnull and the JSON log to a temporary
+directory, so the numbers cover formatting and file I/O but not a terminal.
+'drain_ms' is how long the listener still needed to write out the queue
+after the last response.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from dxf_generator.benchmarks.suite import _stats
+from dxf_generator.config import logging_config
+
+IBEAM = {"depth": 300, "width": 150, "flange_thickness": 12, "web_thickness": 8}
+
+
+async def _measure(requests: int) -> Dict:
+    from dxf_generator.interface.web import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the generation cache so every timed request is a cache hit
+        await client.post("/api/v1/ibeam", json=IBEAM)
+        samples = []
+        start = time.perf_counter()
+        for i in range(requests):
+            t0 = time.perf_counter()
+            if i % 2:
+                await client.get("/")
+            else:
+                await client.post("/api/v1/ibeam", json=IBEAM)
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+    return _stats(samples, elapsed)
+
+
+def run_case(level: str, queued: bool, requests: int, log_dir: str) -> Dict:
+    """Install handlers at `level` through one pipeline and time `requests` requests."""
+    devnull = open(os.devnull, "w")
+    handlers = logging_config.build_handlers(log_dir, stream=devnull)
+    for handler in handlers:
+        handler.setLevel(level)
+    logging_config.install_handlers(handlers, queued=queued)
+    try:
+        result = asyncio.run(_measure(requests))
+        t0 = time.perf_counter()
+        logging_config.flush_logging(timeout=60)
+        result["drain_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    finally:
+        if not queued:
+            for handler in handlers:
+                handler.close()
+        devnull.close()
+    return {"level": level, "pipeline": "queued" if queued else "sync", **result}
+
+
+def run(levels: List[str], requests: int) -> List[Dict]:
+    """Every level through both pipelines; the app's own logging is restored afterwards."""
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            for level in levels:
+                for queued in (True, False):
+                    results.append(run_case(level, queued, requests, log_dir))
+            logging_config.stop_logging()
+    finally:
+        logging_config.setup_logging()
+    return results
+
+
+def format_table(results: List[Dict]) -> str:
+    lines = [f"{'level':<8} {'pipeline':<8} {'p50_ms':>9} {'p95_ms':>9} {'mean_ms':>9} {'req/s':>9} {'drain_ms':>9}"]
+    for r in results:
+        lines.append(
+            f"{r['level']:<8} {r['pipeline']:<8} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+            f"{r['mean_ms']:>9.3f} {r['ops_per_sec']:>9.1f} {r['drain_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per case")
+    parser.add_argument("--levels", nargs="+", default=["DEBUG", "INFO"], type=str.upper,
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Log levels to compare")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.levels, args.requests)
+    print(json.dumps(results, indent=2) if args.json else format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Capture merge tool.
+
+Merges the per-worker ring files written by workload capture
+(CAPTURE_ENABLED=true) into one time-ordered trace that the load generator
+can replay. Run with:
+
+    python -m dxf_generator.benchmarks.merge_captures captures/ -o trace.jsonl
+    python -m dxf_generator.benchmarks.merge_captures captures/ -o trace.jsonl --upload-dir uploads/
+
+Each output line is the captured record plus 't', its offset in seconds
+from the first request. Uploads were captured by filename and size only;
+with --upload-dir, records whose file exists there get a 'file' entry and
+become replayable.
+"""
+import argparse
+import glob
+import json
+import os
+from typing import Dict, List, Optional
+
+
+def capture_files(directory: str) -> List[str]:
+    """All capture segments (current and previous, every worker) in a directory."""
+    return sorted(glob.glob(os.path.join(directory, "capture-*.jsonl")))
+
+
+def read_records(path: str) -> List[Dict]:
+    """Records of one segment; a line cut short by a crash or rotation is skipped."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def merge(paths: List[str], upload_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Merge capture segments into one trace ordered by request start time.
+
+    Args:
+        paths: Capture segment files
+        upload_dir: Directory holding the uploaded files, by filename
+
+    Returns:
+        Records with 't' offsets, ready for the load generator
+    """
+    records = [record for path in paths for record in read_records(path)]
+    records.sort(key=lambda r: r["ts"])
+    first = records[0]["ts"] if records else 0.0
+    for record in records:
+        record["t"] = round(record["ts"] - first, 6)
+        upload = record.get("upload")
+        if upload_dir and upload and upload.get("filename"):
+            candidate = os.path.join(upload_dir, os.path.basename(upload["filename"]))
+            if os.path.exists(candidate):
+                record["file"] = candidate
+    return records
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="Capture directories or segment files")
+    parser.add_argument("-o", "--output", required=True, help="Merged trace (JSONL)")
+    parser.add_argument("--upload-dir", help="Directory with the uploaded DXF files")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for item in args.inputs:
+        paths.extend(capture_files(item) if os.path.isdir(item) else [item])
+    records = merge(paths, args.upload_dir)
+
+    with open(args.output, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n")
+
+    workers = {r.get("worker") for r in records}
+    span = records[-1]["t"] if records else 0.0
+    print(f"Merged {len(records)} records from {len(paths)} files ({len(workers)} workers, {span:.1f}s) into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
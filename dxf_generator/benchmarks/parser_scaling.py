@@ -0,0 +1,190 @@
+"""
+Parser scaling benchmark.
+
+Parses a synthetic corpus (see dxf_corpus) with each DXFParser path and
+reports time and peak memory against file size: one curve per parse mode,
+block depth and format, with the fitted scaling exponent (the slope of
+log time and log memory over log size, so 1.0 is linear). Malformed files
+are reported by outcome. Each parse runs in a fresh interpreter so peak RSS
+is not shared. Run with:
+
+    python -m dxf_generator.benchmarks.parser_scaling --quick
+    python -m dxf_generator.benchmarks.parser_scaling --sizes 1KB 1MB 16MB 128MB 500MB --binary --malformed
+    python -m dxf_generator.benchmarks.parser_scaling --corpus corpus/ --modes mmap ezdxf --json
+
+Modes:
+    auto     DXFParser.parse as the service calls it (large-file mode above PARSE_LARGE_FILE_BYTES)
+    ezdxf    ezdxf document path
+    mmap     memory-mapped scanner (ASCII only)
+    recover  ezdxf.recover path
+
+'rss_mb' is peak RSS minus the interpreter's RSS after imports.
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from dxf_generator.benchmarks.dxf_corpus import build_corpus, corpus_specs, parse_size
+
+MODES = ("auto", "ezdxf", "mmap", "recover")
+
+_CHILD = """
+import json, resource, sys, time
+from dxf_generator.config.logging_config import flush_logging
+from dxf_generator.services.dxf_parser import DXFParser
+mode = sys.argv[2]
+kwargs = {"auto": {}, "ezdxf": {"large_file": False}, "mmap": {"large_file": True},
+          "recover": {"recover_mode": True, "large_file": False}}[mode]
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+try:
+    outcome = DXFParser.parse(sys.argv[1], **kwargs)["type"]
+except Exception as e:
+    outcome = type(e).__name__
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+flush_logging()
+print("RESULT " + json.dumps({
+    "outcome": outcome,
+    "seconds": round(elapsed, 4),
+    "rss_mb": round((peak - base) / 1024, 1),
+    "peak_rss_mb": round(peak / 1024, 1)
+}))
+"""
+
+
+def measure(path: str, mode: str, timeout: float = 900.0) -> Dict:
+    """Parse `path` with `mode` in a fresh interpreter; returns outcome, time and memory."""
+    try:
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD, path, mode],
+            capture_output=True, text=True, timeout=timeout
+        ).stdout
+    except subprocess.TimeoutExpired:
+        return {"outcome": "timeout", "seconds": timeout, "rss_mb": None, "peak_rss_mb": None}
+    # Application logging also goes to stdout; the child flushes it before printing the result
+    for line in output.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    return {"outcome": "crashed", "seconds": None, "rss_mb": None, "peak_rss_mb": None}
+
+
+def scaling_exponent(xs: List[float], ys: List[float]) -> Optional[float]:
+    """Least-squares slope of log(y) over log(x); None with fewer than two usable points."""
+    points = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x and y and x > 0 and y > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x, 3)
+
+
+def curves(results: List[Dict]) -> List[Dict]:
+    """
+    Group well-formed results into curves by mode, block depth and format.
+
+    Exponents are fitted to the successful parses of the larger half of the
+    sizes; the smallest files are dominated by interpreter and import costs.
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for r in results:
+        if r.get("malformed"):
+            continue
+        key = (r["mode"], r.get("block_depth", 0), "binary" if r.get("binary") else "ascii")
+        groups.setdefault(key, []).append(r)
+    output = []
+    for (mode, depth, fmt), points in sorted(groups.items()):
+        points.sort(key=lambda r: r["bytes"])
+        ok = [p for p in points if p["outcome"] in ("ibeam", "column")]
+        fitted = ok[(len(ok) - 1) // 2:]
+        output.append({
+            "mode": mode,
+            "block_depth": depth,
+            "format": fmt,
+            "time_exponent": scaling_exponent([p["bytes"] for p in fitted], [p["seconds"] for p in fitted]),
+            "memory_exponent": scaling_exponent([p["bytes"] for p in fitted], [p["rss_mb"] for p in fitted]),
+            "points": [
+                {k: p[k] for k in ("bytes", "filler_entities", "outcome", "seconds", "rss_mb", "peak_rss_mb")}
+                for p in points
+            ],
+        })
+    return output
+
+
+def run(corpus_dir: str, modes: List[str], timeout: float = 900.0) -> Dict:
+    """Parse every file listed in `corpus_dir`/manifest.json with every mode."""
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    results = []
+    for entry in manifest:
+        for mode in modes:
+            if mode == "mmap" and entry.get("binary"):
+                continue
+            measured = measure(os.path.join(corpus_dir, entry["file"]), mode, timeout)
+            results.append({**entry, "mode": mode, **measured})
+    return {
+        "curves": curves(results),
+        "malformed": [
+            {k: r[k] for k in ("file", "malformed", "mode", "outcome", "seconds")}
+            for r in results if r.get("malformed")
+        ],
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = []
+    for curve in report["curves"]:
+        lines.append(
+            f"{curve['mode']} / depth {curve['block_depth']} / {curve['format']}: "
+            f"time ~ size^{curve['time_exponent']}, memory ~ size^{curve['memory_exponent']}"
+        )
+        lines.append(f"  {'MB':>9} {'entities':>10} {'seconds':>9} {'rss_mb':>8}  outcome")
+        for p in curve["points"]:
+            lines.append(
+                f"  {p['bytes'] / 2**20:>9.3f} {p['filler_entities']:>10} {p['seconds'] or 0:>9.4f} "
+                f"{p['rss_mb'] if p['rss_mb'] is not None else '-':>8}  {p['outcome']}"
+            )
+        lines.append("")
+    if report["malformed"]:
+        lines.append(f"{'malformed':<16} {'mode':<8} {'seconds':>9}  outcome")
+        for r in report["malformed"]:
+            lines.append(f"{r['malformed']:<16} {r['mode']:<8} {r['seconds'] or 0:>9.4f}  {r['outcome']}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="Existing corpus directory (default: generate one in a temp dir)")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, help="Target file sizes, e.g. 1KB 1MB 100MB")
+    parser.add_argument("--block-depths", type=int, nargs="+", default=[0, 3])
+    parser.add_argument("--binary", action="store_true", help="Include binary DXF files")
+    parser.add_argument("--malformed", action="store_true", help="Include malformed files")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--quick", action="store_true", help="Sizes 1KB to 4MB")
+    parser.add_argument("--timeout", type=float, default=900.0, help="Seconds allowed per parse")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        report = run(args.corpus, args.modes, args.timeout)
+    else:
+        sizes = args.sizes or [parse_size(s) for s in (
+            ("1KB", "64KB", "1MB", "4MB") if args.quick else ("1KB", "64KB", "1MB", "16MB", "64MB")
+        )]
+        with tempfile.TemporaryDirectory(prefix="dxf_corpus_") as tmp:
+            build_corpus(tmp, corpus_specs(sizes, tuple(args.block_depths), args.binary, args.malformed, args.seed))
+            report = run(tmp, args.modes, args.timeout)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
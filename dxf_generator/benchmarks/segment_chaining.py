@@ -0,0 +1,93 @@
+"""
+Segment chaining benchmark.
+
+Measures SegmentChainer throughput on synthetic drawings made of shuffled,
+randomly reversed I-Beam and column outlines. Run with:
+
+    python -m dxf_generator.benchmarks.segment_chaining --sizes 10000 100000 250000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+from dxf_generator.services.segment_chainer import SegmentChainer
+
+IBEAM_OUTLINE = [
+    (0, 0), (100, 0), (100, 10), (54, 10), (54, 190), (100, 190),
+    (100, 200), (0, 200), (0, 190), (46, 190), (46, 10), (0, 10)
+]
+COLUMN_OUTLINE = [(0, 0), (300, 0), (300, 400), (0, 400)]
+
+
+def make_segments(count: int, seed: int = 0) -> list:
+    """
+    Build at least `count` segments forming closed profiles on a grid.
+
+    Args:
+        count: Minimum number of segments
+        seed: Random seed for shuffling and reversal
+
+    Returns:
+        List of ((x1, y1), (x2, y2)) segments
+    """
+    rng = random.Random(seed)
+    segments = []
+    index = 0
+    while len(segments) < count:
+        outline = IBEAM_OUTLINE if index % 2 == 0 else COLUMN_OUTLINE
+        ox, oy = (index % 1000) * 500.0, (index // 1000) * 500.0
+        points = [(x + ox, y + oy) for x, y in outline]
+        for start, end in zip(points, points[1:] + points[:1]):
+            segments.append((end, start) if rng.random() < 0.5 else (start, end))
+        index += 1
+    rng.shuffle(segments)
+    return segments
+
+
+def run(sizes: List[int], repeats: int = 3) -> List[Dict]:
+    """
+    Time SegmentChainer.chain for each drawing size (best of `repeats`).
+
+    Returns:
+        One result dict per size
+    """
+    results = []
+    chainer = SegmentChainer()
+    for size in sizes:
+        segments = make_segments(size)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            loops = chainer.chain(segments)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.append({
+            "segments": len(segments),
+            "loops": len(loops),
+            "seconds": round(best, 4),
+            "segments_per_sec": round(len(segments) / best) if best > 0 else None
+        })
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 250_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeats)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'Segments':<12} {'Loops':<10} {'Time (sec)':<12} {'Segments/sec':<14}")
+    print("-" * 48)
+    for r in results:
+        print(f"{r['segments']:<12} {r['loops']:<10} {r['seconds']:<12} {r['segments_per_sec']:<14}")
+
+
+if __name__ == "__main__":
+    main()
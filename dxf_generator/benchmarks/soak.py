@@ -0,0 +1,352 @@
+"""
+Soak test for memory, file-descriptor, thread and temp-file leaks.
+
+Drives mixed open-loop traffic (I-Beams, columns, batches and DXF uploads)
+for a long time and samples the server process between bursts: RSS, open
+file descriptors, threads, orphaned temp files and cache bytes. After a
+warm-up (caches filling, pools starting) every metric should be flat; the
+run fails when the least-squares slope of any of them exceeds its limit
+per hour. Run with:
+
+    python -m dxf_generator.benchmarks.soak --duration 4h --rate 50
+    python -m dxf_generator.benchmarks.soak --duration 10m --rate 20 --max-rss-mb-per-hour 20 --json
+    python -m dxf_generator.benchmarks.soak --url http://localhost:8000 --pid 1234 --pid 1235 --workdir /srv/dxf
+
+In-process runs work in a temporary directory, so only files left behind by
+the app count as orphans. Against a server, --pid names the processes to
+sample (summed over several workers) and --workdir the directory the server
+writes its temp_*.dxf, batch item .dxf and *_batch_*.zip files to. A temp file counts as
+orphaned once it is older than --orphan-age seconds; cleanup runs after the
+response, so younger files are still in flight. Process metrics come from
+/proc and are skipped where it is not available. Exits with status 1 when
+any slope is over its limit.
+"""
+import argparse
+import asyncio
+import fnmatch
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from dxf_generator.benchmarks.load_generator import LoadGenerator, _client, schedule, synthesize_workload
+from dxf_generator.benchmarks.suite import _write_lines_dxf
+
+# Files the routes create in the working directory and remove in background tasks
+# Single-request files, batch ZIPs, and batch items (<kind>_<uuid>_<index>_<dims>.dxf)
+TEMP_FILE_PATTERNS = (
+    "temp_*", "ibeams_batch_*.zip", "columns_batch_*.zip", "ibeam_*_*_*.dxf", "column_*_*_*.dxf"
+)
+
+# Allowed growth per hour after warm-up
+DEFAULT_LIMITS = {"rss_mb": 50.0, "fds": 10.0, "threads": 5.0, "temp_files": 10.0, "cache_mb": 25.0}
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """Seconds from '90', '90s', '15m' or '4h'."""
+    value = value.strip().lower()
+    if value and value[-1] in _UNITS:
+        return float(value[:-1]) * _UNITS[value[-1]]
+    return float(value)
+
+
+def read_process(pids: Sequence[int]) -> Dict[str, Optional[float]]:
+    """
+    RSS (MB), open file descriptors and threads summed over `pids`.
+
+    Values that cannot be read (no /proc, process gone) are None.
+    """
+    totals: Dict[str, Optional[float]] = {"rss_mb": 0.0, "fds": 0, "threads": 0}
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                totals["rss_mb"] += int(f.read().split()[1]) * page_size / 2**20
+        except (OSError, TypeError):
+            totals["rss_mb"] = None
+        try:
+            totals["fds"] += len(os.listdir(f"/proc/{pid}/fd"))
+        except (OSError, TypeError):
+            totals["fds"] = None
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                threads = next(int(line.split()[1]) for line in f if line.startswith("Threads:"))
+            totals["threads"] += threads
+        except (OSError, StopIteration, TypeError):
+            totals["threads"] = None
+    if totals["rss_mb"] is not None:
+        totals["rss_mb"] = round(totals["rss_mb"], 2)
+    return totals
+
+
+def count_orphans(directory: str, min_age: float, now: Optional[float] = None) -> int:
+    """Temp files of the routes in `directory` older than `min_age` seconds."""
+    now = time.time() if now is None else now
+    count = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not any(fnmatch.fnmatch(entry.name, p) for p in TEMP_FILE_PATTERNS):
+                continue
+            try:
+                if now - entry.stat().st_mtime >= min_age:
+                    count += 1
+            except FileNotFoundError:
+                continue
+    return count
+
+
+def cache_megabytes(prometheus_text: str) -> float:
+    """Sum of the dxf_cache_bytes gauges in a Prometheus scrape, in MB."""
+    total = 0.0
+    for line in prometheus_text.splitlines():
+        if line.startswith("dxf_cache_bytes{"):
+            total += float(line.rsplit(" ", 1)[1])
+    return round(total / 2**20, 3)
+
+
+def slope_per_hour(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares slope of (seconds, value) points, per hour; None below two distinct times."""
+    if len(points) < 2:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if var_t == 0:
+        return None
+    covariance = sum((t - mean_t) * (v - mean_v) for t, v in points)
+    return covariance / var_t * 3600
+
+
+def evaluate(samples: List[Dict], limits: Dict[str, float], warmup: float = 0.2) -> List[Dict]:
+    """
+    Fit a slope to every limited metric over the samples after the warm-up.
+
+    Args:
+        samples: Samples with 't' (seconds since start) and metric values
+        limits: Allowed growth per hour by metric name
+        warmup: Fraction of the run excluded from the fit
+
+    Returns:
+        One verdict per metric; metrics that were never measured pass with slope None
+    """
+    end = samples[-1]["t"] if samples else 0.0
+    kept = [s for s in samples if s["t"] >= end * warmup]
+    verdicts = []
+    for metric, limit in limits.items():
+        points = [(s["t"], s[metric]) for s in kept if s.get(metric) is not None]
+        slope = slope_per_hour(points)
+        verdicts.append({
+            "metric": metric,
+            "slope_per_hour": round(slope, 3) if slope is not None else None,
+            "limit_per_hour": limit,
+            "first": points[0][1] if points else None,
+            "last": points[-1][1] if points else None,
+            "passed": slope is None or slope <= limit,
+        })
+    return verdicts
+
+
+def _write_upload(directory: str) -> str:
+    """A small closed outline for the parse endpoint."""
+    path = os.path.join(directory, "soak_upload.dxf")
+    corners = [(0, 0), (300, 0), (300, 150), (0, 150)]
+    _write_lines_dxf(path, list(zip(corners, corners[1:] + corners[:1])))
+    return path
+
+
+def build_chunk(count: int, seed: int, upload: Optional[str], parse_share: float) -> List[Dict]:
+    """One burst of the synthetic mix with a share of uploads replacing generation requests."""
+    records = synthesize_workload(count, seed)
+    if upload and parse_share > 0:
+        rng = random.Random(seed)
+        for i in range(len(records)):
+            if rng.random() < parse_share:
+                records[i] = {"method": "POST", "path": "/api/v1/parse", "file": upload}
+    return records
+
+
+class SoakTest:
+    """
+    Alternates bursts of `rate * sample_interval` open-loop requests with a
+    sample of the process metrics, so each sample is taken with no request
+    of this client in flight.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        pids: Sequence[int],
+        workdir: Optional[str],
+        orphan_age: float = 30.0,
+        in_process: bool = False
+    ):
+        self.client = client
+        self.pids = pids
+        self.workdir = workdir
+        self.orphan_age = orphan_age
+        self.in_process = in_process
+        self.samples: List[Dict] = []
+        self.requests = 0
+        self.errors = 0
+
+    async def sample(self, elapsed: float) -> Dict:
+        if self.in_process:
+            # Collect cycles so RSS reflects live objects, not garbage awaiting collection
+            gc.collect()
+        values: Dict = {"t": round(elapsed, 3), "requests": self.requests, "errors": self.errors}
+        values.update(read_process(self.pids))
+        values["temp_files"] = count_orphans(self.workdir, self.orphan_age) if self.workdir else None
+        try:
+            response = await self.client.get("/metrics/prometheus")
+            values["cache_mb"] = cache_megabytes(response.text)
+        except httpx.HTTPError:
+            values["cache_mb"] = None
+        self.samples.append(values)
+        return values
+
+    async def run(
+        self,
+        duration: float,
+        rate: float,
+        sample_interval: float,
+        seed: int = 0,
+        upload: Optional[str] = None,
+        parse_share: float = 0.1,
+        progress=None
+    ) -> float:
+        """Drive traffic for `duration` seconds; returns the elapsed time."""
+        generator = LoadGenerator(self.client)
+        start = time.perf_counter()
+        await self.sample(0.0)
+        chunk = 0
+        while time.perf_counter() - start < duration:
+            records = build_chunk(max(1, round(rate * sample_interval)), seed + chunk, upload, parse_share)
+            await generator.open_loop(records, schedule(records, rate))
+            self.requests += len(generator.samples)
+            self.errors += sum(1 for s in generator.samples if s["status"] == 0 or s["status"] >= 500)
+            generator.samples.clear()
+            chunk += 1
+            values = await self.sample(time.perf_counter() - start)
+            if progress:
+                progress(values)
+        return time.perf_counter() - start
+
+
+async def run_soak(
+    duration: float,
+    rate: float,
+    sample_interval: float = 60.0,
+    url: Optional[str] = None,
+    pids: Optional[Sequence[int]] = None,
+    workdir: Optional[str] = None,
+    orphan_age: float = 30.0,
+    parse_share: float = 0.1,
+    limits: Optional[Dict[str, float]] = None,
+    warmup: float = 0.2,
+    seed: int = 0,
+    timeout: float = 60.0,
+    progress=None
+) -> Dict:
+    """
+    Run a soak test and return its samples and verdicts.
+
+    Without `url` the app is driven in-process from a temporary working
+    directory, and this process is the one sampled.
+    """
+    limits = limits or DEFAULT_LIMITS
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="dxf_soak_") as tmp:
+        if not url:
+            os.chdir(tmp)
+            pids, workdir = [os.getpid()], tmp
+        try:
+            async with _client(url, timeout) as client:
+                soak = SoakTest(client, pids or [], workdir, orphan_age, in_process=not url)
+                elapsed = await soak.run(duration, rate, sample_interval, seed, _write_upload(tmp), parse_share, progress)
+        finally:
+            os.chdir(cwd)
+
+    verdicts = evaluate(soak.samples, limits, warmup)
+    return {
+        "target": url or "in-process",
+        "duration_s": round(elapsed, 3),
+        "rate": rate,
+        "requests": soak.requests,
+        "error_rate": round(soak.errors / soak.requests, 4) if soak.requests else 0.0,
+        "verdicts": verdicts,
+        "passed": all(v["passed"] for v in verdicts),
+        "samples": soak.samples,
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"soak against {report['target']}: {report['requests']} requests in {report['duration_s']}s "
+        f"at {report['rate']} req/s, errors {report['error_rate']:.2%}",
+        "",
+        f"{'metric':<11} {'first':>10} {'last':>10} {'slope/h':>10} {'limit/h':>10}  result",
+    ]
+    for v in report["verdicts"]:
+        slope = f"{v['slope_per_hour']:.3f}" if v["slope_per_hour"] is not None else "-"
+        first = v["first"] if v["first"] is not None else "-"
+        last = v["last"] if v["last"] is not None else "-"
+        result = "ok" if v["passed"] else "GROWING"
+        lines.append(f"{v['metric']:<11} {first:>10} {last:>10} {slope:>10} {v['limit_per_hour']:>10}  {result}")
+    lines.append("")
+    lines.append("PASSED" if report["passed"] else "FAILED")
+    return "\n".join(lines)
+
+
+def _print_progress(values: Dict) -> None:
+    print(
+        f"t={values['t']:.0f}s requests={values['requests']} rss_mb={values['rss_mb']} fds={values['fds']} "
+        f"threads={values['threads']} temp_files={values['temp_files']} cache_mb={values['cache_mb']}",
+        file=sys.stderr
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=parse_duration, default=3600.0, help="Run time: 90s, 15m, 4h")
+    parser.add_argument("--rate", type=float, default=20.0, help="Open-loop rate in req/s")
+    parser.add_argument("--sample-interval", type=parse_duration, default=60.0, help="Seconds between samples")
+    parser.add_argument("--warmup", type=float, default=0.2, help="Fraction of the run left out of the fit")
+    parser.add_argument("--parse-share", type=float, default=0.1, help="Share of requests that upload a DXF")
+    parser.add_argument("--url", help="Server base URL (default: drive the app in-process)")
+    parser.add_argument("--pid", type=int, action="append", help="Server process to sample (repeat per worker)")
+    parser.add_argument("--workdir", help="Server working directory to scan for orphaned temp files")
+    parser.add_argument("--orphan-age", type=float, default=30.0, help="Age (s) at which a temp file is orphaned")
+    for metric, limit in DEFAULT_LIMITS.items():
+        flag = metric.replace("_", "-")
+        parser.add_argument(f"--max-{flag}-per-hour", type=float, default=limit, dest=f"max_{metric}",
+                            help=f"Allowed {metric} growth per hour (default {limit})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Application log level (in-process runs)")
+    args = parser.parse_args(argv)
+    if args.url and not args.pid:
+        parser.error("--url needs --pid to sample the server process")
+
+    if not args.url:
+        from dxf_generator.config.logging_config import logger
+        logger.setLevel(args.log_level.upper())
+    limits = {metric: getattr(args, f"max_{metric}") for metric in DEFAULT_LIMITS}
+    report = asyncio.run(run_soak(
+        args.duration, args.rate, args.sample_interval, args.url, args.pid, args.workdir, args.orphan_age,
+        args.parse_share, limits, args.warmup, args.seed, args.timeout, _print_progress
+    ))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
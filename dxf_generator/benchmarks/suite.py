@@ -0,0 +1,468 @@
+"""
+Benchmark suite.
+
+Times the real generation, batch, parse, ZIP and cache code paths in-process
+and compares the results against a stored baseline. Every case works on
+private CacheManager/BatchProcessor instances and a temporary directory, so
+running it inside the web app leaves the live caches untouched. Run with:
+
+    python -m dxf_generator.benchmarks.suite --quick
+    python -m dxf_generator.benchmarks.suite --save-baseline baseline.json
+    python -m dxf_generator.benchmarks.suite --baseline baseline.json --json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from typing import Callable, Dict, List, Optional
+
+from dxf_generator.benchmarks.large_file_parse import make_file
+from dxf_generator.benchmarks.segment_chaining import make_segments
+from dxf_generator.config.logging_config import logger
+from dxf_generator.domain.column import Column
+from dxf_generator.domain.ibeam import IBeam
+from dxf_generator.services.batch_processor import BatchProcessor
+from dxf_generator.services.cache_manager import CacheManager
+from dxf_generator.services.dxf_generator import DXFGenerator
+from dxf_generator.services.dxf_parser import DXFParser
+
+FULL_BATCH_SIZES = [1, 10, 100, 1000, 5000]
+QUICK_BATCH_SIZES = [1, 10, 100]
+
+# Latency regressions are judged on the median, which is stable across runs
+REGRESSION_METRIC = "p50_ms"
+
+
+def _stats(samples_s: List[float], elapsed_s: float, **extra) -> Dict:
+    """Summarize per-iteration durations (seconds) as milliseconds."""
+    ordered = sorted(samples_s)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "iterations": len(ordered),
+        "seconds": round(elapsed_s, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "ops_per_sec": round(len(ordered) / elapsed_s, 1) if elapsed_s > 0 else None,
+        **extra,
+    }
+
+
+def _time(func: Callable[[int], object], iterations: int, **extra) -> Dict:
+    """Call func(i) for each iteration and time every call."""
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples, time.perf_counter() - start, **extra)
+
+
+def make_components(count: int, offset: int = 0) -> List:
+    """Distinct I-Beams and columns (every one a cache miss) near a valid base size."""
+    components = []
+    for i in range(offset, offset + count):
+        dx, dy = (i % 1000) * 0.01, (i // 1000) * 0.01
+        if i % 2 == 0:
+            components.append(IBeam(300 + dx, 150 + dy, 8, 12))
+        else:
+            components.append(Column(300 + dx, 400 + dy))
+    return components
+
+
+def bench_generation(tmp: str, iterations: int) -> List[Dict]:
+    """Single generation through a cache: cold (miss and generate) and warm (hit)."""
+    cache = CacheManager(max_size=iterations, name="bench_generation")
+    components = make_components(iterations)
+    keys = [cache.get_key(c) for c in components]
+
+    def cold(i):
+        if cache.get(keys[i]) is None:
+            cache.set(keys[i], DXFGenerator.generate(components[i], os.path.join(tmp, f"cold_{i}.dxf")))
+
+    def warm(i):
+        content = cache.get(keys[i % len(keys)])
+        assert content is not None
+
+    return [
+        {"name": "generate.cold", **_time(cold, iterations)},
+        {"name": "generate.warm", **_time(warm, iterations * 10)},
+    ]
+
+
+def bench_batch(tmp: str, sizes: List[int], repeats: int) -> List[Dict]:
+    """
+    Batch generation on a private BatchProcessor, timed until every file is
+    written (not just until submission returns). Its queue holds the
+    largest size, so admission control never refuses the one-by-one submits.
+    """
+    processor = BatchProcessor(max_queue=max(sizes))
+    results = []
+    try:
+        for size in sizes:
+            samples = []
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                components = make_components(size, offset=repeat * size)
+                done = threading.Semaphore(0)
+                errors = []
+                t0 = time.perf_counter()
+                for i, component in enumerate(components):
+                    processor.submit(
+                        DXFGenerator.generate, component,
+                        os.path.join(tmp, f"batch_{size}_{repeat}_{i}.dxf"),
+                        on_success=done.release,
+                        on_error=lambda exc: (errors.append(exc), done.release())
+                    )
+                for _ in components:
+                    done.acquire()
+                samples.append(time.perf_counter() - t0)
+                if errors:
+                    raise RuntimeError(f"batch.{size} failed: {errors[0]}")
+                for i in range(size):
+                    os.remove(os.path.join(tmp, f"batch_{size}_{repeat}_{i}.dxf"))
+            elapsed = time.perf_counter() - start
+            result = _stats(samples, elapsed, items=size)
+            result["items_per_sec"] = round(size * repeats / elapsed, 1) if elapsed > 0 else None
+            results.append({"name": f"batch.{size}", **result})
+    finally:
+        processor.shutdown(wait=True)
+    return results
+
+
+def bench_zip(tmp: str, sizes: List[int], repeats: int) -> List[Dict]:
+    """Build a batch ZIP (deflated, in memory) from generated DXF content."""
+    largest = max(sizes)
+    content = [
+        DXFGenerator.generate(c, os.path.join(tmp, f"zip_src_{i}.dxf"))
+        for i, c in enumerate(make_components(min(largest, 20)))
+    ]
+    results = []
+    for size in sizes:
+        def build(_):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+                for i in range(size):
+                    zipf.writestr(f"part_{i}.dxf", content[i % len(content)])
+            return buffer.getbuffer().nbytes
+        results.append({"name": f"zip.{size}", **_time(build, repeats, items=size)})
+    return results
+
+
+def _write_lines_dxf(path: str, segments) -> None:
+    """Write segments as an ENTITIES-only DXF of LINE entities."""
+    with open(path, "w") as f:
+        f.write("  0\nSECTION\n  2\nENTITIES\n")
+        for (x1, y1), (x2, y2) in segments:
+            f.write(
+                f"  0\nLINE\n100\nAcDbEntity\n  8\n0\n100\nAcDbLine\n"
+                f" 10\n{x1}\n 20\n{y1}\n 30\n0.0\n 11\n{x2}\n 21\n{y2}\n 31\n0.0\n"
+            )
+        f.write("  0\nENDSEC\n  0\nEOF\n")
+
+
+def bench_parse(tmp: str, quick: bool, repeats: int) -> List[Dict]:
+    """
+    DXFParser.parse on three inputs: a generated I-Beam (small), a padded file
+    above the large-file threshold (large, memory-mapped path) and a drawing of
+    shuffled, randomly reversed LINE segments (pathological for chaining).
+    """
+    small = os.path.join(tmp, "parse_small.dxf")
+    DXFGenerator.generate(IBeam(300, 150, 8, 12), small)
+
+    large = os.path.join(tmp, "parse_large.dxf")
+    large_bytes = make_file(large, 4 if quick else 32)
+
+    pathological = os.path.join(tmp, "parse_pathological.dxf")
+    segment_count = 5_000 if quick else 50_000
+    _write_lines_dxf(pathological, make_segments(segment_count))
+
+    return [
+        {"name": "parse.small", **_time(lambda _: DXFParser.parse(small), repeats * 5,
+                                        file_bytes=os.path.getsize(small))},
+        {"name": "parse.large", **_time(lambda _: DXFParser.parse(large, large_file=True), repeats,
+                                        file_bytes=large_bytes)},
+        {"name": "parse.pathological", **_time(lambda _: DXFParser.parse(pathological), repeats,
+                                               file_bytes=os.path.getsize(pathological),
+                                               segments=segment_count)},
+    ]
+
+
+def bench_cache_contention(threads: int, ops_per_thread: int) -> List[Dict]:
+    """
+    Mixed get/set (90/10) from many threads on one CacheManager sized below
+    its key space, so the run includes misses and evictions.
+    """
+    cache = CacheManager(max_size=500, name="bench_contention")
+    keys = [f"key_{i}" for i in range(1000)]
+    value = b"x" * 20_000
+    for key in keys[:500]:
+        cache.set(key, value)
+
+    samples: List[List[float]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        rng = random.Random(index)
+        own = samples[index]
+        barrier.wait()
+        for _ in range(ops_per_thread):
+            key = keys[rng.randrange(len(keys))]
+            t0 = time.perf_counter()
+            if rng.random() < 0.9:
+                cache.get(key)
+            else:
+                cache.set(key, value)
+            own.append(time.perf_counter() - t0)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    flat = [s for own in samples for s in own]
+    return [{
+        "name": "cache.contention",
+        **_stats(flat, elapsed, threads=threads, hit_rate=cache.stats["hit_rate"]),
+    }]
+
+
+def run(quick: bool = False, only: Optional[List[str]] = None) -> Dict:
+    """
+    Run the suite.
+
+    Args:
+        quick: Smaller inputs and fewer repeats (seconds instead of minutes)
+        only: Run only the case groups named here (generate, batch, zip,
+            parse, cache)
+
+    Returns:
+        Dict with 'meta' (environment, timing) and 'results' (one dict per case)
+    """
+    repeats = 3 if quick else 5
+    sizes = QUICK_BATCH_SIZES if quick else FULL_BATCH_SIZES
+    groups = {
+        "generate": lambda tmp: bench_generation(tmp, 20 if quick else 100),
+        "batch": lambda tmp: bench_batch(tmp, sizes, 1 if quick else 3),
+        "zip": lambda tmp: bench_zip(tmp, sizes, repeats),
+        "parse": lambda tmp: bench_parse(tmp, quick, repeats),
+        "cache": lambda tmp: bench_cache_contention(8, 2_000 if quick else 20_000),
+    }
+    selected = [name for name in groups if not only or name in only]
+    if only and not selected:
+        raise ValueError(f"No benchmark groups match {only}; choose from {list(groups)}")
+
+    started = time.time()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="dxf_bench_") as tmp:
+        for name in selected:
+            logger.info(f"Benchmark group '{name}' starting")
+            results.extend(groups[name](tmp))
+
+    return {
+        "meta": {
+            "started_at": started,
+            "seconds": round(time.time() - started, 2),
+            "quick": quick,
+            "groups": selected,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.25) -> Dict:
+    """
+    Compare a run against a baseline run case by case.
+
+    A case regresses when its median latency exceeds the baseline's by more
+    than `tolerance` (0.25 = 25% slower). Cases missing from either side are
+    listed but never counted as regressions.
+
+    Returns:
+        Dict with per-case 'cases', the 'regressions' names and 'passed'
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    cases = []
+    for result in current.get("results", []):
+        name = result["name"]
+        if name not in base:
+            cases.append({"name": name, "status": "new"})
+            continue
+        before, after = base[name][REGRESSION_METRIC], result[REGRESSION_METRIC]
+        ratio = after / before if before > 0 else 1.0
+        cases.append({
+            "name": name,
+            "baseline_ms": before,
+            "current_ms": after,
+            "ratio": round(ratio, 3),
+            "status": "regressed" if ratio > 1 + tolerance else "ok",
+        })
+    regressions = [c["name"] for c in cases if c["status"] == "regressed"]
+    result = {
+        "metric": REGRESSION_METRIC,
+        "tolerance": tolerance,
+        "cases": cases,
+        "regressions": regressions,
+        "passed": not regressions,
+    }
+    if current.get("meta", {}).get("quick") != baseline.get("meta", {}).get("quick"):
+        # Quick runs use smaller inputs, so per-case numbers are not comparable
+        result["warning"] = "baseline and current run differ in --quick"
+    return result
+
+
+def load_report(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: Dict, path: str) -> None:
+    """Write a run atomically (a baseline is never left half-written)."""
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def format_table(report: Dict) -> str:
+    """Render a run (and its baseline comparison, if any) as a text table."""
+    comparison = {c["name"]: c for c in report.get("comparison", {}).get("cases", [])}
+    lines = [
+        f"{'Case':<22} {'Iter':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'Per sec':>10}  {'vs baseline':<12}",
+        "-" * 76,
+    ]
+    for r in report["results"]:
+        case = comparison.get(r["name"])
+        versus = ""
+        if case and case["status"] != "new":
+            versus = f"x{case['ratio']:.2f}" + (" REGRESSED" if case["status"] == "regressed" else "")
+        lines.append(
+            f"{r['name']:<22} {r['iterations']:>6} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+            f"{r.get('items_per_sec') or r['ops_per_sec'] or 0:>10.1f}  {versus:<12}"
+        )
+    return "\n".join(lines)
+
+
+class BenchmarkRunner:
+    """
+    Runs the suite as a background job, one at a time, keeping the most
+    recent `max_jobs` jobs for polling.
+    """
+
+    def __init__(self, max_jobs: int = 10):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._running: Optional[str] = None
+
+    def start(self, quick: bool = True, only: Optional[List[str]] = None,
+              baseline_path: Optional[str] = None, tolerance: float = 0.25) -> Dict:
+        """
+        Start a job in a background thread.
+
+        Raises:
+            RuntimeError: A job is already running
+        """
+        with self._lock:
+            if self._running is not None:
+                raise RuntimeError(f"Benchmark job {self._running} is already running")
+            job_id = uuid.uuid4().hex[:12]
+            job = {"id": job_id, "status": "running", "quick": quick, "only": only,
+                   "submitted_at": time.time(), "finished_at": None, "error": None, "report": None}
+            self._jobs[job_id] = job
+            self._running = job_id
+            while len(self._jobs) > self.max_jobs:
+                del self._jobs[next(iter(self._jobs))]
+        threading.Thread(
+            target=self._execute, args=(job, baseline_path, tolerance),
+            name=f"benchmark-{job_id}", daemon=True
+        ).start()
+        return dict(job)
+
+    def _execute(self, job: Dict, baseline_path: Optional[str], tolerance: float) -> None:
+        try:
+            report = run(quick=job["quick"], only=job["only"])
+            report["meta"]["log_level"] = logging.getLevelName(logger.getEffectiveLevel())
+            if baseline_path and os.path.exists(baseline_path):
+                report["comparison"] = compare(report, load_report(baseline_path), tolerance)
+            job["report"] = report
+            job["status"] = "finished"
+            logger.info(f"Benchmark job {job['id']} finished in {report['meta']['seconds']}s")
+        except Exception as e:
+            logger.error(f"Benchmark job {job['id']} failed: {e}", exc_info=True)
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+            with self._lock:
+                self._running = None
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest_finished(self) -> Optional[Dict]:
+        with self._lock:
+            for job in reversed(list(self._jobs.values())):
+                if job["status"] == "finished":
+                    return dict(job)
+        return None
+
+
+benchmark_runner = BenchmarkRunner()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs, fewer repeats")
+    parser.add_argument("--only", nargs="+", help="Case groups: generate batch zip parse cache")
+    parser.add_argument("--baseline", help="Compare against this saved run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", help="Write this run to the given path")
+    parser.add_argument("--output", help="Also write the JSON report to this path")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument(
+        "--log-level", default="WARNING",
+        help="Application log level while running (logging is part of every timed path)"
+    )
+    args = parser.parse_args(argv)
+
+    # Application logs share stdout with the report
+    logger.setLevel(args.log_level.upper())
+    report = run(quick=args.quick, only=args.only)
+    report["meta"]["log_level"] = args.log_level.upper()
+    if args.baseline:
+        report["comparison"] = compare(report, load_report(args.baseline), args.tolerance)
+    if args.save_baseline:
+        save_report(report, args.save_baseline)
+    if args.output:
+        save_report(report, args.output)
+
+    print(json.dumps(report, indent=2) if args.json else format_table(report))
+    comparison = report.get("comparison")
+    return 1 if comparison and not comparison["passed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,11 +16,26 @@ class Config:
     # Performance Settings
     MAX_THREADS = int(os.getenv("MAX_THREADS", 20)) # Increased for better concurrency
     MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 50))
+    BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", 1000)) # Background tasks allowed to wait for a thread
+    BATCH_QUEUE_TARGET_MS = float(os.getenv("BATCH_QUEUE_TARGET_MS", 500)) # Acceptable queue wait...
+    BATCH_QUEUE_INTERVAL_MS = float(os.getenv("BATCH_QUEUE_INTERVAL_MS", 2000)) # ...shed new work once it is exceeded this long
+    BATCH_LANES = os.getenv("BATCH_LANES", "interactive:20:0,batch:12:1,bulk:4:2") # name:max running tasks:priority (lower runs first)
+    BATCH_BULK_MIN_ITEMS = int(os.getenv("BATCH_BULK_MIN_ITEMS", 20)) # Batches this large run in the bulk lane
     
     # System Paths
     LOG_DIR = os.getenv("LOG_DIR", "logs")
     DXF_OUTPUT_DIR = os.getenv("DXF_OUTPUT_DIR", ".")
     
+    # Logging Settings (records are queued; one listener thread formats and writes them)
+    LOG_CONSOLE_LEVEL = os.getenv("LOG_CONSOLE_LEVEL", "INFO").upper()
+    LOG_FILE_LEVEL = os.getenv("LOG_FILE_LEVEL", "INFO").upper() # logs/app.json.log; DEBUG adds per-lookup cache events
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024)) # Rotate app.json.log beyond this size...
+    LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight") # ...and on this schedule (TimedRotatingFileHandler 'when')
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 14)) # Rotated files kept
+    LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true" # gzip rotated files
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 100000)) # Records beyond this backlog are dropped
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "") # Per-event sampling, e.g. "cache.hit=0.01,request.start=0.1"
+
     # Engineering Limits (Allowing environment overrides for existing constants)
     MAX_IBEAM_DEPTH_MM = float(os.getenv("MAX_IBEAM_DEPTH_MM", 1500))
     MIN_IBEAM_WEB_THICKNESS_MM = float(os.getenv("MIN_IBEAM_WEB_THICKNESS_MM", 3.0))
@@ -35,6 +50,54 @@ class Config:
         "text/plain", 
         "application/octet-stream"
     }
+    
+    # Parse Isolation Settings (each parse tier runs in a killable worker process)
+    PARSE_ISOLATION = os.getenv("PARSE_ISOLATION", "true").lower() == "true"
+    PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", 10)) # Wall clock, all tiers
+    PARSE_CPU_SECONDS = int(os.getenv("PARSE_CPU_SECONDS", 8)) # Per tier
+    PARSE_MEMORY_MB = int(os.getenv("PARSE_MEMORY_MB", 512)) # Per tier, on top of the worker baseline
+    PARSE_LARGE_FILE_BYTES = int(os.getenv("PARSE_LARGE_FILE_BYTES", 4 * 1024 * 1024)) # Memory-mapped scan above this size; keep <= UPLOAD_MAX_SIZE_BYTES
+
+    # Metrics Settings
+    METRICS_DIR = os.getenv("METRICS_DIR", "") # Shared snapshot directory for multi-worker /metrics/prometheus
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5)) # How often workers publish snapshots
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true" # Per-stage Server-Timing header
+    SERVER_TIMING_LOG = os.getenv("SERVER_TIMING_LOG", "false").lower() == "true" # Also log each request's stages
+
+    # Metrics History Settings (persistent time series behind /metrics/history)
+    METRICS_HISTORY_ENABLED = os.getenv("METRICS_HISTORY_ENABLED", "true").lower() == "true"
+    METRICS_HISTORY_PATH = os.getenv("METRICS_HISTORY_PATH", os.path.join(LOG_DIR, "metrics_history.db")) # SQLite file shared by workers
+    METRICS_HISTORY_INTERVAL_SECONDS = float(os.getenv("METRICS_HISTORY_INTERVAL_SECONDS", 10))
+    METRICS_HISTORY_RAW_HOURS = float(os.getenv("METRICS_HISTORY_RAW_HOURS", 24)) # 10 s samples kept
+    METRICS_HISTORY_MINUTE_DAYS = float(os.getenv("METRICS_HISTORY_MINUTE_DAYS", 14)) # 1-minute rollups kept
+    METRICS_HISTORY_HOUR_DAYS = float(os.getenv("METRICS_HISTORY_HOUR_DAYS", 365)) # 1-hour rollups kept
+
+    # Tracing Settings (in-process spans per request, exported as Chrome trace JSON)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 200)) # Most recent traces kept per worker
+    TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", 500)) # Spans per trace before further ones are dropped
+    TRACE_DIR = os.getenv("TRACE_DIR", "") # If set, each worker writes trace-<pid>.json here at shutdown
+
+    # Slow Request Settings (details of the latest requests above a latency threshold)
+    SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 1000))
+    SLOW_REQUEST_BUFFER_SIZE = int(os.getenv("SLOW_REQUEST_BUFFER_SIZE", 100)) # Requests kept per worker
+
+    # Workload Capture Settings (record generation/parse requests for replay)
+    CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+    CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures") # One ring file pair per worker
+    CAPTURE_MAX_BYTES = int(os.getenv("CAPTURE_MAX_BYTES", 64 * 1024 * 1024)) # Disk cap per worker
+    CAPTURE_QUEUE_SIZE = int(os.getenv("CAPTURE_QUEUE_SIZE", 10000)) # Records dropped beyond this backlog
+
+    # Admin Settings (profiling/diagnostics endpoints under /admin)
+    ADMIN_ENDPOINTS_ENABLED = os.getenv("ADMIN_ENDPOINTS_ENABLED", "false").lower() == "true"
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "") # Required in the X-Admin-Token header
+    PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", 60))
+    MEMORY_SNAPSHOT_LIMIT = int(os.getenv("MEMORY_SNAPSHOT_LIMIT", 5)) # tracemalloc snapshots kept per worker
+    MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 10)) # Stack depth recorded per allocation
+
+    # Benchmark Settings
+    BENCHMARK_BASELINE_PATH = os.getenv("BENCHMARK_BASELINE_PATH", "") # Saved suite run that /benchmark jobs compare against
+    BENCHMARK_REGRESSION_TOLERANCE = float(os.getenv("BENCHMARK_REGRESSION_TOLERANCE", 0.25)) # Allowed p50 slowdown
 
 # Create a singleton instance
 config = Config()
@@ -1,61 +1,309 @@
+import atexit
+import gzip
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import random
+import shutil
+import sys
 import json
-from datetime import datetime
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from dxf_generator.config.env_config import config
 
+# Id of the request being handled (set by MetricsMiddleware), stamped on every record
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class Event:
+    """
+    Message of a structured event: a name plus fields.
+
+    Nothing is rendered until a handler formats the record, and callable
+    field values (e.g. `data=lambda: request.model_dump()`) are only called
+    then, so a suppressed event costs a level check and no formatting.
+    """
+    __slots__ = ("name", "_fields", "_resolved")
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self._fields = fields
+        self._resolved = None
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        if self._resolved is None:
+            self._resolved = {k: v() if callable(v) else v for k, v in self._fields.items()}
+        return self._resolved
+
+    def __str__(self):
+        return " ".join([self.name] + [f"{k}={v}" for k, v in self.fields.items()])
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "event=rate,event=rate" (e.g. "cache.hit=0.01") into a dict."""
+    rates = {}
+    for item in spec.split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+_sample_rates = parse_sample_rates(config.LOG_SAMPLE_RATES)
+_logger = logging.getLogger("dxf_generator")
+
+
+def log_event(name: str, level: int = logging.DEBUG, sample: float = 1.0, **fields) -> None:
+    """
+    Log a structured event without formatting anything unless it is emitted.
+
+    Args:
+        name: Dotted event name (e.g. "cache.hit")
+        level: Logging level
+        sample: Fraction of events kept; LOG_SAMPLE_RATES overrides it per name.
+            Kept events of a sampled name carry `sample_rate` so counts can be scaled.
+        **fields: Event fields; callables are evaluated only when emitted
+    """
+    if not _logger.isEnabledFor(level):
+        return
+    rate = _sample_rates.get(name, sample)
+    if rate < 1.0:
+        if random.random() >= rate:
+            return
+        fields["sample_rate"] = rate
+    _logger.log(level, Event(name, fields), stacklevel=2)
+
+
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured JSON logging."""
     def format(self, record):
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Records are formatted on the listener thread; stamp them with their creation time
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat(),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "function": record.funcName,
         }
+        if isinstance(record.msg, Event):
+            # Resolved here, on the listener thread, not where it was logged
+            log_data["event"] = record.msg.name
+            log_data["fields"] = record.msg.fields
+        if getattr(record, "request_id", None):
+            log_data["request_id"] = record.request_id
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-        
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
+
         # Add extra fields if they exist
         if hasattr(record, "duration_ms"):
             log_data["duration_ms"] = record.duration_ms
         if hasattr(record, "status_code"):
             log_data["status_code"] = record.status_code
-            
-        return json.dumps(log_data)
 
-def setup_logging():
-    """Configure centralized logging for the application."""
-    # Ensure logs directory exists
-    log_dir = os.path.join(os.getcwd(), config.LOG_DIR)
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+        return json.dumps(log_data, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """
+    Rotates on a time schedule (like TimedRotatingFileHandler) and also as soon
+    as the file would exceed max_bytes. Rotated files are gzip-compressed when
+    compress is set; backup_count limits how many are kept.
+    """
+
+    def __init__(self, filename, max_bytes=0, when="midnight", backup_count=0, compress=True):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._compress
+
+    def emit(self, record):
+        # Another worker may have rotated the shared file; follow it like WatchedFileHandler
+        if self.stream is not None:
+            try:
+                moved = os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+            except OSError:
+                moved = True
+            if moved:
+                self.stream.close()
+                self.stream = None
+        super().emit(record)
+
+    def shouldRollover(self, record):
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            position = self.stream.tell()
+            if position and position + len(self.format(record)) + 1 >= self.max_bytes:
+                return True
+        return super().shouldRollover(record)
+
+    def rotation_filename(self, default_name):
+        # Size rotations can happen several times per time interval (and across
+        # restarts); number them so no earlier backup is overwritten
+        sequence = 1
+        while True:
+            name = super().rotation_filename(f"{default_name}.{sequence}")
+            if not os.path.exists(name):
+                return name
+            sequence += 1
+
+    def getFilesToDelete(self):
+        """Rotated files beyond backup_count, oldest (by modification time) first."""
+        directory, base = os.path.split(self.baseFilename)
+        rotated = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(base + ".") and name != base
+        ]
+        if len(rotated) <= self.backupCount:
+            return []
+        rotated.sort(key=os.path.getmtime)
+        return rotated[:len(rotated) - self.backupCount]
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
 
-    # Base logger
-    logger = logging.getLogger("dxf_generator")
-    # Set to DEBUG to capture all levels (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    logger.setLevel(logging.DEBUG)
 
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for the listener thread without blocking; when the queue
+    is full the record is dropped and counted instead of stalling the caller.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The record never leaves the process, so msg, args and exc_info go to
+        # the listener as they are and its handlers do all of the formatting.
+        # The only context that changes under the caller, the request id, was
+        # already stamped on the record by RequestIdFilter.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request id on the thread that logs them."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+_listener = None
+
+
+def build_handlers(log_dir, stream=None):
+    """
+    Console and rotating JSON file handlers at their configured levels.
+
+    Args:
+        log_dir: Directory for app.json.log and its rotated files
+        stream: Console stream (default stdout)
+    """
     # Standard Console Handler (Human readable for development)
-    console_handler = logging.StreamHandler(sys.stdout)
-    # Set console to DEBUG to show everything as requested by user
-    console_handler.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
+    console_handler.setLevel(config.LOG_CONSOLE_LEVEL)
     console_formatter = logging.Formatter(
         '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
 
-    # JSON File Handler (Structured for production/monitoring)
-    file_handler = logging.FileHandler(os.path.join(log_dir, "app.json.log"))
-    # File captures everything including DEBUG and ERROR
-    file_handler.setLevel(logging.DEBUG)
+    # JSON File Handler (Structured for production/monitoring), rotated and compressed
+    file_handler = SizeAndTimeRotatingFileHandler(
+        os.path.join(log_dir, "app.json.log"),
+        max_bytes=config.LOG_MAX_BYTES,
+        when=config.LOG_ROTATE_WHEN,
+        backup_count=config.LOG_BACKUP_COUNT,
+        compress=config.LOG_COMPRESS
+    )
+    file_handler.setLevel(config.LOG_FILE_LEVEL)
     file_handler.setFormatter(StructuredFormatter())
-    logger.addHandler(file_handler)
+    return [console_handler, file_handler]
+
+
+def install_handlers(handlers, queued=True):
+    """
+    Route the dxf_generator logger to `handlers`, replacing the current ones.
+
+    With queued=True callers only enqueue records (DroppingQueueHandler) and a
+    QueueListener thread formats and writes them, honouring each handler's
+    level; otherwise the handlers run synchronously on the calling thread.
+    """
+    global _listener
+
+    logger = logging.getLogger("dxf_generator")
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+    logger.addFilter(RequestIdFilter())
+    # These handlers own the output; a root handler would format every record
+    # (and resolve its event fields) again on the calling thread
+    logger.propagate = False
 
+    # The logger level is the most verbose handler level, so calls below it
+    # return at the isEnabledFor check without building or queueing a record
+    logger.setLevel(min(handler.level for handler in handlers))
+    if not queued:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+    logger.addHandler(queue_handler)
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
     return logger
 
+
+def setup_logging():
+    """Configure centralized logging for the application."""
+    # Ensure logs directory exists
+    log_dir = os.path.join(os.getcwd(), config.LOG_DIR)
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    return install_handlers(build_handlers(log_dir))
+
+
+def stop_logging():
+    """Write out queued records and stop the listener thread (registered at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def flush_logging(timeout: float = 5.0):
+    """Wait until the listener has written every record queued so far."""
+    if _listener is None:
+        return
+    deadline = time.monotonic() + timeout
+    while _listener.queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+atexit.register(stop_logging)
+
 # Initialize logger instance
 logger = setup_logging()
@@ -33,3 +33,6 @@ MIN_COLUMN_WIDTH_MM = 100       # Minimum column width for structural integrity
 MIN_COLUMN_HEIGHT_MM = 200      # Minimum column height for structural integrity
 MAX_COLUMN_ASPECT_RATIO = 3.0   # Height/width ratio limit (prevents overly tall/thin columns)
 MIN_COLUMN_ASPECT_RATIO = 0.33  # Width/height ratio limit (prevents overly wide/short columns)
+
+# --- Parsing ---
+ENDPOINT_MATCH_TOLERANCE_MM = 0.01  # Max gap between segment endpoints treated as joined
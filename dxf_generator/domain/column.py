@@ -4,6 +4,7 @@ from .base_component import BaseComponent
 from dxf_generator.validators.column_validator import ColumnValidator
 # Import DXFDrawing for generating drawings
 from dxf_generator.drawing.drawing import DXFDrawing
+from dxf_generator.monitoring.stage_timer import stage
 
 class Column(BaseComponent):
 
@@ -16,7 +17,8 @@ class Column(BaseComponent):
         }
 
         # 🔒 Mandatory validation
-        ColumnValidator.validate(self.data)
+        with stage("validate"):
+            ColumnValidator.validate(self.data)
 
     def generate_dxf(self, filepath: str):
         # Create a new DXF drawing instance
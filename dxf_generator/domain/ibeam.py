@@ -1,6 +1,7 @@
 from .base_component import BaseComponent
 from dxf_generator.validators.ibeam_validator import IBeamValidator
 from dxf_generator.drawing.drawing import DXFDrawing
+from dxf_generator.monitoring.stage_timer import stage
 
 
 class IBeam(BaseComponent):
@@ -20,7 +21,8 @@ class IBeam(BaseComponent):
         }
 
         #  Enforce validation immediately (client requirement)
-        IBeamValidator.validate(self.data)
+        with stage("validate"):
+            IBeamValidator.validate(self.data)
 
     def generate_dxf(self, filepath: str):
         # Create DXF drawing
@@ -1,9 +1,11 @@
 import ezdxf
+from dxf_generator.monitoring.stage_timer import stage
 
 class DXFDrawing:
     def __init__(self):
         # Create a new DXF document and modelspace
-        self.doc = ezdxf.new()
+        with stage("ezdxf_new"):
+            self.doc = ezdxf.new()
         self.msp = self.doc.modelspace()
 
     def draw_ibeam(self, data: dict):
@@ -32,7 +34,8 @@ class DXFDrawing:
             (0, 0)                             # Close
         ]
 
-        self.msp.add_lwpolyline(points, close=True)
+        with stage("polyline"):
+            self.msp.add_lwpolyline(points, close=True)
 
     def draw_column(self, data: dict):
         """
@@ -49,10 +52,12 @@ class DXFDrawing:
             (0, 0)
         ]
 
-        self.msp.add_lwpolyline(points, close=True)
+        with stage("polyline"):
+            self.msp.add_lwpolyline(points, close=True)
 
     def save(self, filepath: str):
         """
         Save DXF file to disk
         """
-        self.doc.saveas(filepath)
+        with stage("saveas"):
+            self.doc.saveas(filepath)
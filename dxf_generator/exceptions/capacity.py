@@ -0,0 +1,12 @@
+class OverloadedError(Exception):
+    """Raised when work is shed because the background queue is saturated"""
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch has more tasks than its lane's queue can ever hold"""
+    status_code = 413
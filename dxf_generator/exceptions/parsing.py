@@ -0,0 +1,7 @@
+class ParseLimitError(ValueError):
+    """Raised when parsing a DXF exceeds its resource budget"""
+    status_code = 422
+
+class ParseTimeoutError(ParseLimitError):
+    """Raised when parsing a DXF exceeds its time budget"""
+    status_code = 408
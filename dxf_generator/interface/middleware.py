@@ -0,0 +1,375 @@
+"""
+Request middleware - Pure ASGI request instrumentation.
+Single Responsibility: Observe HTTP requests as they pass through and hand what was seen to the monitoring recorders.
+"""
+import os
+import re
+import time
+import uuid
+from dxf_generator.config.logging_config import log_event, logger, request_id
+from dxf_generator.monitoring.request_metrics import RequestMetrics, request_metrics
+from dxf_generator.monitoring.slow_requests import SlowRequestRecorder
+from dxf_generator.monitoring.stage_timer import current_timings, start_request
+from dxf_generator.monitoring.tracing import TraceRecorder, start_trace
+from dxf_generator.monitoring.workload_capture import CaptureRecorder, describe_payload
+
+# Requests to these prefixes are logged but not counted (scrapes would dominate)
+EXCLUDED_PREFIXES = ("/metrics",)
+
+# A client-supplied X-Request-ID is kept only if it looks like an id
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+def incoming_request_id(scope) -> str:
+    """The request's X-Request-ID header if usable, else a fresh id."""
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex[:16]
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency histograms per route and status class.
+    Response messages are forwarded untouched (apart from an X-Request-ID
+    header), so streaming bodies are not buffered; the recorded latency spans
+    until the last body chunk is sent. The request id is set for the whole
+    request, so every record logged while handling it carries the id.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope["client"][0] if scope.get("client") else None
+        status_code = 500
+        rid = incoming_request_id(scope)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        token = request_id.set(rid)
+
+        try:
+            log_event(
+                "request.start",
+                method=method,
+                path=path,
+                query=lambda: scope.get("query_string", b"").decode("latin-1"),
+                client=client
+            )
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                process_time = (time.perf_counter() - start) * 1000
+                self._record(scope, method, path, 500, process_time, client)
+                logger.error(
+                    f"Unhandled exception during {method} {path}: {str(e)}",
+                    exc_info=True,
+                    extra={
+                        "duration_ms": round(process_time, 2),
+                        "method": method,
+                        "path": path
+                    }
+                )
+                raise
+
+            process_time = (time.perf_counter() - start) * 1000
+            self._record(scope, method, path, status_code, process_time, client)
+
+            log_msg = f"{method} {path} - {status_code} ({process_time:.2f}ms)"
+            log_extra = {
+                "duration_ms": round(process_time, 2),
+                "status_code": status_code,
+                "method": method,
+                "path": path
+            }
+
+            if status_code >= 500:
+                logger.error(log_msg, extra=log_extra)
+            elif status_code >= 400:
+                logger.warning(log_msg, extra=log_extra)
+            else:
+                logger.info(log_msg, extra=log_extra)
+        finally:
+            request_id.reset(token)
+
+    def _record(self, scope, method: str, path: str, status_code: int, duration_ms: float, client) -> None:
+        if path.startswith(EXCLUDED_PREFIXES):
+            return
+        self.metrics.record(self.route_label(scope, method), status_code, duration_ms, client)
+
+    @staticmethod
+    def route_label(scope, method: str) -> str:
+        """
+        Label a request by its matched route template.
+
+        The router stores the matched route in the (shared) scope, so it is
+        available once the inner app has run. Unmatched paths share one label.
+        """
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        return f"{method} {template}" if template else f"{method} <unmatched>"
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware exposing per-stage durations as a Server-Timing header.
+    Stages recorded with monitoring.stage_timer.stage() anywhere in the
+    request (including batch tasks on executor threads) are summed per name.
+    """
+
+    def __init__(self, app, log_timings: bool = False):
+        self.app = app
+        self.log_timings = log_timings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = start_request()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                header = timings.header(total_ms)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1")),
+                    (b"timing-allow-origin", b"*"),
+                ]
+                if self.log_timings:
+                    logger.info(
+                        f"Stage timings {scope['method']} {scope['path']}: {header}",
+                        extra={"stages": timings.as_dict()}
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# Diagnostics are not traced (reading traces would otherwise record itself)
+UNTRACED_PREFIXES = EXCLUDED_PREFIXES + ("/admin",)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a trace per request, keyed by its request id.
+    The root span is named after the matched route; spans opened below it
+    (stages, generation, executor tasks) nest under it. The trace is handed
+    to the recorder once the response is complete; batch tasks still
+    running add their spans to it afterwards.
+    """
+
+    def __init__(self, app, recorder: TraceRecorder, max_spans: int = 500):
+        self.app = app
+        self.recorder = recorder
+        self.max_spans = max_spans
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNTRACED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        trace_id = request_id.get() or uuid.uuid4().hex[:16]
+        with start_trace(trace_id, f"{method} {scope['path']}", self.max_spans, path=scope["path"]) as trace:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                trace.root.name = MetricsMiddleware.route_label(scope, method)
+                trace.root.attrs["status"] = status_code
+                self.recorder.add(trace)
+
+
+def _content_type(scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"content-type":
+            return value.decode("latin-1").lower()
+    return ""
+
+
+# Uploads only need their multipart headers (filename); JSON specs are kept up to each middleware's cap
+UPLOAD_HEAD_BYTES = 4096
+
+
+class _BodyTap:
+    """Wraps `receive`, keeping the first `keep` bytes of the body as the app reads it."""
+
+    def __init__(self, receive, keep: int):
+        self._receive = receive
+        self.keep = keep
+        self.chunks = []
+        self.kept = 0
+        self.payload_bytes = 0
+
+    async def receive(self):
+        message = await self._receive()
+        if message["type"] == "http.request":
+            body = message.get("body", b"")
+            self.payload_bytes += len(body)
+            if self.kept < self.keep:
+                self.chunks.append(body[:self.keep - self.kept])
+                self.kept += len(self.chunks[-1])
+        return message
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(self.chunks)
+
+    @property
+    def truncated(self) -> bool:
+        return self.payload_bytes > self.kept
+
+    @classmethod
+    def for_request(cls, receive, content_type: str, max_body_bytes: int) -> "_BodyTap":
+        return cls(receive, UPLOAD_HEAD_BYTES if content_type.startswith("multipart/") else max_body_bytes)
+
+
+class _ResponseTap:
+    """Wraps `send`, noting the response status and X-Cache outcome as they go out."""
+
+    def __init__(self, send):
+        self._send = send
+        self.status_code = 500
+        self.cache = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+            for name, value in message.get("headers", []):
+                if name == b"x-cache":
+                    self.cache = value.decode("latin-1")
+                    break
+        await self._send(message)
+
+
+class SlowRequestMiddleware:
+    """
+    ASGI middleware keeping requests slower than the recorder's threshold.
+    Each is stored with its canonical spec, stage timings, X-Cache outcome,
+    queue wait and worker, and becomes the exemplar of the latency bucket
+    it fell into. Sits inside ServerTimingMiddleware to share its stage
+    timings (and starts its own when that middleware is disabled). It sees
+    every request, so only the first `max_body_bytes` of a body are kept;
+    a longer spec is recorded by its size alone.
+    """
+
+    def __init__(
+        self,
+        app,
+        recorder: SlowRequestRecorder,
+        metrics: RequestMetrics = request_metrics,
+        max_body_bytes: int = 16 * 1024
+    ):
+        self.app = app
+        self.recorder = recorder
+        self.metrics = metrics
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNTRACED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        ts = time.time()
+        start = time.perf_counter()
+        timings = current_timings() or start_request()
+        content_type = _content_type(scope)
+        tap = _BodyTap.for_request(receive, content_type, self.max_body_bytes)
+        response = _ResponseTap(send)
+
+        try:
+            await self.app(scope, tap.receive, response.send)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if self.recorder.is_slow(duration_ms):
+                self._record(
+                    scope, ts, duration_ms, response.status_code, response.cache,
+                    timings.as_dict(), content_type, tap
+                )
+
+    def _record(self, scope, ts, duration_ms, status_code, cache, stages, content_type, tap) -> None:
+        method = scope["method"]
+        route = MetricsMiddleware.route_label(scope, method)
+        rid = request_id.get() or uuid.uuid4().hex[:16]
+        worker = str(os.getpid())
+        self.recorder.record({
+            "request_id": rid,
+            "ts": round(ts, 6),
+            "worker": worker,
+            "method": method,
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "cache": cache,
+            "queue_wait_ms": stages.get("queue_wait", {}).get("ms", 0.0),
+            "stages": stages,
+            "payload_bytes": tap.payload_bytes,
+            **describe_payload(content_type, tap.body, tap.payload_bytes, tap.truncated),
+        })
+        self.metrics.record_exemplar(route, status_code, duration_ms, {"request_id": rid, "worker": worker})
+        logger.warning(f"Slow request {method} {scope['path']} - {status_code} ({duration_ms:.2f}ms), id {rid}")
+
+
+# Generation and parse endpoints (single and batch)
+CAPTURE_PREFIXES = ("/api/v1/ibeam", "/api/v1/column", "/api/v1/parse")
+
+
+class WorkloadCaptureMiddleware:
+    """
+    ASGI middleware handing each generation/parse request to a CaptureRecorder.
+    The request body is observed as the app reads it (nothing is buffered
+    ahead of the app); at most `max_body_bytes` are kept for the spec, and
+    the record is queued once the response has been sent.
+    """
+
+    def __init__(self, app, recorder: CaptureRecorder, max_body_bytes: int = 1024 * 1024):
+        self.app = app
+        self.recorder = recorder
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(CAPTURE_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        ts = time.time()
+        start = time.perf_counter()
+        content_type = _content_type(scope)
+        tap = _BodyTap.for_request(receive, content_type, self.max_body_bytes)
+        response = _ResponseTap(send)
+
+        try:
+            await self.app(scope, tap.receive, response.send)
+        finally:
+            self.recorder.record((
+                ts, scope["method"], scope["path"], content_type, tap.body, tap.payload_bytes,
+                tap.truncated, response.status_code, response.cache, (time.perf_counter() - start) * 1000
+            ))
@@ -0,0 +1,165 @@
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+
+from dxf_generator.config.env_config import config
+from dxf_generator.config.logging_config import logger
+from dxf_generator.monitoring.memory_profiler import count_live_objects, memory_profiler
+from dxf_generator.monitoring.sampling_profiler import DXF_PACKAGE, SamplingProfiler, profile_lock
+from dxf_generator.monitoring.slow_requests import slow_request_recorder
+from dxf_generator.monitoring.tracing import chrome_trace, trace_recorder
+from dxf_generator.services.dxf_service import DXFService
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Guard for admin endpoints.
+
+    Admin endpoints are invisible (404) unless ADMIN_ENDPOINTS_ENABLED is set,
+    and require the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    if not config.ADMIN_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not config.ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(
+        x_admin_token, config.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def run_profiler(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1.0),
+    format: str = Query("json", pattern="^(json|collapsed|text)$"),
+    limit: int = Query(30, ge=1, le=500),
+    dxf_only: bool = Query(False)
+):
+    """
+    Sample this worker's thread stacks for `seconds` and return the profile.
+
+    format=json returns collapsed stacks plus pstats-style summaries,
+    format=collapsed returns flamegraph input, format=text a pstats-like table
+    (restricted to dxf_generator modules with dxf_only=true).
+    """
+    if seconds > config.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds exceeds maximum of {config.PROFILER_MAX_SECONDS}"
+        )
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+
+    try:
+        logger.info(f"Starting sampling profiler for {seconds}s at {interval_ms}ms")
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+        logger.info(f"Sampling profiler finished: {profiler.samples} samples")
+    finally:
+        profile_lock.release()
+
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    if format == "text":
+        return PlainTextResponse(profiler.summary_text(limit, DXF_PACKAGE if dxf_only else None))
+    return profiler.report(limit)
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot():
+    """Take a tracemalloc snapshot (the first call starts tracing)."""
+    info = await run_in_threadpool(memory_profiler.take_snapshot)
+    logger.info(f"Memory snapshot {info['id']} taken ({info['traced_bytes']} bytes traced)")
+    return info
+
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots():
+    """List retained snapshots."""
+    return {"tracing": memory_profiler.tracing, "snapshots": memory_profiler.list_snapshots()}
+
+
+@router.delete("/memory/snapshots")
+async def stop_memory_tracing():
+    """Stop tracemalloc and discard all snapshots."""
+    memory_profiler.stop()
+    return {"tracing": False}
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(snapshot_id: int, limit: int = Query(20, ge=1, le=500)):
+    """Top allocation sites of a snapshot, overall and within dxf_generator."""
+    try:
+        return await run_in_threadpool(memory_profiler.top, snapshot_id, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot {snapshot_id}")
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: int = Query(...),
+    target: int = Query(...),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Allocation growth from snapshot `base` to snapshot `target` by site."""
+    try:
+        return await run_in_threadpool(memory_profiler.diff, base, target, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot {e.args[0]}")
+
+
+@router.get("/memory/caches")
+async def get_cache_memory():
+    """Exact byte footprint of each DXFService cache, plus live ezdxf documents."""
+    def collect():
+        return {
+            "caches": DXFService.get_cache_footprint(),
+            "live_ezdxf_documents": count_live_objects("Drawing", "ezdxf")
+        }
+    return await run_in_threadpool(collect)
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: Optional[int] = Query(None, ge=1),
+    trace_id: Optional[str] = Query(None)
+):
+    """Recent traces of this worker as a Chrome trace JSON file (oldest first)."""
+    traces = trace_recorder.traces(limit, trace_id)
+    if trace_id is not None and not traces:
+        raise HTTPException(status_code=404, detail=f"Unknown trace {trace_id}")
+    return JSONResponse(
+        await run_in_threadpool(chrome_trace, traces),
+        headers={"Content-Disposition": 'attachment; filename="trace.json"'}
+    )
+
+
+@router.get("/slow-requests")
+async def get_slow_requests(
+    limit: Optional[int] = Query(None, ge=1),
+    route: Optional[str] = Query(None)
+):
+    """This worker's most recent requests above SLOW_REQUEST_THRESHOLD_MS, newest first."""
+    return {
+        "threshold_ms": slow_request_recorder.threshold_ms,
+        "recorded": slow_request_recorder.recorded,
+        "requests": slow_request_recorder.entries(limit, route),
+    }
+
+
+@router.get("/slow-requests/{request_id}")
+async def get_slow_request(request_id: str):
+    """One slow request by its request id (as linked from a histogram exemplar)."""
+    entry = slow_request_recorder.get(request_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown slow request {request_id}")
+    return entry
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
 from pydantic import BaseModel
@@ -9,9 +10,11 @@ import hashlib
 from dxf_generator.domain.ibeam import IBeam
 from dxf_generator.services.dxf_service import DXFService
 from dxf_generator.exceptions.base import DXFValidationError
+from dxf_generator.exceptions.capacity import BatchTooLargeError, OverloadedError
 from dxf_generator.config.system_limits import MAX_BATCH_SIZE
-from dxf_generator.config.logging_config import logger
-from .utils import remove_file, remove_files
+from dxf_generator.config.logging_config import log_event, logger
+from dxf_generator.monitoring.stage_timer import stage
+from .utils import batch_lane, remove_file, remove_files, wait_for_batch
 
 router = APIRouter()
 
@@ -28,7 +31,7 @@ class BatchIBeamRequest(BaseModel):
 @router.post("/ibeam")
 async def generate_ibeam(request: IBeamRequest, background_tasks: BackgroundTasks):
     temp_filename = None
-    logger.debug(f"Received I-Beam generation request: {request.model_dump()}")
+    log_event("request.ibeam", spec=request.model_dump)
     try:
         ibeam = IBeam(
             request.total_depth, 
@@ -37,21 +40,22 @@ async def generate_ibeam(request: IBeamRequest, background_tasks: BackgroundTask
             request.flange_thickness
         )
         
-        # Check cache first to avoid unnecessary UUID generation and disk prep
         cache_key = DXFService.get_cache_key(ibeam)
-        is_cached = DXFService._generation_cache.contains(cache_key)
         
         # Include a short hash in the filename for uniqueness and stability
         short_hash = hashlib.md5(cache_key.encode()).hexdigest()[:6]
         display_name = f"ibeam_{int(request.total_depth)}x{int(request.flange_width)}_{short_hash}.dxf"
         
-        # Use cached generation (internally logs hit/miss)
+        # Use cached generation (internally logs hit/miss) in the interactive lane,
+        # which is served ahead of batch work and keeps generation off the event loop
         # We pass a temporary filename that only gets used on a cache miss
         temp_filename = f"temp_{uuid.uuid4().hex[:8]}.dxf"
-        content = DXFService.save_cached(ibeam, temp_filename)
+        content = await asyncio.wrap_future(DXFService.submit_cached(ibeam, temp_filename))
         
-        # If a file was actually created on disk (cache miss), schedule its removal
-        if os.path.exists(temp_filename):
+        # Only a request that generated the DXF itself finds its temp file on disk;
+        # cache hits and requests that shared another's generation do not
+        generated = os.path.exists(temp_filename)
+        if generated:
             background_tasks.add_task(remove_file, temp_filename)
             
         headers = {
@@ -59,7 +63,7 @@ async def generate_ibeam(request: IBeamRequest, background_tasks: BackgroundTask
         }
         
         # Add cache status header for visibility
-        headers["X-Cache"] = "HIT" if is_cached else "MISS"
+        headers["X-Cache"] = "MISS" if generated else "HIT"
 
         return Response(
             content=content,
@@ -70,6 +74,11 @@ async def generate_ibeam(request: IBeamRequest, background_tasks: BackgroundTask
     except DXFValidationError as e:
         logger.warning(f"Validation error generating I-Beam: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    except OverloadedError as e:
+        logger.warning(f"I-Beam generation shed: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Unexpected error generating I-Beam: {str(e)}", exc_info=True)
         if temp_filename and os.path.exists(temp_filename):
@@ -120,16 +129,17 @@ async def generate_ibeam_batch(request: BatchIBeamRequest, background_tasks: Bac
             disk_filenames.append(filename)
             filenames.append((filename, display_name))
         
-        DXFService.save_batch(components, disk_filenames)
+        futures = DXFService.save_batch(components, disk_filenames, lane=batch_lane(len(components)))
+        await wait_for_batch(futures)
         
         # 4. Create ZIP
         zip_filename = f"ibeams_batch_{uuid.uuid4().hex[:8]}.zip"
-        with zipfile.ZipFile(zip_filename, 'w') as zipf:
+        with stage("zip"), zipfile.ZipFile(zip_filename, 'w') as zipf:
             for f, d_name in filenames:
-                if os.path.exists(f):
-                    zipf.write(f, arcname=d_name)
-                else:
-                    logger.error(f"Generated file missing: {f}")
+                # A partial ZIP must never be served, let alone cached
+                if not os.path.exists(f):
+                    raise RuntimeError(f"Generated file missing: {d_name}")
+                zipf.write(f, arcname=d_name)
         
         # 5. Read ZIP bytes for caching and response
         with open(zip_filename, "rb") as zf:
@@ -151,6 +161,14 @@ async def generate_ibeam_batch(request: BatchIBeamRequest, background_tasks: Bac
         
         return Response(content=zip_bytes, media_type="application/zip", headers=headers)
 
+    except BatchTooLargeError as e:
+        logger.warning(f"Batch I-Beam generation refused: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except OverloadedError as e:
+        logger.warning(f"Batch I-Beam generation shed: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error in batch I-Beam generation: {str(e)}", exc_info=True)
         # Try to cleanup any files that were created
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 import uuid
 
 from dxf_generator.services.dxf_service import DXFService
 from pydantic import BaseModel
+from typing import List
 from .utils import remove_file
-from dxf_generator.config.logging_config import logger
+from dxf_generator.config.env_config import config
+from dxf_generator.config.logging_config import log_event, logger
+from dxf_generator.exceptions.parsing import ParseLimitError
+from dxf_generator.monitoring.stage_timer import stage
 from dxf_generator.validators.file_validation import (
     validate_upload,
     validate_and_save_upload,
@@ -21,6 +26,7 @@ class ParseResponse(BaseModel):
     type: str
     dimensions: dict
     message: str
+    instances: List[dict] = []
 
 
 @router.post("/parse", response_model=ParseResponse)
@@ -31,8 +37,9 @@ async def parse_dxf(file: UploadFile = File(...), background_tasks: BackgroundTa
     Validates file type and size before processing.
     Returns structured response matching ParseResponse model.
     """
-    logger.debug(f"Received parse request for file: {file.filename}")
+    log_event("request.parse", filename=file.filename)
     temp_filename = None
+    succeeded = False
     
     try:
         # Step 1: Validate file metadata (extension)
@@ -40,26 +47,35 @@ async def parse_dxf(file: UploadFile = File(...), background_tasks: BackgroundTa
         
         # Step 2: Stream to disk with size validation
         temp_filename = f"temp_{uuid.uuid4().hex}_{file.filename}"
-        size = await validate_and_save_upload(file, temp_filename)
-        logger.debug(f"Saved temporary file: {temp_filename} ({size} bytes)")
+        with stage("upload"):
+            size = await validate_and_save_upload(file, temp_filename)
+        log_event("upload.saved", filename=temp_filename, bytes=size)
         
-        # Step 3: Parse the DXF
-        result = DXFService.parse(temp_filename)
+        # Step 3: Parse the DXF (off the event loop; bounded when isolated)
+        result = await run_in_threadpool(
+            DXFService.parse, temp_filename, isolated=config.PARSE_ISOLATION
+        )
         logger.info(f"Successfully parsed DXF: {file.filename} as {result['type']}")
         
         # Step 4: Return structured response matching ParseResponse
+        succeeded = True
         return ParseResponse(
             success=True,
             filename=file.filename,
             type=result["type"],
             dimensions=result["data"],
-            message=f"Successfully parsed {result['type']} from {file.filename}"
+            message=f"Successfully parsed {result['type']} from {file.filename}",
+            instances=result.get("instances", [])
         )
         
     except FileValidationError as e:
         logger.warning(f"Validation error for {file.filename}: {e.message}")
         raise HTTPException(status_code=e.status_code, detail=e.message)
         
+    except ParseLimitError as e:
+        logger.warning(f"Parse budget exceeded for {file.filename}: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+        
     except ValueError as e:
         logger.warning(f"Parse error for {file.filename}: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -69,9 +85,10 @@ async def parse_dxf(file: UploadFile = File(...), background_tasks: BackgroundTa
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
         
     finally:
-        # Always clean up temp file
+        # Always clean up temp file. Background tasks only run after a
+        # successful response, so error paths remove it here
         if temp_filename:
-            if background_tasks:
+            if succeeded and background_tasks:
                 background_tasks.add_task(remove_file, temp_filename)
             else:
                 remove_file(temp_filename)
@@ -1,6 +1,10 @@
+import asyncio
 import os
+from concurrent.futures import Future
 from typing import List
+from dxf_generator.config.env_config import config
 from dxf_generator.config.logging_config import logger
+from dxf_generator.services.batch_processor import BATCH, BULK
 
 def remove_file(path: str):
     """Helper to remove file after response is sent."""
@@ -15,3 +19,21 @@ def remove_files(paths: List[str]):
     for path in paths:
         remove_file(path)
 
+
+def batch_lane(size: int) -> str:
+    """BatchProcessor lane for a batch of `size` items."""
+    return BULK if size >= config.BATCH_BULK_MIN_ITEMS else BATCH
+
+
+async def wait_for_batch(futures: List[Future]) -> None:
+    """
+    Wait until every queued batch generation has finished.
+
+    Raises:
+        Exception: The first generation error, once all of them are done
+            (so no task is still writing when the caller cleans up)
+    """
+    results = await asyncio.gather(*map(asyncio.wrap_future, futures), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
@@ -1,27 +1,67 @@
 from contextlib import asynccontextmanager
+import os
 import time
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
+from dxf_generator.config.env_config import config
 from dxf_generator.config.logging_config import logger
-from dxf_generator.interface.routes import ibeam, column, parser, tests, benchmark
+from dxf_generator.interface.middleware import (
+    MetricsMiddleware, ServerTimingMiddleware, SlowRequestMiddleware, TracingMiddleware, WorkloadCaptureMiddleware
+)
+from dxf_generator.interface.routes import ibeam, column, parser, tests, benchmark, admin
+from dxf_generator.monitoring.metrics_history import MetricsHistory, default_tiers
+from dxf_generator.monitoring.prometheus import CONTENT_TYPE, OPENMETRICS_CONTENT_TYPE, PrometheusExporter
+from dxf_generator.monitoring.request_metrics import request_metrics
+from dxf_generator.monitoring.slow_requests import slow_request_recorder
+from dxf_generator.monitoring.tracing import trace_recorder
+from dxf_generator.monitoring.workload_capture import CaptureRecorder
+from dxf_generator.services.dxf_service import DXFService
 
-# Advanced metrics tracking
-metrics = {
-    "total_requests": 0,
-    "total_failures": 0,
-    "total_processing_time_ms": 0.0,
-    "start_time": time.time(),
-    "unique_clients": set()
-}
+prometheus_exporter = PrometheusExporter(
+    config.METRICS_DIR or None,
+    config.METRICS_FLUSH_SECONDS,
+    cache_stats=DXFService.get_cache_stats,
+    batch_stats=DXFService.get_batch_stats
+)
+metrics_history = (
+    MetricsHistory(
+        config.METRICS_HISTORY_PATH,
+        default_tiers(config.METRICS_HISTORY_RAW_HOURS, config.METRICS_HISTORY_MINUTE_DAYS, config.METRICS_HISTORY_HOUR_DAYS),
+        config.METRICS_HISTORY_INTERVAL_SECONDS,
+        cache_stats=DXFService.get_cache_stats,
+        batch_stats=DXFService.get_batch_stats
+    )
+    if config.METRICS_HISTORY_ENABLED else None
+)
+capture_recorder = (
+    CaptureRecorder(config.CAPTURE_DIR, config.CAPTURE_MAX_BYTES, config.CAPTURE_QUEUE_SIZE)
+    if config.CAPTURE_ENABLED else None
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize cache
     FastAPICache.init(InMemoryBackend())
+    prometheus_exporter.start()
+    if metrics_history:
+        metrics_history.start()
+    if capture_recorder:
+        capture_recorder.start()
     yield
-    # Shutdown logic (if any) can go here
+    # Shutdown: publish final counters for the other workers' scrapes
+    prometheus_exporter.stop()
+    if metrics_history:
+        metrics_history.stop()
+    if capture_recorder:
+        capture_recorder.stop()
+    if config.TRACING_ENABLED and config.TRACE_DIR:
+        path = os.path.join(config.TRACE_DIR, f"trace-{os.getpid()}.json")
+        logger.info(f"Wrote {trace_recorder.export(path)} traces to {path}")
 
 app = FastAPI(lifespan=lifespan)
 
@@ -29,14 +69,28 @@ app = FastAPI(lifespan=lifespan)
 async def get_load_summary():
     """Generates a simple live performance summary."""
     try:
-        total_time = time.time() - metrics["start_time"]
-        req_per_sec = metrics["total_requests"] / total_time if total_time > 0 else 0
+        totals = request_metrics.totals()
+        total_time = time.time() - totals["start_time"]
+        req_per_sec = totals["total_requests"] / total_time if total_time > 0 else 0
         
+        clients = request_metrics.clients.estimate()
         return {
-            "Users": len(metrics["unique_clients"]),
-            "Total Requests": metrics["total_requests"],
+            "Users": clients["lifetime"],
+            "Users (last 5 min)": clients["5m"],
+            "Users (last hour)": clients["1h"],
+            "Total Requests": totals["total_requests"],
             "Time Taken (sec)": round(total_time, 2),
-            "RPS": round(req_per_sec, 1)
+            "RPS": round(req_per_sec, 1),
+            "Recent": {
+                label: {
+                    "RPS": window["rps"],
+                    "Error Rate (%)": round(window["error_rate"] * 100, 2),
+                    "p50 (ms)": window["p50_ms"],
+                    "p95 (ms)": window["p95_ms"],
+                    "p99 (ms)": window["p99_ms"]
+                }
+                for label, window in request_metrics.recent.summary().items()
+            }
         }
     except Exception as e:
         logger.error(f"Error in get_load_summary: {str(e)}")
@@ -44,15 +98,43 @@ async def get_load_summary():
 
 @app.get("/metrics")
 async def get_metrics():
-    """Return system performance metrics."""
-    # Convert set to list for JSON serialization
-    display_metrics = metrics.copy()
-    display_metrics["unique_clients"] = list(metrics["unique_clients"])
+    """Return system performance metrics with per-endpoint latency percentiles and the batch queue."""
+    display_metrics = request_metrics.totals()
+    display_metrics["unique_clients"] = request_metrics.clients.estimate()
+    display_metrics["windows"] = request_metrics.recent.summary()
+    display_metrics["endpoints"] = request_metrics.endpoints()
+    display_metrics["batch_queue"] = DXFService.get_batch_stats()
     return {
         "status": "healthy",
         "metrics": display_metrics
     }
 
+@app.get("/metrics/prometheus")
+async def get_prometheus_metrics(request: Request):
+    """
+    Return metrics in Prometheus text format, aggregated across workers.
+    Scrapers accepting OpenMetrics get that format, with exemplars linking
+    latency buckets to slow requests.
+    """
+    if "application/openmetrics-text" in request.headers.get("accept", ""):
+        return Response(content=prometheus_exporter.scrape(openmetrics=True), media_type=OPENMETRICS_CONTENT_TYPE)
+    return Response(content=prometheus_exporter.scrape(), media_type=CONTENT_TYPE)
+
+@app.get("/metrics/history")
+async def get_metrics_history(
+    start: Optional[float] = Query(None, description="Range start (epoch seconds); default one hour before end"),
+    end: Optional[float] = Query(None, description="Range end (epoch seconds); default now"),
+    resolution: Optional[str] = Query(None, pattern="^(10s|1m|1h)$")
+):
+    """Stored request, latency, cache and queue metrics over a time range, summed across workers."""
+    if metrics_history is None:
+        raise HTTPException(status_code=404, detail="Metrics history is disabled")
+    end = time.time() if end is None else end
+    start = end - 3600 if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return await run_in_threadpool(metrics_history.query, start, end, resolution)
+
 @app.get("/")
 async def root():
     return {"message": "DXF Generator API is running"}
@@ -63,66 +145,7 @@ app.include_router(column.router, prefix="/api/v1", tags=["column"])
 app.include_router(parser.router, prefix="/api/v1", tags=["parser"])
 app.include_router(tests.router, prefix="/api/v1", tags=["tests"])
 app.include_router(benchmark.router, prefix="/api/v1", tags=["benchmark"])
-
-# Performance and Logging Middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Debug log for incoming request
-    logger.debug(
-        f"Incoming {request.method} {request.url.path}",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": str(request.query_params),
-            "client": request.client.host if request.client else None
-        }
-    )
-    
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        process_time = (time.time() - start_time) * 1000
-        logger.error(
-            f"Unhandled exception during {request.method} {request.url.path}: {str(e)}",
-            exc_info=True,
-            extra={
-                "duration_ms": round(process_time, 2),
-                "method": request.method,
-                "path": request.url.path
-            }
-        )
-        raise e from None # Re-raise to let FastAPI handle it
-    
-    process_time = (time.time() - start_time) * 1000  # ms
-    
-    # Update metrics (exclude metrics endpoint itself)
-    if not request.url.path.startswith("/metrics"):
-        metrics["total_requests"] += 1
-        metrics["total_processing_time_ms"] += process_time
-        if request.client:
-            metrics["unique_clients"].add(request.client.host)
-        if response.status_code >= 400:
-            metrics["total_failures"] += 1
-
-    # Log request details with appropriate level
-    log_msg = f"{request.method} {request.url.path} - {response.status_code} ({process_time:.2f}ms)"
-    log_extra = {
-        "duration_ms": round(process_time, 2),
-        "status_code": response.status_code,
-        "method": request.method,
-        "path": request.url.path
-    }
-    
-    if response.status_code >= 500:
-        logger.error(log_msg, extra=log_extra)
-    elif response.status_code >= 400:
-        logger.warning(log_msg, extra=log_extra)
-    else:
-        logger.info(log_msg, extra=log_extra)
-    
-    return response
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 # Enable CORS
 app.add_middleware(
@@ -133,6 +156,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Slow request buffer and histogram exemplars (inside ServerTimingMiddleware, to share its stage timings)
+app.add_middleware(SlowRequestMiddleware, recorder=slow_request_recorder)
+
+# Per-stage Server-Timing header
+if config.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware, log_timings=config.SERVER_TIMING_LOG)
+
+# Request tracing (inside MetricsMiddleware, whose request id keys the trace)
+if config.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, recorder=trace_recorder, max_spans=config.TRACE_MAX_SPANS)
+
+# Opt-in workload capture for trace replay
+if capture_recorder:
+    app.add_middleware(WorkloadCaptureMiddleware, recorder=capture_recorder)
+
+# Performance and Logging Middleware (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(ibeam.router, prefix="/api/v1")
 app.include_router(column.router, prefix="/api/v1")
@@ -0,0 +1,206 @@
+"""
+HyperLogLog - Fixed-memory distinct counting for client cardinality.
+Single Responsibility: Estimate unique clients over lifetime and sliding windows, mergeable across workers.
+"""
+import base64
+import hashlib
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_PRECISION = 12  # 4096 registers (4 KB), ~1.6% standard error
+
+# Window label -> (slot seconds, slot count); a window spans its slots
+CLIENT_WINDOWS = {
+    "5m": (60, 5),
+    "1h": (300, 12),
+}
+
+
+def hash_item(item: str) -> int:
+    """64-bit hash used for register selection (stable across processes)."""
+    return int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality estimator with 2**precision one-byte registers.
+    Memory is fixed regardless of how many items are added, and two
+    estimators merge losslessly by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError(f"expected {self.size} registers, got {len(self.registers)}")
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate (1.04 / sqrt(m))."""
+        return 1.04 / math.sqrt(self.size)
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        self.add_hash(hash_item(item))
+
+    def add_hash(self, hashed: int) -> None:
+        """Add a pre-computed 64-bit hash (lets callers feed several estimators)."""
+        index = hashed >> (64 - self.precision)
+        remainder = (hashed << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = min(64 - remainder.bit_length(), 64 - self.precision) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another estimator of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimated number of distinct items added."""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def clear(self) -> None:
+        self.registers = bytearray(self.size)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, data: str, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        return cls(precision, base64.b64decode(data))
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        """Merge several estimators into a new one."""
+        merged = cls(precision)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+
+class WindowedHyperLogLog:
+    """
+    Distinct count over a sliding window, built from a ring of per-slot sketches.
+    A slot is reset when the ring wraps around to it, so the window advances
+    in whole slots and memory stays at slot_count sketches.
+    """
+
+    def __init__(self, slot_seconds: int, slot_count: int, precision: int = DEFAULT_PRECISION):
+        self.slot_seconds = slot_seconds
+        self.slot_count = slot_count
+        self.precision = precision
+        self._slots = [HyperLogLog(precision) for _ in range(slot_count)]
+        self._epochs: List[int] = [-1] * slot_count
+
+    def add_hash(self, hashed: int, now: Optional[float] = None) -> None:
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        position = epoch % self.slot_count
+        if self._epochs[position] != epoch:
+            self._slots[position].clear()
+            self._epochs[position] = epoch
+        self._slots[position].add_hash(hashed)
+
+    def sketch(self, now: Optional[float] = None) -> HyperLogLog:
+        """Union of the slots still inside the window."""
+        epoch = int((time.time() if now is None else now) // self.slot_seconds)
+        return HyperLogLog.union(
+            (slot for slot, slot_epoch in zip(self._slots, self._epochs)
+             if epoch - self.slot_count < slot_epoch <= epoch),
+            self.precision
+        )
+
+    def count(self, now: Optional[float] = None) -> int:
+        return self.sketch(now).count()
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self._epochs = [-1] * self.slot_count
+
+
+class UniqueClientEstimator:
+    """
+    Unique client counts for the lifetime of the worker and for the windows
+    in CLIENT_WINDOWS. Each client is hashed once per request.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self.lifetime = HyperLogLog(precision)
+        self.windows = {
+            label: WindowedHyperLogLog(slot_seconds, slot_count, precision)
+            for label, (slot_seconds, slot_count) in CLIENT_WINDOWS.items()
+        }
+
+    def add(self, client: str, now: Optional[float] = None) -> None:
+        hashed = hash_item(client)
+        self.lifetime.add_hash(hashed)
+        for window in self.windows.values():
+            window.add_hash(hashed, now)
+
+    def estimate(self, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Estimated unique clients.
+
+        Returns:
+            Dict with 'lifetime', one entry per window, and 'relative_error'
+        """
+        return {
+            "lifetime": self.lifetime.count(),
+            **{label: window.count(now) for label, window in self.windows.items()},
+            "relative_error": round(self.lifetime.relative_error, 4),
+        }
+
+    def to_dict(self, now: Optional[float] = None) -> dict:
+        """Serializable sketches for cross-worker merging (see merge_estimates)."""
+        return {
+            "precision": self.precision,
+            "lifetime": self.lifetime.to_base64(),
+            "windows": {label: window.sketch(now).to_base64() for label, window in self.windows.items()},
+        }
+
+    def clear(self) -> None:
+        self.lifetime.clear()
+        for window in self.windows.values():
+            window.clear()
+
+
+def merge_estimates(serialized: List[dict], windowed: Optional[List[dict]] = None) -> Dict[str, float]:
+    """
+    Merge serialized estimators from several workers.
+
+    Args:
+        serialized: UniqueClientEstimator.to_dict() outputs contributing lifetime counts
+        windowed: Outputs contributing window counts (defaults to `serialized`)
+
+    Returns:
+        Same shape as UniqueClientEstimator.estimate()
+    """
+    windowed = serialized if windowed is None else windowed
+    precision = serialized[0]["precision"] if serialized else DEFAULT_PRECISION
+    lifetime = HyperLogLog.union(
+        (HyperLogLog.from_base64(s["lifetime"], precision) for s in serialized), precision
+    )
+    return {
+        "lifetime": lifetime.count(),
+        **{
+            label: HyperLogLog.union(
+                (HyperLogLog.from_base64(s["windows"][label], precision) for s in windowed), precision
+            ).count()
+            for label in CLIENT_WINDOWS
+        },
+        "relative_error": round(lifetime.relative_error, 4),
+    }
@@ -0,0 +1,137 @@
+"""
+LatencyHistogram - Fixed-bucket latency histograms sharded per thread.
+Single Responsibility: Record latencies without locking and merge them into percentiles on read.
+"""
+from bisect import bisect_left
+import threading
+from typing import Dict, Hashable, List, NamedTuple, Sequence
+
+# Upper bucket bounds in milliseconds (1-2-5 series); the last bucket is unbounded
+DEFAULT_BUCKETS_MS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000
+)
+
+
+class HistogramSnapshot(NamedTuple):
+    """Merged, read-only view of one histogram series."""
+    bounds: Sequence[float]
+    counts: List[int]
+    total: float
+    max: float
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    def merge(self, other: "HistogramSnapshot") -> "HistogramSnapshot":
+        """Combine two snapshots with the same bucket bounds."""
+        return HistogramSnapshot(
+            self.bounds,
+            [a + b for a, b in zip(self.counts, other.counts)],
+            self.total + other.total,
+            max(self.max, other.max)
+        )
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate the q-quantile (0 < q <= 1) by interpolating inside its bucket.
+
+        Args:
+            q: Quantile, e.g. 0.95
+
+        Returns:
+            Estimated latency in milliseconds (0.0 for an empty series)
+        """
+        count = self.count
+        if count == 0:
+            return 0.0
+
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(estimate, self.max)
+            cumulative += bucket_count
+        return self.max
+
+
+class _Series:
+    """Mutable per-thread counters for one key."""
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyHistogram:
+    """
+    Latency histograms keyed by arbitrary labels (e.g. route and status class).
+    Each thread records into its own shard, so the hot path never takes a lock;
+    readers merge all shards into snapshots.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[Dict[Hashable, _Series]] = []
+        self._shards_lock = threading.Lock()  # Only taken when a thread records for the first time
+
+    def _shard(self) -> Dict[Hashable, _Series]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def record(self, key: Hashable, value_ms: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            key: Series label
+            value_ms: Latency in milliseconds
+        """
+        shard = self._shard()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series(len(self.bounds) + 1)
+        series.counts[bisect_left(self.bounds, value_ms)] += 1
+        series.total += value_ms
+        if value_ms > series.max:
+            series.max = value_ms
+
+    def snapshot(self) -> Dict[Hashable, HistogramSnapshot]:
+        """
+        Merge all thread shards.
+
+        Returns:
+            Dict of key -> HistogramSnapshot
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        merged: Dict[Hashable, HistogramSnapshot] = {}
+        for shard in shards:
+            # dict() copies atomically under the GIL, so writers never break iteration
+            for key, series in dict(shard).items():
+                current = HistogramSnapshot(self.bounds, list(series.counts), series.total, series.max)
+                merged[key] = merged[key].merge(current) if key in merged else current
+        return merged
+
+    def reset(self) -> None:
+        """Drop all recorded observations."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
@@ -0,0 +1,170 @@
+"""
+MemoryProfiler - On-demand tracemalloc snapshots and diffs for a running worker.
+Single Responsibility: Manage tracemalloc tracing, keep a bounded set of snapshots and report allocation sites.
+"""
+from collections import OrderedDict
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+import dxf_generator
+from dxf_generator.config.env_config import config
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(dxf_generator.__file__))
+
+# Allocations made by tracemalloc itself and the import machinery are noise
+_NOISE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+_PACKAGE_FILTER = (tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*")),)
+
+
+def _site(frame) -> str:
+    """file:line with dxf_generator paths shown relative to the package."""
+    filename = frame.filename
+    if filename.startswith(PACKAGE_DIR):
+        filename = "dxf_generator" + filename[len(PACKAGE_DIR):]
+    return f"{filename}:{frame.lineno}"
+
+
+def count_live_objects(type_name: str, module_prefix: str) -> int:
+    """Count live objects of a class (by name and module prefix), e.g. ezdxf Drawing documents."""
+    count = 0
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__name__ == type_name and cls.__module__.startswith(module_prefix):
+            count += 1
+    return count
+
+
+class MemoryProfiler:
+    """
+    Keeps up to `max_snapshots` tracemalloc snapshots, identified by
+    increasing ids. Tracing is started by the first snapshot (it slows
+    allocation noticeably) and stays off until then.
+    """
+
+    def __init__(self, max_snapshots: int = 5, frames: int = 10):
+        self.max_snapshots = max_snapshots
+        self.frames = frames
+        self._snapshots: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (taken_at, snapshot)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take_snapshot(self) -> Dict:
+        """
+        Take a snapshot, starting tracing first if needed.
+
+        Only allocations made after tracing started are visible, so the first
+        snapshot is mostly a baseline for later diffs.
+
+        Returns:
+            Snapshot info (id, taken_at, traced bytes, whether tracing was just started)
+        """
+        started = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            started = True
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE_FILTERS)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "id": snapshot_id,
+            "taken_at": self._snapshots[snapshot_id][0],
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracing_started": started,
+        }
+
+    def list_snapshots(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {"id": snapshot_id, "taken_at": taken_at,
+                 "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename"))}
+                for snapshot_id, (taken_at, snapshot) in self._snapshots.items()
+            ]
+
+    def _get(self, snapshot_id: int):
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(snapshot_id)
+        return entry[1]
+
+    def top(self, snapshot_id: int, limit: int = 20) -> Dict:
+        """
+        Largest allocation sites of a snapshot, overall and within dxf_generator.
+
+        Raises:
+            KeyError: Unknown (or already discarded) snapshot id
+        """
+        snapshot = self._get(snapshot_id)
+
+        def rows(snap):
+            return [
+                {"site": _site(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                for stat in snap.statistics("lineno")[:limit]
+            ]
+
+        return {
+            "id": snapshot_id,
+            "top": rows(snapshot),
+            "dxf_top": rows(snapshot.filter_traces(_PACKAGE_FILTER)),
+        }
+
+    def diff(self, base_id: int, target_id: int, limit: int = 20) -> Dict:
+        """
+        Allocation growth between two snapshots, grouped by allocation site.
+
+        Raises:
+            KeyError: Unknown (or already discarded) snapshot id
+        """
+        base = self._get(base_id)
+        target = self._get(target_id)
+
+        def rows(new, old):
+            return [
+                {
+                    "site": _site(stat.traceback[0]),
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in new.compare_to(old, "lineno")[:limit]
+            ]
+
+        stats = target.compare_to(base, "filename")
+        return {
+            "base": base_id,
+            "target": target_id,
+            "total_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": rows(target, base),
+            "dxf_top": rows(target.filter_traces(_PACKAGE_FILTER), base.filter_traces(_PACKAGE_FILTER)),
+        }
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+memory_profiler = MemoryProfiler(config.MEMORY_SNAPSHOT_LIMIT, config.MEMORY_TRACE_FRAMES)
@@ -0,0 +1,319 @@
+"""
+MetricsHistory - Persistent time series of request, latency, cache and queue metrics.
+Single Responsibility: Sample this worker's counters into a local SQLite file at three resolutions and answer range queries.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dxf_generator.config.logging_config import logger
+from dxf_generator.monitoring.latency_histogram import DEFAULT_BUCKETS_MS, HistogramSnapshot
+from dxf_generator.monitoring.request_metrics import RequestMetrics, request_metrics
+
+BUCKET_COLUMNS = [f"b{i}" for i in range(len(DEFAULT_BUCKETS_MS) + 1)]
+
+# Summed when samples are rolled up (gauges keep their sum over samples and their max)
+_SUM_COLUMNS = ["requests", "errors", "latency_sum_ms", *BUCKET_COLUMNS, "submitted", "queue_depth_sum", "samples"]
+_MAX_COLUMNS = ["queue_depth_max", "active_max"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS samples (
+    tier TEXT NOT NULL, ts INTEGER NOT NULL, worker INTEGER NOT NULL,
+    {", ".join(f"{c} REAL NOT NULL DEFAULT 0" for c in _SUM_COLUMNS + _MAX_COLUMNS)},
+    PRIMARY KEY (tier, ts, worker)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cache_samples (
+    tier TEXT NOT NULL, ts INTEGER NOT NULL, worker INTEGER NOT NULL, cache TEXT NOT NULL,
+    hits REAL NOT NULL DEFAULT 0, misses REAL NOT NULL DEFAULT 0,
+    bytes REAL NOT NULL DEFAULT 0, entries REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (tier, ts, worker, cache)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_SAMPLE = (
+    f"INSERT INTO samples (tier, ts, worker, {', '.join(_SUM_COLUMNS + _MAX_COLUMNS)}) "
+    f"VALUES (?, ?, ?, {', '.join('?' for _ in _SUM_COLUMNS + _MAX_COLUMNS)}) "
+    "ON CONFLICT (tier, ts, worker) DO UPDATE SET "
+    + ", ".join([f"{c} = {c} + excluded.{c}" for c in _SUM_COLUMNS]
+                + [f"{c} = MAX({c}, excluded.{c})" for c in _MAX_COLUMNS])
+)
+
+# Cache gauges (bytes, entries) keep the latest value
+_UPSERT_CACHE = (
+    "INSERT INTO cache_samples (tier, ts, worker, cache, hits, misses, bytes, entries) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (tier, ts, worker, cache) DO UPDATE SET "
+    "hits = hits + excluded.hits, misses = misses + excluded.misses, "
+    "bytes = excluded.bytes, entries = excluded.entries"
+)
+
+
+def default_tiers(raw_hours: float, minute_days: float, hour_days: float) -> List[Tuple[str, int, float]]:
+    """(name, step seconds, retention seconds) from finest to coarsest."""
+    return [
+        ("10s", 10, raw_hours * 3600),
+        ("1m", 60, minute_days * 86400),
+        ("1h", 3600, hour_days * 86400),
+    ]
+
+
+def _delta(current: float, previous: float) -> float:
+    # Counters only reset when the metrics are cleared; count from zero then
+    return current - previous if current >= previous else current
+
+
+class MetricsHistory:
+    """
+    Writes one sample per `interval` seconds (10 s by default) to a SQLite
+    file and adds it into 1-minute and 1-hour rollup rows in the same
+    transaction. Rows older than their tier's retention are deleted on
+    every write, so the file stays bounded whatever the uptime.
+
+    Each worker writes its own rows (keyed by pid); queries sum over
+    workers. Counters are stored as deltas per interval, latency as
+    histogram bucket counts so percentiles survive rollups, and gauges
+    (batch queue depth, active threads) as sum and max over samples.
+    Cache and batch figures come from the `cache_stats` and `batch_stats`
+    callables the application passes in (DXFService's in web.py).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        tiers: List[Tuple[str, int, float]],
+        interval: float = 10.0,
+        metrics: RequestMetrics = request_metrics,
+        cache_stats: Callable[[], Dict] = dict,
+        batch_stats: Callable[[], Dict] = dict
+    ):
+        self.path = path
+        self.tiers = tiers
+        self.interval = interval
+        self.metrics = metrics
+        self.cache_stats = cache_stats
+        self.batch_stats = batch_stats
+        self.worker = os.getpid()
+        self._previous: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Checkpoint often and truncate the WAL afterwards, so it does not grow to the 4 MB default
+        conn.execute("PRAGMA wal_autocheckpoint=100")
+        conn.execute("PRAGMA journal_size_limit=1048576")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def read_counters(self) -> Dict:
+        """Current cumulative counters and gauges of this worker."""
+        counts = [0] * len(BUCKET_COLUMNS)
+        total_ms = 0.0
+        errors = 0
+        for (_, status_class), snap in self.metrics.latency.snapshot().items():
+            counts = [a + b for a, b in zip(counts, snap.counts)]
+            total_ms += snap.total
+            if status_class in ("4xx", "5xx"):
+                errors += snap.count
+        return {
+            "counts": counts,
+            "latency_sum_ms": total_ms,
+            "errors": errors,
+            "caches": self.cache_stats(),
+            "batch": self.batch_stats(),
+        }
+
+    def write_sample(self, conn: sqlite3.Connection, now: Optional[float] = None) -> None:
+        """
+        Store the change since the previous sample (the first call only sets the baseline).
+
+        Args:
+            conn: Connection from connect()
+            now: Sample time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        with self._write_lock:
+            current = self.read_counters()
+            previous, self._previous = self._previous, current
+        if previous is None:
+            return
+
+        counts = [_delta(c, p) for c, p in zip(current["counts"], previous["counts"])]
+        batch = current["batch"]
+        values = [
+            sum(counts),
+            _delta(current["errors"], previous["errors"]),
+            _delta(current["latency_sum_ms"], previous["latency_sum_ms"]),
+            *counts,
+            _delta(batch.get("submitted", 0), previous["batch"].get("submitted", 0)),
+            batch.get("queue_depth", 0),
+            1,
+            batch.get("queue_depth", 0),
+            batch.get("active_workers", 0),
+        ]
+        cache_rows = [
+            (
+                name,
+                _delta(stats["hits"], previous["caches"][name]["hits"]),
+                _delta(stats["misses"], previous["caches"][name]["misses"]),
+                stats["bytes"],
+                stats["size"],
+            )
+            for name, stats in current["caches"].items()
+        ]
+
+        # Label the sample by the step containing the middle of its interval
+        middle = now - self.interval / 2
+        with conn:
+            for tier, step, retention in self.tiers:
+                ts = int(middle // step * step)
+                conn.execute(_UPSERT_SAMPLE, (tier, ts, self.worker, *values))
+                conn.executemany(_UPSERT_CACHE, [(tier, ts, self.worker, *row) for row in cache_rows])
+                conn.execute("DELETE FROM samples WHERE tier = ? AND ts < ?", (tier, now - retention))
+                conn.execute("DELETE FROM cache_samples WHERE tier = ? AND ts < ?", (tier, now - retention))
+
+    def choose_tier(self, start: float, end: float, max_points: int = 1500, now: Optional[float] = None) -> str:
+        """Finest tier that still retains `start` and covers the range in at most `max_points` steps."""
+        now = time.time() if now is None else now
+        for tier, step, retention in self.tiers:
+            if start >= now - retention and (end - start) / step <= max_points:
+                return tier
+        return self.tiers[-1][0]
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        tier: Optional[str] = None,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> Dict:
+        """
+        Metrics per step between `start` and `end` (epoch seconds), summed over workers.
+
+        Args:
+            start: Range start
+            end: Range end
+            tier: "10s", "1m" or "1h"; chosen from the range when omitted
+            conn: Connection to use (a new one by default)
+
+        Returns:
+            {"resolution", "step_seconds", "points": [...]} with requests,
+            rps, errors, error_rate, latency percentiles, batch queue and
+            per-cache hit ratio for every step that has data. Gauge maxima
+            are summed over workers, so they are an upper bound.
+        """
+        tier = tier or self.choose_tier(start, end)
+        step = {name: s for name, s, _ in self.tiers}[tier]
+        own = conn is None
+        conn = conn or self.connect()
+        try:
+            columns = ", ".join(f"SUM({c})" for c in _SUM_COLUMNS) + ", " + ", ".join(f"SUM({c})" for c in _MAX_COLUMNS)
+            rows = conn.execute(
+                f"SELECT ts, {columns}, COUNT(*) FROM samples WHERE tier = ? AND ts >= ? AND ts <= ? "
+                "GROUP BY ts ORDER BY ts",
+                (tier, int(start // step * step), end)
+            ).fetchall()
+            cache_rows = conn.execute(
+                "SELECT ts, cache, SUM(hits), SUM(misses), SUM(bytes), SUM(entries) FROM cache_samples "
+                "WHERE tier = ? AND ts >= ? AND ts <= ? GROUP BY ts, cache ORDER BY ts, cache",
+                (tier, int(start // step * step), end)
+            ).fetchall()
+        finally:
+            if own:
+                conn.close()
+
+        caches: Dict[int, Dict] = {}
+        for ts, name, hits, misses, size_bytes, entries in cache_rows:
+            lookups = hits + misses
+            caches.setdefault(ts, {})[name] = {
+                "hits": int(hits),
+                "misses": int(misses),
+                "hit_ratio": round(hits / lookups, 4) if lookups else None,
+                "bytes": int(size_bytes),
+                "entries": int(entries),
+            }
+
+        points = []
+        for row in rows:
+            ts, values, workers = row[0], dict(zip(_SUM_COLUMNS + _MAX_COLUMNS, row[1:-1])), row[-1]
+            counts = [int(values[c]) for c in BUCKET_COLUMNS]
+            snapshot = HistogramSnapshot(DEFAULT_BUCKETS_MS, counts, values["latency_sum_ms"], math.inf)
+            requests = int(values["requests"])
+            # Every worker contributes one sample per interval; mean depth is summed over workers
+            samples_per_worker = values["samples"] / workers if workers else 0
+            points.append({
+                "ts": ts,
+                "requests": requests,
+                "rps": round(requests / step, 3),
+                "errors": int(values["errors"]),
+                "error_rate": round(values["errors"] / requests, 4) if requests else 0.0,
+                "mean_ms": round(snapshot.mean, 2) if requests else None,
+                **{
+                    name: round(self._bucket_percentile(snapshot, q), 2) if requests else None
+                    for name, q in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))
+                },
+                "batch_submitted": int(values["submitted"]),
+                "queue_depth_mean": round(values["queue_depth_sum"] / samples_per_worker, 2) if samples_per_worker else 0.0,
+                "queue_depth_max": int(values["queue_depth_max"]),
+                "active_max": int(values["active_max"]),
+                "workers": workers,
+                "caches": caches.get(ts, {}),
+            })
+        return {"resolution": tier, "step_seconds": step, "points": points}
+
+    @staticmethod
+    def _bucket_percentile(snapshot: HistogramSnapshot, q: float) -> float:
+        # Without a recorded max the open last bucket reports its lower bound
+        value = snapshot.percentile(q)
+        return snapshot.bounds[-1] if math.isinf(value) else value
+
+    def disk_bytes(self) -> int:
+        """Size of the database file and its WAL."""
+        return sum(os.path.getsize(p) for p in (self.path, f"{self.path}-wal") if os.path.exists(p))
+
+    def start(self) -> None:
+        """Start sampling on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-history", daemon=True)
+        self._thread.start()
+        logger.info(f"Recording metrics history to {self.path} every {self.interval}s")
+
+    def stop(self) -> None:
+        """Write a final sample and stop the sampling thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            conn = self.connect()
+        except sqlite3.Error as e:
+            logger.error(f"Metrics history disabled, cannot open {self.path}: {e}")
+            return
+        try:
+            self.write_sample(conn)
+            # Sample on interval boundaries so every worker's rows share timestamps
+            while not self._stop.wait(self.interval - time.time() % self.interval):
+                self._write(conn)
+            self._write(conn)
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection) -> None:
+        try:
+            self.write_sample(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write metrics history sample: {e}")
@@ -0,0 +1,342 @@
+"""
+PrometheusExporter - Prometheus text exposition aggregated across worker processes.
+Single Responsibility: Snapshot process metrics, share them through a directory and render the merged view.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from dxf_generator.config.logging_config import logger
+from dxf_generator.monitoring.hyperloglog import merge_estimates
+from dxf_generator.monitoring.request_metrics import RequestMetrics, request_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def collect_process_metrics(
+    metrics: RequestMetrics = request_metrics,
+    cache_stats: Callable[[], Dict] = dict,
+    batch_stats: Callable[[], Dict] = dict
+) -> dict:
+    """
+    Snapshot this process' metrics as a JSON-serializable dict.
+
+    Args:
+        metrics: Request metrics registry to read
+        cache_stats: Returns per-cache stats ({name: {hits, misses, evictions, bytes, size}})
+        batch_stats: Returns batch executor stats (BatchProcessor.stats)
+
+    Returns:
+        Dict with pid, request histograms and exemplars, cache stats and batch executor stats
+    """
+    return {
+        "pid": os.getpid(),
+        "written_at": time.time(),
+        "bounds_ms": list(metrics.latency.bounds),
+        "requests": [
+            {"route": route, "status": status, "counts": snap.counts, "sum_ms": snap.total}
+            for (route, status), snap in metrics.latency.snapshot().items()
+        ],
+        "exemplars": metrics.exemplars(),
+        "clients": metrics.clients.to_dict(),
+        "caches": cache_stats(),
+        "batch": batch_stats(),
+    }
+
+
+class SharedMetricsStore:
+    """
+    Directory of per-worker metric snapshots (one JSON file per pid).
+    Files are replaced atomically, so readers never see a partial snapshot.
+    """
+
+    PATTERN = "worker_*.json"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @classmethod
+    def prepare(cls, directory: str) -> None:
+        """Create the directory and drop snapshots left over from a previous server run."""
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, cls.PATTERN)):
+            os.remove(path)
+
+    def write(self, snapshot: dict) -> None:
+        """Atomically store a worker's snapshot."""
+        path = os.path.join(self.directory, f"worker_{snapshot['pid']}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def read_all(self) -> List[dict]:
+        """
+        Load every worker snapshot.
+
+        Returns:
+            Snapshots, each with an added 'alive' flag for its worker process
+        """
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, self.PATTERN)):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping unreadable metrics snapshot {path}: {e}")
+                continue
+            snapshot["alive"] = self._pid_alive(snapshot["pid"])
+            snapshots.append(snapshot)
+        return snapshots
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _exemplar(exemplar: dict) -> str:
+    return f" # {_labels(**exemplar['labels'])} {_format(exemplar['value_ms'] / 1000)} {exemplar['ts']:.3f}"
+
+
+def render(snapshots: List[dict], openmetrics: bool = False) -> str:
+    """
+    Merge worker snapshots into Prometheus text exposition format.
+
+    Counters sum over every snapshot, including workers that have exited,
+    so they stay monotonic. Gauges (cache size, queue depth) only sum over
+    live workers.
+
+    Args:
+        snapshots: Worker snapshots (see collect_process_metrics)
+        openmetrics: Render OpenMetrics text instead, with each latency
+            bucket linked to its latest slow request as an exemplar
+
+    Returns:
+        Exposition text
+    """
+    bounds: List[float] = []
+    requests: Dict[Tuple[str, str], dict] = {}
+    exemplars: Dict[Tuple[str, str, int], dict] = {}
+    caches: Dict[str, Dict[str, float]] = {}
+    batch: Dict[str, float] = {}
+    lanes: Dict[str, Dict[str, float]] = {}
+    live_workers = 0
+
+    for snapshot in snapshots:
+        alive = snapshot.get("alive", True)
+        live_workers += alive
+        bounds = snapshot["bounds_ms"]
+
+        for series in snapshot["requests"]:
+            key = (series["route"], series["status"])
+            merged = requests.setdefault(key, {"counts": [0] * len(series["counts"]), "sum_ms": 0.0})
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], series["counts"])]
+            merged["sum_ms"] += series["sum_ms"]
+
+        for exemplar in snapshot.get("exemplars", []):
+            key = (exemplar["route"], exemplar["status"], exemplar["bucket"])
+            if key not in exemplars or exemplar["ts"] > exemplars[key]["ts"]:
+                exemplars[key] = exemplar
+
+        for name, stats in snapshot["caches"].items():
+            totals = caches.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0, "size": 0})
+            for field in ("hits", "misses", "evictions"):
+                totals[field] += stats[field]
+            if alive:
+                totals["bytes"] += stats["bytes"]
+                totals["size"] += stats["size"]
+
+        for field in ("submitted", "rejected"):
+            batch[field] = batch.get(field, 0) + snapshot["batch"].get(field, 0)
+        for field in ("queue_depth", "max_queue", "active_workers", "max_workers"):
+            batch[field] = batch.get(field, 0) + (snapshot["batch"].get(field, 0) if alive else 0)
+        if alive:
+            # The slowest worker's queue is the one requests notice
+            batch["queue_wait_ms"] = max(batch.get("queue_wait_ms", 0), snapshot["batch"].get("queue_wait_ms", 0))
+
+        for name, stats in snapshot["batch"].get("lanes", {}).items():
+            totals = lanes.setdefault(
+                name, {"queue_depth": 0, "active": 0, "submitted": 0, "rejected": 0, "queue_wait_ms": 0}
+            )
+            for field in ("submitted", "rejected"):
+                totals[field] += stats[field]
+            if alive:
+                totals["queue_depth"] += stats["queue_depth"]
+                totals["active"] += stats["active"]
+                totals["queue_wait_ms"] = max(totals["queue_wait_ms"], stats["queue_wait_ms"])
+
+    # Sketches union losslessly; windows only count workers that are still serving
+    clients = merge_estimates(
+        [s["clients"] for s in snapshots],
+        [s["clients"] for s in snapshots if s.get("alive", True)]
+    )
+
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        if openmetrics and kind == "counter":
+            # OpenMetrics names the counter family without its _total sample suffix
+            name = name[:-len("_total")]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("dxf_worker_processes", "gauge", "Worker processes currently reporting metrics.")
+    lines.append(f"dxf_worker_processes {live_workers}")
+
+    family("dxf_http_requests_total", "counter", "Completed HTTP requests by route and status class.")
+    for (route, status), series in sorted(requests.items()):
+        lines.append(f"dxf_http_requests_total{_labels(route=route, status=status)} {sum(series['counts'])}")
+
+    family("dxf_http_request_duration_seconds", "histogram", "HTTP request latency by route and status class.")
+    for (route, status), series in sorted(requests.items()):
+        cumulative = 0
+        for index, count in enumerate(series["counts"]):
+            cumulative += count
+            le = _format(bounds[index] / 1000) if index < len(bounds) else "+Inf"
+            line = f"dxf_http_request_duration_seconds_bucket{_labels(route=route, status=status, le=le)} {cumulative}"
+            if openmetrics and (route, status, index) in exemplars:
+                line += _exemplar(exemplars[(route, status, index)])
+            lines.append(line)
+        labels = _labels(route=route, status=status)
+        lines.append(f"dxf_http_request_duration_seconds_sum{labels} {_format(series['sum_ms'] / 1000)}")
+        lines.append(f"dxf_http_request_duration_seconds_count{labels} {cumulative}")
+
+    family("dxf_unique_clients", "gauge", "Estimated distinct client addresses (HyperLogLog).")
+    for window in [key for key in clients if key != "relative_error"]:
+        lines.append(f"dxf_unique_clients{_labels(window=window)} {clients[window]}")
+    family("dxf_unique_clients_relative_error", "gauge", "Standard error of the unique client estimate.")
+    lines.append(f"dxf_unique_clients_relative_error {clients['relative_error']}")
+
+    cache_families = (
+        ("dxf_cache_hits_total", "counter", "Cache hits.", "hits"),
+        ("dxf_cache_misses_total", "counter", "Cache misses.", "misses"),
+        ("dxf_cache_evictions_total", "counter", "Cache evictions.", "evictions"),
+        ("dxf_cache_bytes", "gauge", "Estimated bytes held by the cache.", "bytes"),
+        ("dxf_cache_entries", "gauge", "Entries held by the cache.", "size"),
+    )
+    for name, kind, help_text, field in cache_families:
+        family(name, kind, help_text)
+        for cache, totals in sorted(caches.items()):
+            lines.append(f"{name}{_labels(cache=cache)} {totals[field]}")
+
+    batch_families = (
+        ("dxf_batch_queue_depth", "gauge", "Background tasks waiting for a worker thread.", "queue_depth"),
+        ("dxf_batch_max_queue", "gauge", "Background tasks allowed to wait before new work is rejected.", "max_queue"),
+        ("dxf_batch_active_workers", "gauge", "Background tasks currently executing.", "active_workers"),
+        ("dxf_batch_max_workers", "gauge", "Background worker threads available.", "max_workers"),
+        ("dxf_batch_tasks_submitted_total", "counter", "Background tasks submitted.", "submitted"),
+        ("dxf_batch_tasks_rejected_total", "counter", "Background tasks refused by admission control.", "rejected"),
+    )
+    for name, kind, help_text, field in batch_families:
+        family(name, kind, help_text)
+        lines.append(f"{name} {batch.get(field, 0)}")
+    family("dxf_batch_queue_wait_seconds", "gauge", "Queue wait of the most recently started background task.")
+    lines.append(f"dxf_batch_queue_wait_seconds {_format(batch.get('queue_wait_ms', 0) / 1000)}")
+
+    lane_families = (
+        ("dxf_batch_lane_queue_depth", "gauge", "Background tasks waiting by lane.", "queue_depth"),
+        ("dxf_batch_lane_active_tasks", "gauge", "Background tasks executing by lane.", "active"),
+        ("dxf_batch_lane_tasks_submitted_total", "counter", "Background tasks submitted by lane.", "submitted"),
+        ("dxf_batch_lane_tasks_rejected_total", "counter", "Background tasks refused by lane.", "rejected"),
+    )
+    for name, kind, help_text, field in lane_families:
+        family(name, kind, help_text)
+        for lane, totals in sorted(lanes.items()):
+            lines.append(f"{name}{_labels(lane=lane)} {totals[field]}")
+    family("dxf_batch_lane_queue_wait_seconds", "gauge", "Queue wait of each lane's most recently started task.")
+    for lane, totals in sorted(lanes.items()):
+        lines.append(f"dxf_batch_lane_queue_wait_seconds{_labels(lane=lane)} {_format(totals['queue_wait_ms'] / 1000)}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter:
+    """
+    Publishes this worker's metrics and renders the all-worker view.
+    With a shared directory, each worker flushes its snapshot periodically
+    (and on every scrape it serves); without one, only this process is reported.
+    Cache and batch stats come from the callables passed in by the application.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        interval: float = 5.0,
+        metrics: RequestMetrics = request_metrics,
+        cache_stats: Callable[[], Dict] = dict,
+        batch_stats: Callable[[], Dict] = dict
+    ):
+        self.store = SharedMetricsStore(directory) if directory else None
+        self.interval = interval
+        self.metrics = metrics
+        self.cache_stats = cache_stats
+        self.batch_stats = batch_stats
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def flush(self) -> None:
+        """Write this worker's snapshot to the shared directory."""
+        if self.store is None:
+            return
+        try:
+            self.store.write(self._snapshot())
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def _snapshot(self) -> dict:
+        return collect_process_metrics(self.metrics, self.cache_stats, self.batch_stats)
+
+    def scrape(self, openmetrics: bool = False) -> str:
+        """Render Prometheus (or OpenMetrics) text for all workers (or just this one)."""
+        if self.store is None:
+            return render([self._snapshot()], openmetrics)
+        self.flush()
+        return render(self.store.read_all(), openmetrics)
+
+    def start(self) -> None:
+        """Start the periodic flush thread (no-op without a shared directory)."""
+        if self.store is None or self._thread is not None:
+            return
+        os.makedirs(self.store.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+        logger.info(f"Sharing metrics via {self.store.directory} every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop the flush thread after a final flush."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
@@ -0,0 +1,131 @@
+"""
+RequestMetrics - Per-route request statistics for the web API.
+Single Responsibility: Aggregate request outcomes into totals and per-endpoint percentiles.
+"""
+from bisect import bisect_left
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from dxf_generator.monitoring.hyperloglog import UniqueClientEstimator
+from dxf_generator.monitoring.latency_histogram import LatencyHistogram, HistogramSnapshot
+from dxf_generator.monitoring.sliding_window import SlidingWindowStats
+
+PERCENTILES = (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))
+
+
+class RequestMetrics:
+    """
+    Request counters and latency histograms keyed by (route, status class).
+    Routes are labelled by their template (e.g. "POST /api/v1/parse"),
+    so path parameters do not multiply the number of series.
+    """
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.latency = LatencyHistogram()
+        self.clients = UniqueClientEstimator()
+        self.recent = SlidingWindowStats()
+        self._exemplars: Dict[tuple, Dict[str, Any]] = {}  # (route, status class, bucket) -> latest
+        self._exemplars_lock = threading.Lock()
+
+    def record(
+        self,
+        route: str,
+        status_code: int,
+        duration_ms: float,
+        client: Optional[str] = None
+    ) -> None:
+        """
+        Record one completed request.
+
+        Args:
+            route: Route label ("METHOD /template")
+            status_code: HTTP status sent to the client
+            duration_ms: Time until the last response byte was sent
+            client: Client host, if known
+        """
+        self.latency.record((route, f"{status_code // 100}xx"), duration_ms)
+        self.recent.record(duration_ms, status_code >= 400)
+        if client:
+            self.clients.add(client)
+
+    def record_exemplar(self, route: str, status_code: int, duration_ms: float, labels: Dict[str, str]) -> None:
+        """
+        Link the histogram bucket a request fell into to that request.
+
+        Only the latest exemplar per bucket is kept.
+
+        Args:
+            route: Route label ("METHOD /template")
+            status_code: HTTP status sent to the client
+            duration_ms: The request's latency
+            labels: Exemplar labels identifying the request (e.g. request_id)
+        """
+        bucket = bisect_left(self.latency.bounds, duration_ms)
+        with self._exemplars_lock:
+            self._exemplars[(route, f"{status_code // 100}xx", bucket)] = {
+                "labels": labels, "value_ms": duration_ms, "ts": time.time()
+            }
+
+    def exemplars(self) -> List[Dict[str, Any]]:
+        """Latest exemplar per (route, status class, bucket index)."""
+        with self._exemplars_lock:
+            items = list(self._exemplars.items())
+        return [
+            {"route": route, "status": status, "bucket": bucket, **exemplar}
+            for (route, status, bucket), exemplar in items
+        ]
+
+    def totals(self) -> Dict[str, Any]:
+        """Lifetime request totals across all routes."""
+        total_requests = 0
+        total_failures = 0
+        total_time = 0.0
+        for (_, status_class), snap in self.latency.snapshot().items():
+            total_requests += snap.count
+            total_time += snap.total
+            if status_class in ("4xx", "5xx"):
+                total_failures += snap.count
+        return {
+            "total_requests": total_requests,
+            "total_failures": total_failures,
+            "total_processing_time_ms": round(total_time, 2),
+            "start_time": self.start_time,
+        }
+
+    def endpoints(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-route request counts and latency percentiles.
+
+        Returns:
+            Dict of route -> {count, status, mean_ms, max_ms, p50_ms, p95_ms, p99_ms}
+        """
+        by_route: Dict[str, HistogramSnapshot] = {}
+        status: Dict[str, Dict[str, int]] = {}
+        for (route, status_class), snap in self.latency.snapshot().items():
+            by_route[route] = by_route[route].merge(snap) if route in by_route else snap
+            status.setdefault(route, {})[status_class] = snap.count
+
+        return {
+            route: {
+                "count": snap.count,
+                "status": dict(sorted(status[route].items())),
+                "mean_ms": round(snap.mean, 2),
+                "max_ms": round(snap.max, 2),
+                **{name: round(snap.percentile(q), 2) for name, q in PERCENTILES},
+            }
+            for route, snap in sorted(by_route.items())
+        }
+
+    def reset(self) -> None:
+        """Clear all statistics and restart the uptime clock."""
+        self.latency.reset()
+        self.clients.clear()
+        self.recent.reset()
+        with self._exemplars_lock:
+            self._exemplars.clear()
+        self.start_time = time.time()
+
+
+# Process-wide registry used by the web middleware and metrics endpoints
+request_metrics = RequestMetrics()
@@ -0,0 +1,164 @@
+"""
+SamplingProfiler - On-demand statistical CPU profiler for a running worker.
+Single Responsibility: Periodically sample all thread stacks and aggregate them into flamegraph and pstats-style views.
+"""
+from collections import Counter
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# (filename, first line, qualified name) identifies a function like pstats does
+FunctionKey = Tuple[str, int, str]
+
+DXF_PACKAGE = "dxf_generator"
+
+
+def _function_key(frame) -> FunctionKey:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name)
+
+
+def _label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread at a fixed interval from a helper thread.
+    Nothing is installed in the interpreter (no trace or profile hooks), so the
+    profiler costs nothing unless a sampling run is in progress.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()  # collapsed stack -> samples
+        self._self: Counter = Counter()  # FunctionKey -> samples as leaf
+        self._cumulative: Counter = Counter()  # FunctionKey -> samples anywhere on stack
+        self._modules: Dict[FunctionKey, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        """Begin sampling in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("profiler already running")
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread to exit."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(names.get(thread_id, str(thread_id)), frame)
+            self.samples += 1
+
+    def _sample(self, thread_name: str, frame) -> None:
+        labels: List[str] = []
+        seen = set()
+        leaf = True
+        while frame is not None:
+            key = _function_key(frame)
+            if leaf:
+                self._self[key] += 1
+                leaf = False
+            if key not in seen:
+                # Recursion counts once per sample, as in pstats' cumulative time
+                seen.add(key)
+                self._cumulative[key] += 1
+            if key not in self._modules:
+                self._modules[key] = frame.f_globals.get("__name__", "?")
+            labels.append(_label(frame))
+            frame = frame.f_back
+        labels.append(thread_name)
+        self._stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        """
+        Stacks in collapsed ("folded") format for flamegraph.pl / speedscope.
+
+        Returns:
+            One "root;...;leaf count" line per distinct stack
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+
+    def summary(self, limit: int = 30, package: Optional[str] = None) -> List[Dict]:
+        """
+        pstats-style table sorted by cumulative samples.
+
+        Args:
+            limit: Maximum number of rows
+            package: Only include functions from modules under this package
+
+        Returns:
+            Rows with function, location, self/cumulative samples, share and estimated time
+        """
+        total = max(self.samples, 1)
+        rows = []
+        for key, cumulative in self._cumulative.most_common():
+            module = self._modules[key]
+            if package and not (module == package or module.startswith(package + ".")):
+                continue
+            filename, lineno, name = key
+            own = self._self.get(key, 0)
+            rows.append({
+                "function": f"{module}:{name}",
+                "location": f"{filename}:{lineno}",
+                "self_samples": own,
+                "cum_samples": cumulative,
+                "self_pct": round(own / total * 100, 2),
+                "cum_pct": round(cumulative / total * 100, 2),
+                "self_ms": round(own * self.interval * 1000, 1),
+                "cum_ms": round(cumulative * self.interval * 1000, 1),
+            })
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def summary_text(self, limit: int = 30, package: Optional[str] = None) -> str:
+        """Render summary() as a pstats-like text table."""
+        lines = [
+            f"{self.samples} samples at {self.interval * 1000:.1f}ms over {self.elapsed:.2f}s",
+            "",
+            f"{'self%':>7} {'cum%':>7} {'self(ms)':>9} {'cum(ms)':>9}  function (location)",
+        ]
+        for row in self.summary(limit, package):
+            lines.append(
+                f"{row['self_pct']:>7.2f} {row['cum_pct']:>7.2f} {row['self_ms']:>9.1f} "
+                f"{row['cum_ms']:>9.1f}  {row['function']} ({row['location']})"
+            )
+        return "\n".join(lines)
+
+    def report(self, limit: int = 30) -> Dict:
+        """Full JSON report: run info, collapsed stacks and hot paths overall and in dxf_generator."""
+        return {
+            "seconds": round(self.elapsed, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "collapsed": self.collapsed(),
+            "summary": self.summary(limit),
+            "dxf_summary": self.summary(limit, package=DXF_PACKAGE),
+        }
+
+
+# One sampling run per worker process at a time
+profile_lock = threading.Lock()
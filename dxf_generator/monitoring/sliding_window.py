@@ -0,0 +1,113 @@
+"""
+SlidingWindowStats - Recent throughput, error rate and latency from a ring of 1-second slots.
+Single Responsibility: Answer "what is the load right now" over fixed trailing windows.
+"""
+from bisect import bisect_left
+import time
+from typing import Dict, List, Optional, Sequence
+from dxf_generator.monitoring.latency_histogram import DEFAULT_BUCKETS_MS, HistogramSnapshot
+
+# Window label -> length in seconds
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+class _Slot:
+    """Counters for one second of traffic."""
+    __slots__ = ("second", "requests", "errors", "counts", "total", "max")
+
+    def __init__(self, size: int):
+        self.second = -1
+        self.requests = 0
+        self.errors = 0
+        self.counts = [0] * size
+        self.total = 0.0
+        self.max = 0.0
+
+    def reset(self, second: int) -> None:
+        self.second = second
+        self.requests = 0
+        self.errors = 0
+        self.counts = [0] * len(self.counts)
+        self.total = 0.0
+        self.max = 0.0
+
+
+class SlidingWindowStats:
+    """
+    Ring buffer with one slot per second, covering the longest window.
+    A slot is reset when the ring wraps around to it, so memory is fixed
+    (one slot per second of the longest window) however much traffic arrives.
+    """
+
+    def __init__(
+        self,
+        windows: Dict[str, int] = WINDOWS,
+        buckets: Sequence[float] = DEFAULT_BUCKETS_MS
+    ):
+        self.windows = dict(windows)
+        self.bounds = tuple(sorted(buckets))
+        self.horizon = max(self.windows.values())
+        self.start_time = time.time()
+        self._slots: List[_Slot] = [_Slot(len(self.bounds) + 1) for _ in range(self.horizon)]
+
+    def record(self, duration_ms: float, failed: bool, now: Optional[float] = None) -> None:
+        """
+        Record one completed request.
+
+        Args:
+            duration_ms: Request latency
+            failed: Whether the request counts as an error
+            now: Timestamp (defaults to time.time())
+        """
+        second = int(time.time() if now is None else now)
+        slot = self._slots[second % self.horizon]
+        if slot.second != second:
+            slot.reset(second)
+        slot.requests += 1
+        slot.errors += failed
+        slot.counts[bisect_left(self.bounds, duration_ms)] += 1
+        slot.total += duration_ms
+        if duration_ms > slot.max:
+            slot.max = duration_ms
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Aggregate the trailing `seconds` (including the current second).
+
+        Returns:
+            Dict with requests, rps, error_rate and p50/p95/p99 latency in ms
+        """
+        now = time.time() if now is None else now
+        current = int(now)
+        requests = errors = 0
+        counts = [0] * (len(self.bounds) + 1)
+        total = peak = 0.0
+
+        for slot in self._slots:
+            if current - seconds < slot.second <= current:
+                requests += slot.requests
+                errors += slot.errors
+                counts = [a + b for a, b in zip(counts, slot.counts)]
+                total += slot.total
+                peak = max(peak, slot.max)
+
+        # Young processes have not observed a full window yet
+        elapsed = min(seconds, max(now - self.start_time, 1.0))
+        snap = HistogramSnapshot(self.bounds, counts, total, peak)
+        return {
+            "requests": requests,
+            "rps": round(requests / elapsed, 2),
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "p50_ms": round(snap.percentile(0.50), 2),
+            "p95_ms": round(snap.percentile(0.95), 2),
+            "p99_ms": round(snap.percentile(0.99), 2),
+        }
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Statistics for every configured window, keyed by label."""
+        return {label: self.window(seconds, now) for label, seconds in self.windows.items()}
+
+    def reset(self) -> None:
+        for slot in self._slots:
+            slot.reset(-1)
+        self.start_time = time.time()
@@ -0,0 +1,58 @@
+"""
+SlowRequestRecorder - Bounded buffer of the most recent slow requests.
+Single Responsibility: Keep the details of requests above a latency threshold for later inspection.
+"""
+from collections import deque
+import threading
+from typing import Dict, List, Optional
+
+from dxf_generator.config.env_config import config
+
+
+class SlowRequestRecorder:
+    """
+    Keeps the last `capacity` requests that took at least `threshold_ms`.
+
+    Entries are plain dicts built by SlowRequestMiddleware (request id,
+    route, status, duration, canonical spec, stage timings, cache outcome,
+    queue wait and worker); older entries fall off as new ones arrive.
+    """
+
+    def __init__(self, threshold_ms: float, capacity: int = 100):
+        self.threshold_ms = threshold_ms
+        self._entries: "deque[Dict]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return duration_ms >= self.threshold_ms
+
+    def record(self, entry: Dict) -> None:
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+    def entries(self, limit: Optional[int] = None, route: Optional[str] = None) -> List[Dict]:
+        """Recorded requests, newest first; optionally only one route label."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        if route is not None:
+            entries = [e for e in entries if e["route"] == route]
+        return entries[:limit] if limit else entries
+
+    def get(self, request_id: str) -> Optional[Dict]:
+        """The retained entry for a request id, if any."""
+        with self._lock:
+            for entry in reversed(self._entries):
+                if entry["request_id"] == request_id:
+                    return entry
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Slow requests served by this worker
+slow_request_recorder = SlowRequestRecorder(config.SLOW_REQUEST_THRESHOLD_MS, config.SLOW_REQUEST_BUFFER_SIZE)
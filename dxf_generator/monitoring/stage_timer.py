@@ -0,0 +1,94 @@
+"""
+StageTimer - Per-request stage timings carried in a context variable.
+Single Responsibility: Accumulate named stage durations and format them as a Server-Timing header.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from dxf_generator.monitoring.tracing import span
+
+_current: ContextVar[Optional["StageTimings"]] = ContextVar("stage_timings", default=None)
+
+
+class StageTimings:
+    """
+    Accumulated duration and call count per stage for one request.
+    Batch work running on executor threads adds into the same instance,
+    so repeated stages are reported as totals.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, List[float]] = {}  # name -> [total_ms, count]
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float) -> None:
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                self._stages[name] = [duration_ms, 1]
+            else:
+                entry[0] += duration_ms
+                entry[1] += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Stage totals in insertion order: {name: {"ms": total, "count": n}}."""
+        with self._lock:
+            return {
+                name: {"ms": round(total, 3), "count": int(count)}
+                for name, (total, count) in self._stages.items()
+            }
+
+    def header(self, total_ms: Optional[float] = None) -> str:
+        """
+        Format as a Server-Timing header value.
+
+        Args:
+            total_ms: Whole-request duration appended as the 'total' metric
+
+        Returns:
+            e.g. 'validate;dur=0.04, saveas;dur=1.20;desc="x12", total;dur=9.80'
+        """
+        parts = []
+        for name, stage in self.as_dict().items():
+            part = f"{name};dur={stage['ms']:.2f}"
+            if stage["count"] > 1:
+                part += f';desc="x{stage["count"]}"'
+            parts.append(part)
+        if total_ms is not None:
+            parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+
+def start_request() -> StageTimings:
+    """Begin collecting stage timings for the current request context."""
+    timings = StageTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a named stage of the current request.
+
+    The stage is also recorded as a span of the current trace. Costs two
+    context variable lookups when the request is neither timed nor traced
+    (CLI, tests, or both disabled).
+    """
+    timings = _current.get()
+    with span(name):
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.add(name, (time.perf_counter() - start) * 1000)
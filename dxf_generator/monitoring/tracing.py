@@ -0,0 +1,204 @@
+"""
+Tracer - In-process request tracing carried in context variables.
+Single Responsibility: Record nested spans per request (across executor threads) and export them as Chrome trace JSON.
+"""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from dxf_generator.config.env_config import config
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+
+class Span:
+    """One timed operation; times are perf_counter seconds."""
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "thread_id", "thread_name", "attrs")
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attrs: Dict):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        thread = threading.current_thread()
+        self.thread_id = thread.native_id
+        self.thread_name = thread.name
+        self.attrs = attrs
+
+
+class Trace:
+    """
+    Spans of one request. Executor tasks that inherit the request's context
+    keep adding spans after the response has been sent; beyond `max_spans`
+    further spans are counted as dropped instead of recorded.
+    """
+
+    def __init__(self, trace_id: str, max_spans: int = 500):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def open_span(self, name: str, parent: Optional[Span], attrs: Dict) -> Optional[Span]:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return None
+            self._next_id += 1
+            span = Span(name, self._next_id, parent.span_id if parent else None, attrs)
+            self.spans.append(span)
+            return span
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+
+@contextmanager
+def start_trace(trace_id: str, name: str, max_spans: int = 500, **attrs) -> Iterator[Trace]:
+    """
+    Begin a trace with a root span for the current context.
+
+    Context copies taken inside the block (e.g. by BatchProcessor.submit)
+    carry the trace, so work on other threads nests under the active span.
+    """
+    trace = Trace(trace_id, max_spans)
+    trace_token = _trace.set(trace)
+    root = trace.open_span(name, None, attrs)
+    span_token = _span.set(root)
+    try:
+        yield trace
+    finally:
+        root.end = time.perf_counter()
+        _span.reset(span_token)
+        _trace.reset(trace_token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """
+    Record a block as a span of the current trace, nested under the active span.
+
+    Costs a single context variable lookup when no trace is active. An
+    exception leaving the block is noted in the span's 'error' attribute.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.open_span(name, _span.get(), attrs)
+    if current is None:
+        yield None
+        return
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _span.reset(token)
+
+
+def chrome_trace(traces: List[Trace]) -> Dict:
+    """
+    Traces in the Chrome trace event format (chrome://tracing, Perfetto, speedscope).
+
+    Every span becomes a complete ("X") event on its thread; spans still
+    open are exported up to now and marked 'unfinished'.
+    """
+    pid = os.getpid()
+    now = time.perf_counter()
+    # perf_counter has no epoch; anchor it to wall-clock time so files from several workers line up
+    offset_us = (time.time() - now) * 1e6
+    events = []
+    threads = {}
+    for trace in traces:
+        with trace._lock:
+            spans = list(trace.spans)
+        for s in spans:
+            threads[s.thread_id] = s.thread_name
+            args = {"trace_id": trace.trace_id, "span_id": s.span_id, **s.attrs}
+            if s.parent_id is not None:
+                args["parent_id"] = s.parent_id
+            if s.end is None:
+                args["unfinished"] = True
+            events.append({
+                "name": s.name,
+                "cat": "dxf_generator",
+                "ph": "X",
+                "ts": round(s.start * 1e6 + offset_us, 3),
+                "dur": round(((s.end if s.end is not None else now) - s.start) * 1e6, 3),
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": args,
+            })
+        if trace.dropped:
+            events.append({
+                "name": "spans_dropped", "ph": "i", "s": "p", "pid": pid, "tid": 0,
+                "ts": round(trace.started_at * 1e6, 3),
+                "args": {"trace_id": trace.trace_id, "dropped": trace.dropped},
+            })
+    for tid, thread_name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class TraceRecorder:
+    """Keeps the most recent traces of this worker for export."""
+
+    def __init__(self, capacity: int = 200):
+        self._traces: "deque[Trace]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def traces(self, limit: Optional[int] = None, trace_id: Optional[str] = None) -> List[Trace]:
+        """Recorded traces, oldest first; optionally only the last `limit` or one id."""
+        with self._lock:
+            traces = list(self._traces)
+        if trace_id is not None:
+            traces = [t for t in traces if t.trace_id == trace_id]
+        return traces[-limit:] if limit else traces
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def export(self, path: str, limit: Optional[int] = None) -> int:
+        """
+        Write recorded traces to `path` as Chrome trace JSON (atomically).
+
+        Returns:
+            Number of traces written
+        """
+        traces = self.traces(limit)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(chrome_trace(traces), f)
+        os.replace(tmp, path)
+        return len(traces)
+
+
+# Traces recorded by TracingMiddleware in this worker
+trace_recorder = TraceRecorder(config.TRACE_BUFFER_SIZE)
@@ -0,0 +1,167 @@
+"""
+CaptureRecorder - Opt-in recording of generation and parse requests for replay.
+Single Responsibility: Queue request records off the hot path and append them to a size-capped per-worker ring file.
+"""
+import json
+import os
+import queue
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from dxf_generator.config.logging_config import logger
+
+_FILENAME = re.compile(rb'filename="([^"]*)"')
+
+# (ts, method, path, content_type, body_head, payload_bytes, truncated, status, cache, latency_ms)
+RawRecord = Tuple[float, str, str, str, bytes, int, bool, int, Optional[str], float]
+
+
+def capture_paths(directory: str, worker: str) -> Tuple[str, str]:
+    """Current and previous ring segment of a worker."""
+    return (
+        os.path.join(directory, f"capture-{worker}.jsonl"),
+        os.path.join(directory, f"capture-{worker}.1.jsonl"),
+    )
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {key: _canonical(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def describe_payload(content_type: str, body: bytes, payload_bytes: int, truncated: bool) -> Dict:
+    """
+    Canonical description of a request body.
+
+    Returns:
+        {"json": spec} with keys sorted at every level for a complete JSON
+        body, {"upload": {"filename", "bytes"}} for a multipart upload, or
+        {} when neither applies (no body, truncated or not JSON)
+    """
+    if content_type.startswith("multipart/"):
+        match = _FILENAME.search(body)
+        filename = match.group(1).decode("utf-8", "replace") if match else None
+        return {"upload": {"filename": filename, "bytes": payload_bytes}}
+    if body and not truncated:
+        try:
+            return {"json": _canonical(json.loads(body))}
+        except ValueError:
+            pass
+    return {}
+
+
+def format_record(raw: RawRecord, worker: str) -> Dict:
+    """
+    Turn a raw record into its JSONL form.
+
+    JSON bodies are re-serialized canonically (sorted keys) so equal specs
+    compare equal; uploads keep only the filename and size.
+    """
+    ts, method, path, content_type, body, payload_bytes, truncated, status, cache, latency_ms = raw
+    record = {"ts": round(ts, 6), "worker": worker, "method": method, "path": path}
+    record.update(describe_payload(content_type, body, payload_bytes, truncated))
+    record.update({
+        "payload_bytes": payload_bytes,
+        "status": status,
+        "cache": cache,
+        "latency_ms": round(latency_ms, 3),
+    })
+    return record
+
+
+class CaptureRecorder:
+    """
+    Appends request records to capture-<worker>.jsonl in `directory`.
+
+    record() only enqueues (dropping the record when the queue is full), and
+    a writer thread does the serialization and file I/O. When the current
+    segment reaches half of `max_bytes` it replaces the previous segment, so
+    a worker never keeps more than `max_bytes` on disk and always retains
+    its most recent traffic.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, queue_size: int = 10000, worker: Optional[str] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.worker = worker or str(os.getpid())
+        self._queue: "queue.Queue[Optional[RawRecord]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def record(self, raw: RawRecord) -> None:
+        """Queue a request record without blocking."""
+        try:
+            self._queue.put_nowait(raw)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="workload-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Workload capture writing to {capture_paths(self.directory, self.worker)[0]}")
+
+    def stop(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Workload capture stopped: {self.recorded} recorded, {self.dropped} dropped")
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "rotations": self.rotations,
+        }
+
+    def _run(self) -> None:
+        current, previous = capture_paths(self.directory, self.worker)
+        segment_limit = max(1, self.max_bytes // 2)
+        out = open(current, "ab")
+        size = out.tell()
+        try:
+            while True:
+                raw = self._queue.get()
+                batch = [raw]
+                # Drain whatever else is waiting, then write and flush once
+                while raw is not None:
+                    try:
+                        raw = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(raw)
+                for item in batch:
+                    if item is None:
+                        continue
+                    line = json.dumps(
+                        format_record(item, self.worker), sort_keys=True, separators=(",", ":")
+                    ).encode() + b"\n"
+                    if size and size + len(line) > segment_limit:
+                        out.close()
+                        os.replace(current, previous)
+                        out = open(current, "ab")
+                        size = 0
+                        self.rotations += 1
+                    out.write(line)
+                    size += len(line)
+                    self.recorded += 1
+                out.flush()
+                if batch[-1] is None:
+                    return
+        except Exception as e:
+            logger.error(f"Workload capture writer failed: {e}", exc_info=True)
+        finally:
+            out.close()
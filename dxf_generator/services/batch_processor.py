@@ -1,22 +1,264 @@
 """
 BatchProcessor - Handles concurrent task execution.
-Single Responsibility: Thread pool management, fire-and-forget submission.
+Single Responsibility: Thread pool management, fire-and-forget submission, admission control, lane scheduling.
 """
-from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import math
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
 from dxf_generator.config.env_config import config
 from dxf_generator.config.logging_config import logger
+from dxf_generator.exceptions.capacity import BatchTooLargeError, OverloadedError
+from dxf_generator.monitoring.stage_timer import current_timings
+from dxf_generator.monitoring.tracing import span
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BULK = "bulk"
+
+
+def parse_lanes(spec: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse a lane spec such as "interactive:20:0,batch:12:1,bulk:4:2".
+
+    Returns:
+        {name: (concurrency limit, priority)}; a lower priority number runs first
+    """
+    lanes = {}
+    for entry in spec.split(","):
+        if entry.strip():
+            name, limit, priority = entry.strip().split(":")
+            lanes[name] = (int(limit), int(priority))
+    return lanes
+
+
+class _Task(NamedTuple):
+    func: Callable
+    args: tuple
+    kwargs: dict
+    future: Future
+    context: contextvars.Context
+    submitted: float
+
+
+class _Lane:
+    """One named queue with its own concurrency limit, priority and admission state."""
+
+    def __init__(self, name: str, limit: int, priority: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.priority = priority
+        self.max_queue = max_queue
+        self.pending = deque()  # Submitted, not yet started
+        self.active = 0  # Currently running
+        self.submitted = 0
+        self.rejected = 0
+        self.last_wait = 0.0  # Queue wait of the most recently started task (seconds)
+        self.above_target_since = None  # Since when every started task waited longer than target
+        self.overloaded = False
+        self.service_time = 0.0  # Moving average of task run time (seconds)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.pending) or self.active > 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "priority": self.priority,
+            "queue_depth": len(self.pending),
+            "max_queue": self.max_queue,
+            "queue_wait_ms": round(self.last_wait * 1000, 3),
+            "overloaded": self.overloaded,
+            "active": self.active,
+            "submitted": self.submitted,
+            "rejected": self.rejected
+        }
+
 
 class BatchProcessor:
     """
     Manages concurrent task execution using ThreadPoolExecutor.
     Implements fire-and-forget pattern - returns immediately after submission.
+    
+    Work is submitted to a named lane (see parse_lanes). Each lane has its
+    own queue and concurrency limit within the shared pool of `max_workers`
+    threads. Free threads go to the highest-priority lane with work waiting,
+    and while a higher-priority lane has work queued or running, lower lanes
+    are held to one running task each, so a large batch cannot crowd out
+    interactive requests (for threads or for the GIL).
+    
+    Each lane's queue is bounded by admission control: submissions are
+    refused with OverloadedError when they would take the queue past
+    `max_queue`, or when every task started from it during the last
+    `interval_ms` had waited longer than `target_ms` (CoDel's standing-queue
+    test; a short burst that drains quickly is still admitted).
     """
-   
-    def __init__(self, max_workers: int = None):
+    
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue: int = None,
+        target_ms: float = None,
+        interval_ms: float = None,
+        lanes: Dict[str, Tuple[int, int]] = None
+    ):
         self._max_workers = max_workers or config.MAX_THREADS
+        self._max_queue = max_queue or config.BATCH_MAX_QUEUE  # Per lane
+        self._target = (target_ms or config.BATCH_QUEUE_TARGET_MS) / 1000
+        self._interval = (interval_ms or config.BATCH_QUEUE_INTERVAL_MS) / 1000
+        lanes = lanes or parse_lanes(config.BATCH_LANES)
+        self._lanes = {
+            name: _Lane(name, limit, priority, self._max_queue) for name, (limit, priority) in lanes.items()
+        }
+        self._by_priority = sorted(self._lanes.values(), key=lambda lane: lane.priority)
+        self._default_lane = BATCH if BATCH in self._lanes else self._by_priority[0].name
         self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
-        self._submitted_count = 0
+        self._running = 0
+        self._closed = False
+        self._state_lock = threading.Lock()
+        self._idle = threading.Condition(self._state_lock)
+    
+    def _lane(self, name: str = None) -> _Lane:
+        try:
+            return self._lanes[name or self._default_lane]
+        except KeyError:
+            raise ValueError(f"Unknown lane '{name}' (lanes: {', '.join(self._lanes)})")
+    
+    def _record_wait(self, lane: _Lane, waited: float, now: float) -> None:
+        """Update a lane's standing-queue state with one task's queue wait (lock held)."""
+        lane.last_wait = waited
+        if waited < self._target:
+            lane.above_target_since = None
+            lane.overloaded = False
+        elif lane.above_target_since is None:
+            lane.above_target_since = now
+        elif now - lane.above_target_since >= self._interval:
+            lane.overloaded = True
+    
+    def _admit(self, lane: _Lane, count: int) -> None:
+        """Count `count` tasks into `lane` or raise OverloadedError (lock held)."""
+        if count > lane.max_queue:
+            # Would be refused however empty the queue is, so retrying is pointless
+            lane.rejected += count
+            raise BatchTooLargeError(
+                f"Batch of {count} tasks exceeds the {lane.name} queue limit of {lane.max_queue}"
+            )
+        queued = len(lane.pending)
+        if queued + count > lane.max_queue:
+            reason = f"{lane.name} queue full ({queued} waiting, limit {lane.max_queue})"
+        elif lane.overloaded and queued:
+            reason = (
+                f"{lane.name} queue wait {lane.last_wait * 1000:.0f}ms above {self._target * 1000:.0f}ms target"
+            )
+        else:
+            lane.submitted += count
+            return
+        lane.rejected += count
+        # Time for the lane's threads to work through what is already queued
+        threads = min(lane.limit, self._max_workers)
+        retry_after = max(1, math.ceil(queued * lane.service_time / threads))
+        raise OverloadedError(f"Background work rejected: {reason}", retry_after=retry_after)
+    
+    def _dispatch(self) -> None:
+        """Start queued tasks on free threads, highest-priority lane first (lock held)."""
+        while self._running < self._max_workers:
+            chosen = None
+            busy_priority = None  # Best priority among busy lanes checked so far
+            for lane in self._by_priority:
+                yielding = busy_priority is not None and busy_priority < lane.priority
+                if lane.pending and lane.active < (1 if yielding else lane.limit):
+                    chosen = lane
+                    break
+                if lane.busy and busy_priority is None:
+                    busy_priority = lane.priority
+            if chosen is None:
+                return
+            task = chosen.pending.popleft()
+            chosen.active += 1
+            self._running += 1
+            self._executor.submit(self._run, chosen, task)
+    
+    def _drained(self) -> bool:
+        return self._running == 0 and not any(lane.pending for lane in self._by_priority)
+    
+    def _run(self, lane: _Lane, task: _Task) -> None:
+        """Execute a task on a pool thread, then hand the thread to the next queued task."""
+        started = time.perf_counter()
+        with self._state_lock:
+            self._record_wait(lane, started - task.submitted, started)
+        try:
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    # Run in the submitter's context (request id, stage timings, trace)
+                    result = task.context.run(self._call, lane, task, started)
+                except BaseException as exc:
+                    task.future.set_exception(exc)
+                else:
+                    task.future.set_result(result)
+        finally:
+            with self._state_lock:
+                lane.active -= 1
+                self._running -= 1
+                lane.service_time += 0.2 * ((time.perf_counter() - started) - lane.service_time)
+                self._dispatch()
+                finished = self._drained()
+                if finished:
+                    self._idle.notify_all()
+                close = finished and self._closed
+            if close:
+                self._executor.shutdown(wait=False)
+    
+    def _call(self, lane: _Lane, task: _Task, started: float):
+        queued_ms = round((started - task.submitted) * 1000, 3)
+        timings = current_timings()
+        if timings is not None:
+            timings.add("queue_wait", queued_ms)
+        name = getattr(task.func, "__qualname__", repr(task.func))
+        with span("batch.task", task=name, lane=lane.name, queued_ms=queued_ms):
+            return task.func(*task.args, **task.kwargs)
+    
+    def _enqueue(
+        self,
+        lane: _Lane,
+        tasks: List[tuple],
+        on_success: Callable = None,
+        on_error: Callable = None,
+        fire_and_forget: bool = True
+    ) -> List[Future]:
+        """Admit (func, args, kwargs) tasks into `lane` as a whole and queue them."""
+        def callback(f):
+            exc = f.exception()
+            if exc:
+                logger.error(f"Task failed: {exc}", exc_info=True)
+                if on_error:
+                    on_error(exc)
+            else:
+                if on_success:
+                    on_success()
+        
+        queued = []
+        for func, args, kwargs in tasks:
+            # Carry the caller's context (request id, stage timings, trace) into the worker;
+            # one copy per task, as a context can only be entered by one thread at a time
+            context = contextvars.copy_context()
+            future = Future()
+            if fire_and_forget:
+                # Callbacks run in the task's context too, so their log lines keep the request id
+                future.add_done_callback(lambda f, context=context: context.run(callback, f))
+            queued.append(_Task(func, args, kwargs, future, context, time.perf_counter()))
+        
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            self._admit(lane, len(queued))
+            lane.pending.extend(queued)
+            self._dispatch()
+        return [task.future for task in queued]
     
     def submit(
         self,
@@ -24,6 +266,7 @@ class BatchProcessor:
         *args,
         on_success: Callable = None,
         on_error: Callable = None,
+        lane: str = None,
         **kwargs
     ) -> None:
         """
@@ -34,28 +277,38 @@ class BatchProcessor:
             *args: Positional arguments for func
             on_success: Optional callback on success (receives result)
             on_error: Optional callback on error (receives exception)
+            lane: Lane to run in (default: "batch")
             **kwargs: Keyword arguments for func
+        
+        Raises:
+            OverloadedError: If admission control refuses the task
         """
-        future = self._executor.submit(func, *args, **kwargs)
-        self._submitted_count += 1
+        self._enqueue(self._lane(lane), [(func, args, kwargs)], on_success, on_error)
+    
+    def run(self, func: Callable, *args, lane: str = INTERACTIVE, **kwargs) -> Future:
+        """
+        Submit a task whose caller waits for the result.
         
-        def callback(f):
-            exc = f.exception()
-            if exc:
-                logger.error(f"Task failed: {exc}", exc_info=True)
-                if on_error:
-                    on_error(exc)
-            else:
-                if on_success:
-                    on_success()
+        Args:
+            func: Function to execute
+            *args: Positional arguments for func
+            lane: Lane to run in (default: "interactive")
+            **kwargs: Keyword arguments for func
         
-        future.add_done_callback(callback)
+        Returns:
+            Future resolving to func's result (await it with asyncio.wrap_future)
+        
+        Raises:
+            OverloadedError: If admission control refuses the task
+        """
+        return self._enqueue(self._lane(lane), [(func, args, kwargs)], fire_and_forget=False)[0]
     
     def submit_batch(
         self,
         tasks: List[tuple],
         on_task_complete: Callable = None,
-        on_task_error: Callable = None
+        on_task_error: Callable = None,
+        lane: str = None
     ) -> int:
         """
         Submit multiple tasks for async execution.
@@ -64,45 +317,113 @@ class BatchProcessor:
             tasks: List of (func, args, kwargs) tuples
             on_task_complete: Callback for each completed task
             on_task_error: Callback for each failed task
-            
+            lane: Lane to run in (default: "batch")
+        
         Returns:
             Number of tasks submitted
+        
+        Raises:
+            OverloadedError: If admission control refuses the batch (no task is submitted)
+            BatchTooLargeError: If the batch is larger than the lane's whole queue
+        """
+        normalized = self._normalize(tasks)
+        # All or nothing: a refused batch queues no task, so it writes no files
+        target = self._lane(lane)
+        self._enqueue(target, normalized, on_task_complete, on_task_error)
+        
+        logger.info(f"Batch submitted: {len(normalized)} tasks queued in lane {target.name}")
+        return len(normalized)
+    
+    def run_batch(self, tasks: List[tuple], lane: str = None) -> List[Future]:
         """
+        Submit multiple tasks whose caller waits for the results.
         
-        count = 0
+        Args:
+            tasks: List of (func, args, kwargs) tuples
+            lane: Lane to run in (default: "batch")
+        
+        Returns:
+            One Future per task, in order (await them with asyncio.wrap_future)
+        
+        Raises:
+            OverloadedError: If admission control refuses the batch (no task is submitted)
+            BatchTooLargeError: If the batch is larger than the lane's whole queue
+        """
+        normalized = self._normalize(tasks)
+        target = self._lane(lane)
+        futures = self._enqueue(target, normalized, fire_and_forget=False)
+        
+        logger.info(f"Batch submitted: {len(normalized)} tasks queued in lane {target.name}")
+        return futures
+    
+    @staticmethod
+    def _normalize(tasks: List[tuple]) -> List[tuple]:
+        """Pad (func,) and (func, args) tasks to (func, args, kwargs)."""
+        normalized = []
         for task in tasks:
             if len(task) == 1:
-                func, args, kwargs = task[0], (), {}
+                normalized.append((task[0], (), {}))
             elif len(task) == 2:
-                func, args, kwargs = task[0], task[1], {}
+                normalized.append((task[0], task[1], {}))
             else:
-                func, args, kwargs = task[0], task[1], task[2]
-            
-            self.submit(
-                func,
-                *args,
-                on_success=on_task_complete,
-                on_error=on_task_error,
-                **kwargs
-            )
-            count += 1
-        
-        logger.info(f"Batch submitted: {count} tasks queued")
-        return count
+                normalized.append((task[0], task[1], task[2]))
+        return normalized
+    
+    @property
+    def lanes(self) -> List[str]:
+        """Lane names, highest priority first."""
+        return [lane.name for lane in self._by_priority]
     
     @property
     def submitted_count(self) -> int:
         """Total number of tasks submitted."""
-        return self._submitted_count
+        return sum(lane.submitted for lane in self._by_priority)
+    
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting for a free worker thread."""
+        return sum(len(lane.pending) for lane in self._by_priority)
+    
+    @property
+    def active_workers(self) -> int:
+        """Tasks currently executing."""
+        return self._running
+    
+    @property
+    def queue_wait_ms(self) -> float:
+        """Longest queue wait among each lane's most recently started task."""
+        return round(max(lane.last_wait for lane in self._by_priority) * 1000, 3)
+    
+    @property
+    def stats(self) -> dict:
+        """Executor statistics, totalled over lanes, with each lane's own under 'lanes'."""
+        with self._state_lock:
+            lanes = {lane.name: lane.stats for lane in self._by_priority}
+        return {
+            "max_workers": self._max_workers,
+            "queue_depth": sum(s["queue_depth"] for s in lanes.values()),
+            "max_queue": sum(s["max_queue"] for s in lanes.values()),
+            "queue_wait_ms": max(s["queue_wait_ms"] for s in lanes.values()),
+            "overloaded": any(s["overloaded"] for s in lanes.values()),
+            "active_workers": sum(s["active"] for s in lanes.values()),
+            "submitted": sum(s["submitted"] for s in lanes.values()),
+            "rejected": sum(s["rejected"] for s in lanes.values()),
+            "lanes": lanes
+        }
     
     def shutdown(self, wait: bool = False) -> None:
         """
-        Shutdown the executor.
+        Shutdown the executor. Tasks already submitted still run.
         
         Args:
             wait: If True, wait for pending tasks to complete
         """
-        self._executor.shutdown(wait=wait)
+        with self._state_lock:
+            self._closed = True
+            if wait:
+                self._idle.wait_for(self._drained)
+            drained = self._drained()
+        # Otherwise the last running task shuts the executor down once the lanes drain
+        if drained:
+            self._executor.shutdown(wait=wait)
         logger.info(f"BatchProcessor shutdown (wait={wait})")
-
-
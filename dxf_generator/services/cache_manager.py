@@ -2,9 +2,39 @@
 CacheManager - Handles in-memory caching with eviction policy.
 Single Responsibility: Cache storage, key generation, and eviction.
 """
-from typing import Any, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import sys
 import threading
-from dxf_generator.config.logging_config import logger
+from dxf_generator.config.logging_config import log_event, logger
+from dxf_generator.monitoring.stage_timer import stage
+
+
+def estimate_size(value: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate the memory held by a cached value in bytes.
+    
+    Byte strings (generated DXF/ZIP content) are counted exactly; containers
+    such as parse results are walked recursively.
+    
+    Args:
+        value: Object to measure
+        seen: ids already counted; pass a shared set to count objects
+            referenced from several places only once
+    """
+    if seen is not None:
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, seen) for v in value)
+    return sys.getsizeof(value)
 
 
 class CacheManager:
@@ -19,6 +49,9 @@ class CacheManager:
         self._name = name
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._sizes: dict = {}  # key -> estimated bytes
+        self._bytes = 0
         self._lock = threading.RLock()
     
     def get_key(self, obj: Any) -> str:
@@ -36,6 +69,16 @@ class CacheManager:
         data_hash = hash(frozenset(sorted(obj.data.items())))
         return f"{class_name}_{data_hash}"
     
+    @contextmanager
+    def _locked(self):
+        """Hold the cache lock, timing the wait as the 'cache_lock' stage."""
+        with stage("cache_lock"):
+            self._lock.acquire()
+        try:
+            yield
+        finally:
+            self._lock.release()
+    
     def get(self, key: str) -> Optional[Any]:
         """
         Retrieve item from cache (Thread-Safe).
@@ -46,14 +89,14 @@ class CacheManager:
         Returns:
             Cached value or None if not found
         """
-        with self._lock:
+        with self._locked():
             if key in self._cache:
                 self._hits += 1
-                logger.debug(f"[{self._name}] Cache hit: {key}")
+                log_event("cache.hit", cache=self._name, key=key)
                 return self._cache[key]
             
             self._misses += 1
-            logger.debug(f"[{self._name}] Cache miss: {key}")
+            log_event("cache.miss", cache=self._name, key=key)
             return None
     
     def set(self, key: str, value: Any) -> None:
@@ -64,14 +107,19 @@ class CacheManager:
             key: Cache key
             value: Value to store
         """
-        with self._lock:
+        size = estimate_size(value)
+        with self._locked():
             self._cache[key] = value
+            self._bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
             
             # FIFO eviction if over limit
             if len(self._cache) > self._max_size:
                 evicted_key = next(iter(self._cache))
                 self._cache.pop(evicted_key)
-                logger.debug(f"[{self._name}] Cache eviction: {evicted_key}")
+                self._bytes -= self._sizes.pop(evicted_key)
+                self._evictions += 1
+                log_event("cache.evict", cache=self._name, key=evicted_key)
     
     def contains(self, key: str) -> bool:
         """Check if key exists in cache (Thread-Safe)."""
@@ -82,8 +130,34 @@ class CacheManager:
         """Clear all cached items (Thread-Safe)."""
         with self._lock:
             self._cache.clear()
+            self._sizes.clear()
+            self._bytes = 0
             logger.info(f"[{self._name}] Cache cleared")
     
+    def footprint(self) -> Dict[str, int]:
+        """
+        Exact deep size of the cache, walking every key and value (Thread-Safe).
+        
+        Objects shared between entries are counted once. Slower than the
+        incremental 'bytes' statistic; meant for diagnostics.
+        
+        Returns:
+            Dict with entries, container_bytes, key_bytes, value_bytes and total_bytes
+        """
+        with self._lock:
+            seen = set()
+            container = sys.getsizeof(self._cache)
+            keys = sum(estimate_size(k, seen) for k in self._cache)
+            values = sum(estimate_size(v, seen) for v in self._cache.values())
+            entries = len(self._cache)
+        return {
+            "entries": entries,
+            "container_bytes": container,
+            "key_bytes": keys,
+            "value_bytes": values,
+            "total_bytes": container + keys + values
+        }
+    
     @property
     def size(self) -> int:
         """Current cache size."""
@@ -98,5 +172,7 @@ class CacheManager:
             "hits": self._hits,
             "misses": self._misses,
             "size": self.size,
-            "hit_rate": f"{hit_rate:.1f}%"
+            "hit_rate": f"{hit_rate:.1f}%",
+            "evictions": self._evictions,
+            "bytes": self._bytes
         }
@@ -2,7 +2,9 @@
 DXFGenerator - Handles DXF file generation.
 Single Responsibility: Generate DXF content from component data, write to disk.
 """
-from dxf_generator.config.logging_config import logger
+from dxf_generator.config.logging_config import log_event, logger
+from dxf_generator.monitoring.stage_timer import stage
+from dxf_generator.monitoring.tracing import span
 
 
 class DXFGenerator:
@@ -23,15 +25,15 @@ class DXFGenerator:
         Returns:
             Generated DXF file content as bytes
         """
-        logger.debug(f"Generating DXF: {filename}")
-        logger.debug(f"Component data: {component.data}")
+        log_event("dxf.generate", filename=filename, data=lambda: component.data)
         
-        # Delegate to component's generation method
-        component.generate_dxf(filename)
-        
-        # Read back for caching
-        with open(filename, 'rb') as f:
-            content = f.read()
+        with span("generate", component=type(component).__name__):
+            # Delegate to component's generation method
+            component.generate_dxf(filename)
+            
+            # Read back for caching
+            with stage("readback"), open(filename, 'rb') as f:
+                content = f.read()
         
         logger.info(f"Generated DXF: {filename} ({len(content)} bytes)")
         return content
@@ -47,4 +49,4 @@ class DXFGenerator:
         """
         with open(filename, 'wb') as f:
             f.write(content)
-        logger.debug(f"Wrote cached content to: {filename}")
+        log_event("dxf.write_cached", filename=filename)
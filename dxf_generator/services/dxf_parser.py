@@ -3,8 +3,16 @@ DXFParser - Handles DXF file parsing and dimension extraction.
 Single Responsibility: Read DXF files, identify shapes, extract dimensions.
 """
 import ezdxf
+from ezdxf import recover
+from ezdxf.math import Matrix44
 import hashlib
-from typing import Dict, Any
+import math
+import os
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from dxf_generator.services.block_resolver import BlockResolver, BlockContent
+from dxf_generator.services.dxf_scanner import DXFScanner, InsertRef, LayoutGeometry
+from dxf_generator.services.segment_chainer import SegmentChainer
+from dxf_generator.config.env_config import config
 from dxf_generator.config.logging_config import logger
 
 
@@ -32,12 +40,20 @@ class DXFParser:
         return hasher.hexdigest()
     
     @classmethod
-    def parse(cls, filepath: str) -> Dict[str, Any]:
+    def parse(
+        cls,
+        filepath: str,
+        recover_mode: bool = False,
+        large_file: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
         Parse a DXF file and extract dimensions.
         
         Args:
             filepath: Path to DXF file
+            recover_mode: Load with ezdxf.recover, which tolerates structural damage
+            large_file: Use the memory-mapped scanner instead of ezdxf
+                (None = decide from PARSE_LARGE_FILE_BYTES)
             
         Returns:
             Dict with 'type' (ibeam/column) and 'data' (dimensions)
@@ -49,20 +65,35 @@ class DXFParser:
         logger.debug(f"Parsing DXF file: {filepath}")
         
         try:
-            doc = ezdxf.readfile(filepath)
+            if large_file is None:
+                large_file = not recover_mode and cls._is_large_file(filepath)
+            if large_file:
+                return cls.parse_large(filepath)
+            
+            if recover_mode:
+                doc, auditor = recover.readfile(filepath)
+                if auditor.has_errors:
+                    logger.warning(f"Recovered {filepath} with {len(auditor.errors)} unfixable error(s)")
+            else:
+                doc = ezdxf.readfile(filepath)
             msp = doc.modelspace()
             
             polylines = msp.query('LWPOLYLINE')
-            if not polylines:
-                logger.warning(f"No LWPOLYLINE found in: {filepath}")
-                raise ValueError("No LWPOLYLINE found in DXF")
-            
-            logger.debug(f"Found {len(polylines)} polylines")
-            
-            polyline = polylines[0]
-            points = list(polyline.get_points())
+            if polylines:
+                logger.debug(f"Found {len(polylines)} polylines")
+                
+                polyline = polylines[0]
+                points = list(polyline.get_points())
+                
+                return cls._identify_shape(points, filepath)
             
-            return cls._identify_shape(points, filepath)
+            placements = [(ref.dxf.name, ref.matrix44()) for ref in msp.query('INSERT')]
+            return cls._parse_secondary(
+                placements,
+                lambda name: cls._load_ezdxf_block(doc, name),
+                cls._collect_segments(msp),
+                filepath
+            )
             
         except ezdxf.DXFError as e:
             logger.error(f"DXF parsing error: {e}")
@@ -73,6 +104,223 @@ class DXFParser:
             logger.error(f"Unexpected error parsing {filepath}: {e}", exc_info=True)
             raise ValueError(f"Failed to parse DXF: {str(e)}") from e
     
+    @classmethod
+    def parse_large(cls, filepath: str) -> Dict[str, Any]:
+        """
+        Parse a large ASCII DXF from a memory map without building a document.
+        
+        Group codes are scanned straight from the mapped file and only the
+        entities needed for identification are materialized, so peak memory
+        does not grow with file size (apart from the geometry actually kept).
+        
+        Args:
+            filepath: Path to DXF file
+            
+        Returns:
+            Dict with 'type' and 'data' keys (and 'instances' for block references)
+            
+        Raises:
+            ValueError: If the file is binary, malformed or has no supported profile
+        """
+        logger.debug(f"Parsing DXF file in large-file mode: {filepath}")
+        
+        with DXFScanner.open_buffer(filepath) as data:
+            if DXFScanner.is_binary(data):
+                raise ValueError("Large-file mode supports ASCII DXF only")
+            
+            # Pass 1 stops at the first LWPOLYLINE, like the ezdxf path
+            points = DXFScanner.first_lwpolyline(data)
+            if points is not None:
+                return cls._identify_shape(points, filepath)
+            
+            # Pass 2 only runs when the file has no LWPOLYLINE
+            modelspace, blocks = DXFScanner.collect_geometry(data)
+        
+        def load_block(name: str) -> Optional[BlockContent]:
+            block = blocks.get(name)
+            if block is None:
+                return None
+            return BlockContent(
+                profiles=block.lwpolylines
+                + (SegmentChainer().chain(block.segments) if block.segments else []),
+                inserts=[(ref.name, cls._insert_matrix(ref, blocks)) for ref in block.inserts]
+            )
+        
+        placements = [(ref.name, cls._insert_matrix(ref, blocks)) for ref in modelspace.inserts]
+        return cls._parse_secondary(placements, load_block, modelspace.segments, filepath)
+    
+    @staticmethod
+    def _is_large_file(filepath: str) -> bool:
+        """Whether a file should be parsed in large-file mode (ASCII, above threshold)."""
+        try:
+            if os.path.getsize(filepath) < config.PARSE_LARGE_FILE_BYTES:
+                return False
+            with open(filepath, 'rb') as f:
+                return not DXFScanner.is_binary(f.read(len(DXFScanner.BINARY_SENTINEL)))
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _insert_matrix(ref: InsertRef, blocks: Dict[str, LayoutGeometry]) -> Matrix44:
+        """Block -> parent transform of a scanned INSERT."""
+        block = blocks.get(ref.name)
+        bx, by, bz = block.base_point if block else (0.0, 0.0, 0.0)
+        return Matrix44.chain(
+            Matrix44.translate(-bx, -by, -bz),
+            Matrix44.scale(*ref.scale),
+            Matrix44.z_rotate(math.radians(ref.rotation)),
+            Matrix44.translate(*ref.insert)
+        )
+    
+    @staticmethod
+    def _load_ezdxf_block(doc, name: str) -> Optional[BlockContent]:
+        """Profile-relevant content of a block in an ezdxf document."""
+        block = doc.blocks.get(name)
+        if block is None:
+            return None
+        segments = DXFParser._collect_segments(block)
+        return BlockContent(
+            profiles=[list(p.get_points()) for p in block.query('LWPOLYLINE')]
+            + (SegmentChainer().chain(segments) if segments else []),
+            inserts=[(ref.dxf.name, ref.matrix44()) for ref in block.query('INSERT')]
+        )
+    
+    @classmethod
+    def _parse_secondary(
+        cls,
+        placements: List[Tuple[str, Matrix44]],
+        load_block: Callable[[str], Optional[BlockContent]],
+        segments: list,
+        filepath: str
+    ) -> Dict[str, Any]:
+        """
+        Identify profiles when modelspace has no LWPOLYLINE.
+        
+        Block references are tried first, then loose segments.
+        
+        Raises:
+            ValueError: If neither yields a supported profile
+        """
+        # Profiles placed as block references
+        if placements:
+            result = cls._parse_placements(placements, load_block, filepath)
+            if result:
+                return result
+        
+        # Profiles drawn as loose LINE/ARC/POLYLINE segments
+        if segments:
+            result = cls._parse_segments(segments, filepath)
+            if result:
+                return result
+        
+        if placements or segments:
+            logger.warning(f"No supported profile found in: {filepath}")
+            raise ValueError(
+                "No supported profile found in block references or segments"
+            )
+        
+        logger.warning(f"No LWPOLYLINE found in: {filepath}")
+        raise ValueError("No LWPOLYLINE found in DXF")
+    
+    @classmethod
+    def _parse_placements(
+        cls,
+        placements: List[Tuple[str, Matrix44]],
+        load_block: Callable[[str], Optional[BlockContent]],
+        filepath: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resolve block references into placed profile instances.
+        
+        Each block definition is classified once; every INSERT then only
+        costs a matrix product per profile in its block.
+        
+        Args:
+            placements: (block name, insert matrix) per modelspace INSERT
+            load_block: Returns the content of a named block
+            filepath: Source file path (for logging)
+            
+        Returns:
+            Dict with the first instance's 'type' and 'data', plus all 'instances',
+            or None if no block reference places a supported profile
+        """
+        resolver = BlockResolver(load_block, cls._classify_points)
+        instances = []
+        for name, matrix in placements:
+            instances.extend(resolver.place(name, matrix))
+        
+        logger.debug(
+            f"Resolved {len(placements)} inserts from {resolver.resolved_count} block definitions"
+        )
+        
+        if not instances:
+            logger.debug(f"No supported profile in block references: {filepath}")
+            return None
+        
+        first = instances[0]
+        logger.info(f"Parsed {len(instances)} placed profile(s) from block references")
+        return {
+            "type": first["type"],
+            "data": first["data"],
+            "instances": instances
+        }
+    
+    @staticmethod
+    def _collect_segments(layout) -> list:
+        """
+        Collect LINE, ARC and 2D/3D POLYLINE geometry as endpoint pairs.
+        
+        Args:
+            layout: Modelspace or block layout
+            
+        Returns:
+            List of (start, end) segments
+        """
+        segments = []
+        for entity in layout.query('LINE ARC POLYLINE'):
+            kind = entity.dxftype()
+            if kind == 'LINE':
+                segments.append((entity.dxf.start, entity.dxf.end))
+            elif kind == 'ARC':
+                segments.append((entity.start_point, entity.end_point))
+            elif entity.is_2d_polyline or entity.is_3d_polyline:
+                points = list(entity.points())
+                if entity.is_closed and points:
+                    points.append(points[0])
+                segments.extend(zip(points, points[1:]))
+        return segments
+    
+    @classmethod
+    def _parse_segments(cls, segments: list, filepath: str) -> Optional[Dict[str, Any]]:
+        """
+        Chain loose segments into closed loops and identify the first supported one.
+        
+        Args:
+            segments: (start, end) endpoint pairs
+            filepath: Source file path (for logging)
+            
+        Returns:
+            Dict with shape type and dimensions, or None if no loop is supported
+        """
+        loops = SegmentChainer().chain(segments)
+        logger.debug(f"Reconstructed {len(loops)} loop(s) from {len(segments)} segments")
+        
+        for loop in loops:
+            shape = cls._classify_points(loop)
+            if shape:
+                return shape
+        
+        logger.debug(f"No supported loop among {len(loops)} in: {filepath}")
+        return None
+    
+    @classmethod
+    def _classify_points(cls, points: list) -> Optional[Dict[str, Any]]:
+        """Identify a vertex list, returning None instead of raising if unsupported."""
+        try:
+            return cls._identify_shape(points, "<block>")
+        except (ValueError, IndexError, TypeError):
+            return None
+    
     @classmethod
     def _identify_shape(cls, points: list, filepath: str) -> Dict[str, Any]:
         """
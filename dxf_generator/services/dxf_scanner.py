@@ -0,0 +1,379 @@
+"""
+DXFScanner - Fast group-code scanner for ASCII DXF files.
+Single Responsibility: Tokenize tag pairs and pick out entities without building a document.
+"""
+import hashlib
+import math
+import mmap
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+from dxf_generator.config.logging_config import logger
+
+Tag = Tuple[int, bytes]
+Buffer = Union[bytes, mmap.mmap]
+
+# Scanned regions of a mapping are released after this many bytes, keeping RSS flat
+RELEASE_INTERVAL_BYTES = 16 * 1024 * 1024
+
+
+class InsertRef(NamedTuple):
+    """Raw INSERT parameters as stored in the file."""
+    name: str
+    insert: Tuple[float, float, float]
+    scale: Tuple[float, float, float]
+    rotation: float
+
+
+class LayoutGeometry(NamedTuple):
+    """Profile-relevant geometry of modelspace or of one block definition."""
+    base_point: Tuple[float, float, float]
+    lwpolylines: List[list]
+    inserts: List[InsertRef]
+    segments: List[tuple]
+
+
+class DXFScanner:
+    """
+    Scans ASCII DXF group-code/value pairs without ezdxf.
+    Used as the cheap first parsing tier: it can answer simple files directly
+    and tells the caller to fall back to a full parse when it cannot.
+    Works on bytes or on a read-only memory map, so large files are scanned
+    lazily without copying them into memory.
+    """
+
+    BINARY_SENTINEL = b"AutoCAD Binary DXF"
+
+    # Entities whose data determines the parse result
+    GEOMETRY_ENTITIES = {
+        b"LWPOLYLINE", b"LINE", b"ARC", b"CIRCLE", b"POLYLINE", b"VERTEX",
+        b"INSERT", b"BLOCK"
+    }
+
+    # Entities materialized by collect_geometry
+    LAYOUT_ENTITIES = {
+        b"LWPOLYLINE", b"LINE", b"ARC", b"POLYLINE", b"VERTEX", b"SEQEND",
+        b"INSERT", b"BLOCK", b"ENDBLK"
+    }
+
+    @classmethod
+    def is_binary(cls, data: Buffer) -> bool:
+        """Check for the binary DXF sentinel."""
+        return data[:len(cls.BINARY_SENTINEL)] == cls.BINARY_SENTINEL
+
+    @staticmethod
+    @contextmanager
+    def open_buffer(filepath: str) -> Iterator[Buffer]:
+        """
+        Memory-map a file read-only for scanning.
+
+        Args:
+            filepath: Path to file
+
+        Yields:
+            mmap object (or b"" for an empty file, which cannot be mapped)
+        """
+        with open(filepath, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                yield b""
+                return
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    @classmethod
+    def iter_tags(cls, data: Buffer) -> Iterator[Tag]:
+        """
+        Iterate (group code, value) pairs of an ASCII DXF.
+
+        Args:
+            data: Raw file content or memory map
+
+        Yields:
+            (code, stripped value bytes)
+
+        Raises:
+            ValueError: If a group code line is not an integer
+        """
+        for code, value, _ in cls._iter_tags_from(data, 0):
+            yield code, value
+
+    @staticmethod
+    def _iter_tags_from(data: Buffer, pos: int) -> Iterator[Tuple[int, bytes, int]]:
+        """Iterate (code, value, next position) from a byte offset, copying only tag slices."""
+        size = len(data)
+        releasable = hasattr(data, "madvise")
+        released = pos - pos % mmap.PAGESIZE
+
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end == -1:
+                break  # Dangling group code without a value
+            value_end = data.find(b"\n", end + 1)
+            if value_end == -1:
+                value_end = size
+
+            try:
+                code = int(data[pos:end])
+            except ValueError:
+                raise ValueError(
+                    f"Malformed DXF: invalid group code {data[pos:end][:20]!r} at offset {pos}"
+                ) from None
+
+            next_pos = value_end + 1
+            yield code, data[end + 1:value_end].strip(), next_pos
+
+            if releasable and next_pos - released >= RELEASE_INTERVAL_BYTES:
+                # Drop already-scanned pages from this process; the file stays in page cache
+                upto = next_pos - next_pos % mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, released, upto - released)
+                released = upto
+            pos = next_pos
+
+    @staticmethod
+    def _find_section_end(data: Buffer, pos: int) -> int:
+        """Offset of the next '0/ENDSEC' tag at or after pos, or -1."""
+        while True:
+            index = data.find(b"ENDSEC", pos)
+            if index == -1:
+                return -1
+            pos = index + 6
+            if data[index - 1:index] != b"\n" or data[pos:pos + 1] not in (b"\r", b"\n", b""):
+                continue
+            code_start = data.rfind(b"\n", 0, index - 1) + 1
+            if data[code_start:index - 1].strip() == b"0":
+                return code_start
+
+    @classmethod
+    def iter_entities(
+        cls,
+        data: Buffer,
+        sections: Sequence[bytes] = (b"ENTITIES",),
+        types: Optional[Set[bytes]] = None
+    ) -> Iterator[Tuple[bytes, bytes, List[Tag]]]:
+        """
+        Iterate entities of the requested sections.
+
+        Other sections are skipped with a byte search instead of tag by tag.
+
+        Args:
+            data: Raw file content or memory map
+            sections: Section names to report (e.g. b"ENTITIES", b"BLOCKS")
+            types: Only materialize tags of these entity types (None = all)
+
+        Yields:
+            (section name, entity type, tags after the type tag)
+        """
+        section = None
+        pending_section = False
+        entity_type = None
+        tags: List[Tag] = []
+        pos = 0
+
+        while pos != -1:
+            resume = -1
+            for code, value, next_pos in cls._iter_tags_from(data, pos):
+                if code == 0:
+                    if entity_type is not None:
+                        yield section, entity_type, tags
+                        entity_type, tags = None, []
+                    if value == b"SECTION":
+                        pending_section = True
+                    elif value == b"ENDSEC":
+                        section = None
+                    elif value == b"EOF":
+                        return
+                    elif section in sections and (types is None or value in types):
+                        entity_type = value
+                    continue
+
+                if pending_section and code == 2:
+                    section, pending_section = value, False
+                    if section not in sections:
+                        resume = cls._find_section_end(data, next_pos)
+                        break
+                elif entity_type is not None:
+                    tags.append((code, value))
+            pos = resume
+
+        if entity_type is not None:
+            yield section, entity_type, tags
+
+    @classmethod
+    def find_lwpolyline(cls, filepath: str) -> Optional[list]:
+        """
+        Return the vertices of the first modelspace LWPOLYLINE, if any.
+
+        Args:
+            filepath: Path to DXF file
+
+        Returns:
+            List of (x, y) vertices, or None if the file needs a full parse
+            (binary DXF, no LWPOLYLINE in ENTITIES)
+
+        Raises:
+            ValueError: If the tag structure is malformed
+        """
+        with cls.open_buffer(filepath) as data:
+            if cls.is_binary(data):
+                logger.debug(f"Scanner skipped binary DXF: {filepath}")
+                return None
+            return cls.first_lwpolyline(data)
+
+    @classmethod
+    def first_lwpolyline(cls, data: Buffer) -> Optional[list]:
+        """Vertices of the first modelspace LWPOLYLINE in a buffer, or None."""
+        for _, _, tags in cls.iter_entities(data, types={b"LWPOLYLINE"}):
+            # Group code 67 = 1 marks paperspace entities
+            if (67, b"1") not in tags:
+                return cls.lwpolyline_points(tags)
+        return None
+
+    @classmethod
+    def semantic_digest(cls, filepath: str) -> Optional[str]:
+        """
+        Digest of the geometry-bearing entity data only.
+
+        Ignores the HEADER ($TDUPDATE etc.), handles, owners, layers, colours
+        and float formatting, so two exports of the same section hash alike.
+
+        Args:
+            filepath: Path to DXF file
+
+        Returns:
+            MD5 hex digest, or None for binary DXF files
+
+        Raises:
+            ValueError: If the tag structure is malformed
+        """
+        with cls.open_buffer(filepath) as data:
+            if cls.is_binary(data):
+                return None
+
+            hasher = hashlib.md5()
+            entities = cls.iter_entities(
+                data, sections=(b"ENTITIES", b"BLOCKS"), types=cls.GEOMETRY_ENTITIES
+            )
+            for _, entity_type, tags in entities:
+                hasher.update(entity_type)
+                for code, value in tags:
+                    normalized = cls._normalize_tag(code, value)
+                    if normalized is not None:
+                        hasher.update(normalized)
+            return hasher.hexdigest()
+
+    @staticmethod
+    def _normalize_tag(code: int, value: bytes) -> Optional[bytes]:
+        """Canonical bytes for a geometry tag, None for tags that carry no geometry."""
+        if 10 <= code <= 59:
+            # Coordinates, sizes, scales, angles, bulges: fixed precision, no -0.0
+            number = round(float(value), 6) + 0.0
+            return b"|%d=%.6f" % (code, number)
+        if code == 2 or code == 67 or 70 <= code <= 79 or code == 90:
+            # Block names, paperspace flag, shape flags, vertex counts
+            return b"|%d=%s" % (code, value)
+        return None
+
+    @classmethod
+    def collect_geometry(cls, data: Buffer) -> Tuple[LayoutGeometry, Dict[str, LayoutGeometry]]:
+        """
+        Materialize only the profile-relevant entities of modelspace and all blocks.
+
+        Args:
+            data: Raw file content or memory map
+
+        Returns:
+            (modelspace geometry, {block name: block geometry})
+        """
+        modelspace = LayoutGeometry((0.0, 0.0, 0.0), [], [], [])
+        blocks: Dict[str, LayoutGeometry] = {}
+        current = None
+        polyline = None  # [closed, vertices] of an open POLYLINE sequence
+
+        entities = cls.iter_entities(
+            data, sections=(b"ENTITIES", b"BLOCKS"), types=cls.LAYOUT_ENTITIES
+        )
+        for section, kind, tags in entities:
+            values = dict(tags)
+
+            if kind == b"BLOCK":
+                current = LayoutGeometry(cls._point(values, 10), [], [], [])
+                blocks[values.get(2, b"").decode(errors="replace")] = current
+                continue
+            if kind == b"ENDBLK":
+                current = None
+                continue
+
+            layout = modelspace if section == b"ENTITIES" else current
+            if layout is None or values.get(67) == b"1":
+                continue
+
+            if kind == b"LWPOLYLINE":
+                layout.lwpolylines.append(cls.lwpolyline_points(tags))
+            elif kind == b"LINE":
+                layout.segments.append((cls._point(values, 10), cls._point(values, 11)))
+            elif kind == b"ARC":
+                layout.segments.append(cls._arc_endpoints(values))
+            elif kind == b"INSERT":
+                layout.inserts.append(InsertRef(
+                    name=values.get(2, b"").decode(errors="replace"),
+                    insert=cls._point(values, 10),
+                    scale=(
+                        float(values.get(41, 1.0)),
+                        float(values.get(42, 1.0)),
+                        float(values.get(43, 1.0))
+                    ),
+                    rotation=float(values.get(50, 0.0))
+                ))
+            elif kind == b"POLYLINE":
+                flags = int(values.get(70, 0))
+                # Polyface meshes (64) and polygon meshes (16) carry no outline
+                polyline = None if flags & (16 | 64) else [bool(flags & 1), []]
+            elif kind == b"VERTEX" and polyline is not None:
+                polyline[1].append(cls._point(values, 10))
+            elif kind == b"SEQEND" and polyline is not None:
+                closed, vertices = polyline
+                if closed and vertices:
+                    vertices.append(vertices[0])
+                layout.segments.extend(zip(vertices, vertices[1:]))
+                polyline = None
+
+        return modelspace, blocks
+
+    @staticmethod
+    def _point(values: Dict[int, bytes], code: int) -> Tuple[float, float, float]:
+        """Read the point stored at group codes code/code+10/code+20."""
+        return (
+            float(values.get(code, 0.0)),
+            float(values.get(code + 10, 0.0)),
+            float(values.get(code + 20, 0.0))
+        )
+
+    @staticmethod
+    def _arc_endpoints(values: Dict[int, bytes]) -> tuple:
+        """Start and end points of an ARC from centre, radius and angles."""
+        cx, cy = float(values.get(10, 0.0)), float(values.get(20, 0.0))
+        radius = float(values.get(40, 0.0))
+        start = math.radians(float(values.get(50, 0.0)))
+        end = math.radians(float(values.get(51, 0.0)))
+        return (
+            (cx + radius * math.cos(start), cy + radius * math.sin(start)),
+            (cx + radius * math.cos(end), cy + radius * math.sin(end))
+        )
+
+    @staticmethod
+    def lwpolyline_points(tags: List[Tag]) -> list:
+        """Extract (x, y) vertices from LWPOLYLINE tags."""
+        points = []
+        x = None
+        for code, value in tags:
+            if code == 10:
+                x = float(value)
+            elif code == 20 and x is not None:
+                points.append((x, float(value)))
+                x = None
+        return points
@@ -2,13 +2,21 @@
 DXFService - Simplified facade coordinating specialized components.
 Single Responsibility: Provide unified API for routes, delegate to focused components.
 """
+from concurrent.futures import CancelledError, Future
 from typing import Dict, Any, List, Optional
 import hashlib
+import threading
+import time
 from dxf_generator.services.cache_manager import CacheManager
-from dxf_generator.services.batch_processor import BatchProcessor
+from dxf_generator.services.batch_processor import BatchProcessor, INTERACTIVE
 from dxf_generator.services.dxf_parser import DXFParser
+from dxf_generator.services.dxf_scanner import DXFScanner
+from dxf_generator.services.parse_sandbox import TieredParser
 from dxf_generator.services.dxf_generator import DXFGenerator
+from dxf_generator.config.env_config import config
 from dxf_generator.config.logging_config import logger
+from dxf_generator.monitoring.stage_timer import stage
+from dxf_generator.exceptions.parsing import ParseLimitError
 
 
 class DXFService:
@@ -20,8 +28,11 @@ class DXFService:
     # Component instances (shared across service)
     _generation_cache = CacheManager(max_size=500, name="generation")
     _parse_cache = CacheManager(max_size=100, name="parse")
+    _semantic_parse_cache = CacheManager(max_size=100, name="parse_semantic")  # Keyed by geometry digest
     _batch_cache = CacheManager(max_size=50, name="batch")  # Cache for full ZIP results
     _batch_processor = BatchProcessor()
+    _inflight: Dict[str, Future] = {}  # Interactive generations running, by cache key
+    _inflight_lock = threading.Lock()
     
     @classmethod
     def get_cache_key(cls, component) -> str:
@@ -71,64 +82,153 @@ class DXFService:
         return content
     
     @classmethod
-    def save_batch(cls, components: List, filenames: List[str]) -> List[str]:
+    def submit_cached(cls, component, filename: str, lane: str = INTERACTIVE) -> Future:
         """
-        Generate multiple DXF files concurrently (fire-and-forget).
+        Run save_cached on a BatchProcessor lane, so requests waiting on a
+        single DXF are scheduled ahead of batch work. Concurrent requests for
+        the same component share one generation; only the first writes
+        `filename`. Each caller gets its own Future, so cancelling one (a
+        client disconnecting) leaves the shared generation running.
+        
+        Returns:
+            Future resolving to the DXF content as bytes
+            
+        Raises:
+            OverloadedError: If the lane's queue refuses the task
+        """
+        cache_key = cls._generation_cache.get_key(component)
+        with cls._inflight_lock:
+            shared = cls._inflight.get(cache_key)
+            started = shared is None
+            if started:
+                shared = cls._batch_processor.run(cls.save_cached, component, filename, lane=lane)
+                cls._inflight[cache_key] = shared
+        
+        def forget(f):
+            with cls._inflight_lock:
+                if cls._inflight.get(cache_key) is f:
+                    del cls._inflight[cache_key]
+        
+        if started:
+            shared.add_done_callback(forget)
+        
+        waiter = Future()
+        
+        def relay(f):
+            if not waiter.set_running_or_notify_cancel():
+                return  # This caller went away
+            if f.cancelled():
+                waiter.set_exception(CancelledError())
+            elif f.exception() is not None:
+                waiter.set_exception(f.exception())
+            else:
+                waiter.set_result(f.result())
+        
+        shared.add_done_callback(relay)
+        return waiter
+    
+    @classmethod
+    def save_batch(cls, components: List, filenames: List[str], lane: str = None) -> List[Future]:
+        """
+        Generate multiple DXF files concurrently in the given BatchProcessor
+        lane (default: "batch"). Cached components are written before this
+        returns; the rest are queued, and the caller must wait for their
+        futures before reading the files.
+        
+        Returns:
+            Futures of the queued generations (empty when every component was cached)
+        
+        Raises:
+            OverloadedError: If the background queue refuses the uncached
+                components; nothing is written or queued then
+            BatchTooLargeError: If there are more uncached components than the
+                lane's queue can hold; nothing is written or queued then
         """
         cache_hits = []
-
-        def on_complete():
-            logger.info("Background task completed")
-
-        def on_error(exc):
-            logger.error(f"Background task failed: {exc}")
+        misses = []
 
         for component, filename in zip(components, filenames):
             cache_key = cls._generation_cache.get_key(component)
             cached = cls._generation_cache.get(cache_key)
 
             if cached:
-                DXFGenerator.write_content(cached, filename)
-                cache_hits.append(filename)
+                cache_hits.append((cached, filename))
             else:
-                cls._batch_processor.submit(
-                    cls.save_cached,
-                    component,
-                    filename,
-                    on_success=on_complete,
-                    on_error=on_error
-                )
+                misses.append((cls.save_cached, (component, filename)))
+
+        # Admission first, so a rejected batch leaves no files behind
+        futures = cls._batch_processor.run_batch(misses, lane=lane) if misses else []
+        for cached, filename in cache_hits:
+            DXFGenerator.write_content(cached, filename)
 
-        logger.info(
-            f"Batch: {len(cache_hits)} cache hits, "
-            f"{len(components) - len(cache_hits)} tasks queued"
-        )
+        logger.info(f"Batch: {len(cache_hits)} cache hits, {len(futures)} tasks queued")
 
-        return cache_hits
+        return futures
     
     @classmethod
-    def parse(cls, filepath: str) -> Dict[str, Any]:
+    def parse(cls, filepath: str, isolated: bool = False) -> Dict[str, Any]:
         """
         Parse a DXF file with caching.
         
         Args:
             filepath: Path to DXF file
+            isolated: Parse through TieredParser (time/memory-bounded worker
+                processes) instead of in-process; the semantic digest then
+                runs in a worker too, and both share one PARSE_TIMEOUT_SECONDS
             
         Returns:
             Dict with 'type' and 'data' keys
         """
         # Check cache
-        file_hash = DXFParser.get_file_hash(filepath)
+        with stage("file_hash"):
+            file_hash = DXFParser.get_file_hash(filepath)
         cached = cls._parse_cache.get(file_hash)
         if cached:
             return cached
+        deadline = time.monotonic() + config.PARSE_TIMEOUT_SECONDS
+        
+        # Second level: same geometry re-exported with a new header/handles
+        with stage("semantic_digest"):
+            semantic_key = cls._get_semantic_key(filepath, isolated)
+        if semantic_key:
+            cached = cls._semantic_parse_cache.get(semantic_key)
+            if cached:
+                logger.info(f"Semantic parse cache hit for {filepath}")
+                cls._parse_cache.set(file_hash, cached)
+                return cached
         
         # Parse and cache
-        result = DXFParser.parse(filepath)
+        with stage("parse"):
+            if isolated:
+                result = TieredParser.parse(filepath, timeout=max(0.0, deadline - time.monotonic()))
+            else:
+                result = DXFParser.parse(filepath)
         cls._parse_cache.set(file_hash, result)
+        if semantic_key:
+            cls._semantic_parse_cache.set(semantic_key, result)
         
         return result
     
+    @staticmethod
+    def _get_semantic_key(filepath: str, isolated: bool = False) -> Optional[str]:
+        """
+        Geometry digest of a DXF file, or None if the scanner cannot produce one.
+
+        With isolated=True the digest is computed by TieredParser under the
+        parse budgets; exceeding them raises instead of falling back.
+        """
+        try:
+            if isolated:
+                digest = TieredParser.semantic_digest(filepath)
+            else:
+                digest = DXFScanner.semantic_digest(filepath)
+        except ParseLimitError:
+            raise
+        except (OSError, ValueError) as e:
+            logger.debug(f"No semantic digest for {filepath}: {e}")
+            return None
+        return f"semantic_{digest}" if digest else None
+    
     @classmethod
     def get_batch_key(cls, components: List[Any]) -> str:
         """
@@ -157,6 +257,7 @@ class DXFService:
         """Clear all caches."""
         cls._generation_cache.clear()
         cls._parse_cache.clear()
+        cls._semantic_parse_cache.clear()
         cls._batch_cache.clear()
     
     @classmethod
@@ -165,8 +266,24 @@ class DXFService:
         return {
             "generation": cls._generation_cache.stats,
             "parse": cls._parse_cache.stats,
+            "parse_semantic": cls._semantic_parse_cache.stats,
             "batch": cls._batch_cache.stats
         }
+    
+    @classmethod
+    def get_cache_footprint(cls) -> dict:
+        """Get the exact memory footprint of every cache (keys plus values)."""
+        return {
+            "generation": cls._generation_cache.footprint(),
+            "parse": cls._parse_cache.footprint(),
+            "parse_semantic": cls._semantic_parse_cache.footprint(),
+            "batch": cls._batch_cache.footprint()
+        }
+    
+    @classmethod
+    def get_batch_stats(cls) -> dict:
+        """Get background batch executor statistics."""
+        return cls._batch_processor.stats
 
 
         
@@ -0,0 +1,279 @@
+"""
+TieredParser - Time-bounded DXF parsing in isolated worker processes.
+Single Responsibility: Run parse tiers under CPU/memory budgets and escalate between them.
+"""
+import math
+import multiprocessing
+import signal
+import time
+from typing import Any, Callable, Dict, Optional
+import ezdxf
+from dxf_generator.config.env_config import config
+from dxf_generator.config.logging_config import logger
+from dxf_generator.exceptions.parsing import ParseLimitError, ParseTimeoutError
+from dxf_generator.services.dxf_parser import DXFParser
+from dxf_generator.services.dxf_scanner import DXFScanner
+
+
+def _scan_tier(filepath: str) -> Optional[Dict[str, Any]]:
+    """Tier 1: answer simple files from the tag scanner, None to escalate."""
+    try:
+        points = DXFScanner.find_lwpolyline(filepath)
+    except ValueError as e:
+        logger.debug(f"Scanner gave up on {filepath}: {e}")
+        return None
+    if points is None:
+        return None
+    return DXFParser._identify_shape(points, filepath)
+
+
+def _readfile_tier(filepath: str) -> Dict[str, Any]:
+    """Tier 2: full ezdxf.readfile parse."""
+    try:
+        return DXFParser.parse(filepath)
+    except ValueError as e:
+        # Wrapped loader failures (not "no profile" results) deserve a recover attempt
+        if e.__cause__ is not None:
+            raise ezdxf.DXFStructureError(str(e)) from None
+        raise
+
+
+def _recover_tier(filepath: str) -> Dict[str, Any]:
+    """Tier 3: ezdxf.recover parse for structurally damaged files."""
+    return DXFParser.parse(filepath, recover_mode=True)
+
+
+def _semantic_digest(filepath: str) -> Optional[str]:
+    """Geometry digest of an upload (DXFScanner.semantic_digest), run in a worker."""
+    return DXFScanner.semantic_digest(filepath)
+
+
+def _apply_limits(cpu_seconds: int, memory_bytes: int) -> None:
+    """Install CPU-time and address-space limits in the current (worker) process."""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows; wall-clock timeout still applies
+        return
+
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        if memory_bytes:
+            # Budget is relative to what the worker already maps after preloading
+            with open("/proc/self/statm") as f:
+                baseline = int(f.read().split()[0]) * resource.getpagesize()
+            limit = baseline + memory_bytes
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not apply parse worker limits: {e}")
+
+
+def _worker_main(conn, target: Callable, args: tuple, cpu_seconds: int, memory_bytes: int) -> None:
+    """Entry point of the isolated worker: run target and send back the outcome."""
+    _apply_limits(cpu_seconds, memory_bytes)
+    try:
+        outcome = ("ok", target(*args))
+    except MemoryError:
+        outcome = ("memory", None)
+    except BaseException as e:
+        outcome = ("raised", e)
+
+    try:
+        conn.send(outcome)
+    except Exception:
+        # Unpicklable exception: keep the message only
+        conn.send(("raised", ValueError(str(outcome[1]))))
+    finally:
+        conn.close()
+
+
+_context = None
+
+
+def _get_context():
+    """Lazily create the multiprocessing context (forkserver where available)."""
+    global _context
+    if _context is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Forking from a clean, preloaded server avoids both inheriting the
+            # threaded web worker's state and re-importing ezdxf per parse
+            _context = multiprocessing.get_context("forkserver")
+            _context.set_forkserver_preload(["dxf_generator.services.parse_sandbox"])
+        else:
+            _context = multiprocessing.get_context("spawn")
+    return _context
+
+
+def run_isolated(
+    target: Callable,
+    args: tuple,
+    timeout: float,
+    cpu_seconds: int,
+    memory_bytes: int
+) -> Any:
+    """
+    Run target(*args) in a killable worker process under resource limits.
+
+    Args:
+        target: Picklable (module-level) callable
+        args: Picklable arguments
+        timeout: Wall-clock budget in seconds
+        cpu_seconds: CPU-time budget in seconds
+        memory_bytes: Additional address space the worker may allocate
+
+    Returns:
+        target's return value
+
+    Raises:
+        ParseTimeoutError: If the wall-clock or CPU budget is exceeded
+        ParseLimitError: If the memory budget is exceeded or the worker dies
+        Exception: Whatever target raised
+    """
+    ctx = _get_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_worker_main,
+        args=(sender, target, args, cpu_seconds, memory_bytes),
+        daemon=True
+    )
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout):
+            logger.warning(f"Parse worker {process.pid} exceeded {timeout:.1f}s, killing")
+            raise ParseTimeoutError(f"Parsing exceeded time budget of {timeout:.1f}s")
+        try:
+            status, payload = receiver.recv()
+        except EOFError:
+            status, payload = "died", None
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+    if status == "ok":
+        return payload
+    if status == "raised":
+        raise payload
+    if status == "memory":
+        raise ParseLimitError(f"Parsing exceeded memory budget of {memory_bytes // (1024 * 1024)} MB")
+
+    if process.exitcode == -getattr(signal, "SIGXCPU", -1):
+        raise ParseTimeoutError(f"Parsing exceeded CPU budget of {cpu_seconds}s")
+    raise ParseLimitError(f"Parse worker terminated unexpectedly (exit code {process.exitcode})")
+
+
+class TieredParser:
+    """
+    Parses untrusted DXF uploads through escalating tiers:
+    fast tag scanner -> ezdxf.readfile -> ezdxf.recover.
+    Every tier runs in its own killable worker process, so a pathological
+    file costs at most the configured budget instead of a hung request worker.
+    """
+
+    TIERS = (
+        ("scan", _scan_tier),
+        ("readfile", _readfile_tier),
+        ("recover", _recover_tier),
+    )
+
+    @staticmethod
+    def _budgets(timeout: Optional[float], cpu_seconds: Optional[int], memory_mb: Optional[int]) -> tuple:
+        """(timeout, cpu_seconds, memory_bytes) with config defaults filled in."""
+        timeout = timeout if timeout is not None else config.PARSE_TIMEOUT_SECONDS
+        cpu_seconds = cpu_seconds or config.PARSE_CPU_SECONDS
+        memory_bytes = (memory_mb or config.PARSE_MEMORY_MB) * 1024 * 1024
+        return timeout, cpu_seconds, memory_bytes
+
+    @classmethod
+    def semantic_digest(
+        cls,
+        filepath: str,
+        timeout: float = None,
+        cpu_seconds: int = None,
+        memory_mb: int = None
+    ) -> Optional[str]:
+        """
+        Semantic digest of an untrusted upload, computed in a worker process
+        under the same budgets as parse().
+
+        Args:
+            filepath: Path to DXF file
+            timeout: Wall-clock budget (defaults to config)
+            cpu_seconds: CPU budget (defaults to config)
+            memory_mb: Memory budget (defaults to config)
+
+        Returns:
+            MD5 hex digest, or None for binary DXF files
+
+        Raises:
+            ParseTimeoutError: Time budget exceeded (HTTP 408)
+            ParseLimitError: Memory budget exceeded or worker crashed (HTTP 422)
+            ValueError: If the tag structure is malformed
+        """
+        timeout, cpu_seconds, memory_bytes = cls._budgets(timeout, cpu_seconds, memory_mb)
+        return run_isolated(
+            _semantic_digest,
+            (filepath,),
+            timeout=timeout,
+            cpu_seconds=max(1, min(cpu_seconds, math.ceil(timeout))),
+            memory_bytes=memory_bytes
+        )
+
+    @classmethod
+    def parse(
+        cls,
+        filepath: str,
+        timeout: float = None,
+        cpu_seconds: int = None,
+        memory_mb: int = None
+    ) -> Dict[str, Any]:
+        """
+        Parse a DXF file within time and memory budgets.
+
+        Args:
+            filepath: Path to DXF file
+            timeout: Wall-clock budget for all tiers (defaults to config)
+            cpu_seconds: CPU budget per tier (defaults to config)
+            memory_mb: Memory budget per tier (defaults to config)
+
+        Returns:
+            Dict with 'type' and 'data' keys (as DXFParser.parse)
+
+        Raises:
+            ParseTimeoutError: Time budget exceeded (HTTP 408)
+            ParseLimitError: Memory budget exceeded or worker crashed (HTTP 422)
+            ValueError: File is not a parsable DXF or has no supported profile
+        """
+        timeout, cpu_seconds, memory_bytes = cls._budgets(timeout, cpu_seconds, memory_mb)
+        deadline = time.monotonic() + timeout
+        last_error = None
+
+        for name, tier in cls.TIERS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ParseTimeoutError(f"Parsing exceeded time budget of {timeout:.1f}s")
+
+            start = time.perf_counter()
+            try:
+                result = run_isolated(
+                    tier,
+                    (filepath,),
+                    timeout=remaining,
+                    cpu_seconds=max(1, min(cpu_seconds, math.ceil(remaining))),
+                    memory_bytes=memory_bytes
+                )
+            except ezdxf.DXFError as e:
+                # Structural damage: the next tier may still cope
+                logger.info(f"Parse tier '{name}' failed for {filepath}: {e}")
+                last_error = e
+                continue
+
+            elapsed = (time.perf_counter() - start) * 1000
+            if result is not None:
+                logger.info(f"Parsed {filepath} in tier '{name}' ({elapsed:.1f}ms)")
+                return result
+            logger.debug(f"Parse tier '{name}' deferred for {filepath} ({elapsed:.1f}ms)")
+
+        raise ValueError(f"Invalid or corrupt DXF: {last_error}")
@@ -0,0 +1,150 @@
+"""
+SegmentChainer - Rebuilds closed profiles from loose segments.
+Single Responsibility: Match segment endpoints and chain them into closed loops.
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+from dxf_generator.config.tolerances import ENDPOINT_MATCH_TOLERANCE_MM
+from dxf_generator.config.logging_config import logger
+
+Point = Tuple[float, float]
+Segment = Tuple[Point, Point]
+
+# Own cell first: exact and near-exact matches are found on the first probe
+_NEIGHBOURS = [(0, 0)] + [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class SegmentChainer:
+    """
+    Chains LINE/ARC/POLYLINE segments into closed loops in linear time.
+    Endpoints are hashed into a grid of tolerance-sized cells, so matching
+    an endpoint only inspects its own and the eight neighbouring cells.
+    """
+
+    def __init__(self, tolerance: float = ENDPOINT_MATCH_TOLERANCE_MM):
+        self._tolerance = tolerance
+
+    def chain(self, segments: Sequence[Segment]) -> List[List[Point]]:
+        """
+        Chain segments into closed loops.
+
+        Args:
+            segments: Sequence of ((x1, y1), (x2, y2)) segments in any order/direction
+
+        Returns:
+            List of closed loops as canonical vertex lists (see normalize_loop);
+            loops whose vertices are all collinear are skipped
+        """
+        nodes: List[Point] = []
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        adjacency: Dict[int, List[Tuple[int, int]]] = {}
+
+        edge_count = 0
+        for start, end in segments:
+            a = self._node_for(start, nodes, grid)
+            b = self._node_for(end, nodes, grid)
+            if a == b:
+                continue  # Degenerate (zero-length) segment
+            adjacency.setdefault(a, []).append((edge_count, b))
+            adjacency.setdefault(b, []).append((edge_count, a))
+            edge_count += 1
+
+        used = [False] * edge_count
+        loops = []
+        open_chains = 0
+        flat_loops = 0
+
+        for origin, edges in adjacency.items():
+            for edge, _ in edges:
+                if used[edge]:
+                    continue
+                path = self._walk(origin, edge, adjacency, used)
+                if path[0] == path[-1] and len(path) > 3:
+                    loop = self.normalize_loop([nodes[n] for n in path[:-1]])
+                    if loop:
+                        loops.append(loop)
+                    else:
+                        flat_loops += 1
+                else:
+                    open_chains += 1
+
+        logger.debug(
+            f"Chained {edge_count} segments into {len(loops)} closed loop(s), "
+            f"{open_chains} open chain(s), {flat_loops} zero-area loop(s)"
+        )
+        return loops
+
+    def _node_for(self, point: Point, nodes: List[Point], grid: Dict) -> int:
+        """Return the id of the node within tolerance of point, creating one if needed."""
+        x, y = float(point[0]), float(point[1])
+        cx = math.floor(x / self._tolerance)
+        cy = math.floor(y / self._tolerance)
+        tol_sq = self._tolerance * self._tolerance
+
+        for dx, dy in _NEIGHBOURS:
+            for node in grid.get((cx + dx, cy + dy), ()):
+                nx, ny = nodes[node]
+                if (nx - x) ** 2 + (ny - y) ** 2 <= tol_sq:
+                    return node
+
+        nodes.append((x, y))
+        node = len(nodes) - 1
+        grid.setdefault((cx, cy), []).append(node)
+        return node
+
+    @staticmethod
+    def _walk(origin: int, first_edge: int, adjacency: Dict, used: List[bool]) -> List[int]:
+        """Follow unused edges from origin until the chain closes or dead-ends."""
+        path = [origin]
+        current = origin
+        edge = first_edge
+
+        while edge is not None:
+            used[edge] = True
+            current = next(other for e, other in adjacency[current] if e == edge)
+            path.append(current)
+            if current == origin:
+                break
+            edge = next((e for e, _ in adjacency[current] if not used[e]), None)
+
+        return path
+
+    @staticmethod
+    def normalize_loop(points: List[Point]) -> List[Point]:
+        """
+        Bring a loop into the vertex order the shape parsers expect.
+
+        Drops collinear vertices, orients the loop counter-clockwise, starts it
+        at the bottom-left vertex and translates that vertex to the origin.
+
+        Args:
+            points: Loop vertices without the repeated closing vertex
+
+        Returns:
+            Canonical vertex list, or [] if fewer than three vertices remain
+            once collinear ones are dropped (the loop encloses no area)
+        """
+        simplified = []
+        count = len(points)
+        for i in range(count):
+            px, py = points[i - 1]
+            x, y = points[i]
+            nx, ny = points[(i + 1) % count]
+            cross = (x - px) * (ny - y) - (y - py) * (nx - x)
+            scale = math.hypot(x - px, y - py) * math.hypot(nx - x, ny - y)
+            if scale == 0 or abs(cross) > 1e-9 * scale:
+                simplified.append((x, y))
+        if len(simplified) < 3:
+            return []
+
+        signed_area = sum(
+            x1 * y2 - x2 * y1
+            for (x1, y1), (x2, y2) in zip(simplified, simplified[1:] + simplified[:1])
+        )
+        if signed_area < 0:
+            simplified.reverse()
+
+        start = min(range(len(simplified)), key=lambda i: (simplified[i][1], simplified[i][0]))
+        ordered = simplified[start:] + simplified[:start]
+        ox, oy = ordered[0]
+        return [(x - ox, y - oy) for x, y in ordered]
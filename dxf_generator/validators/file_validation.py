@@ -4,7 +4,7 @@ Single responsibility: validate uploaded files before processing.
 """
 from fastapi import UploadFile
 from dxf_generator.config.env_config import config
-from dxf_generator.config.logging_config import logger
+from dxf_generator.config.logging_config import log_event
 
 
 class FileValidationError(Exception):
@@ -38,7 +38,7 @@ def validate_file_extension(filename: str) -> str:
             f"Invalid file type: {ext}. Allowed: {list(config.ALLOWED_UPLOAD_EXTENSIONS)}"
         )
     
-    logger.debug(f"File extension validated: {ext}")
+    log_event("upload.extension_ok", ext=ext)
     return ext
 
 
@@ -83,7 +83,7 @@ async def validate_and_save_upload(
             os.remove(destination_path)
         raise
     
-    logger.debug(f"File saved: {destination_path} ({size} bytes)")
+    log_event("upload.written", path=destination_path, bytes=size)
     return size
 
 
@@ -108,7 +108,7 @@ def validate_content_type(content_type: str) -> str:
             f"Invalid content type: {content_type}. Allowed: {list(config.ALLOWED_UPLOAD_MIME_TYPES)}"
         )
     
-    logger.debug(f"Content type validated: {content_type}")
+    log_event("upload.content_type_ok", content_type=content_type)
     return content_type
 
 
@@ -1,7 +1,9 @@
 import uvicorn
 import os
 import sys
+import tempfile
 from dxf_generator.config.env_config import config
+from dxf_generator.monitoring.prometheus import SharedMetricsStore
 
 # Add the current directory to python path to ensure imports work correctly
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -14,6 +16,14 @@ if __name__ == "__main__":
     except Exception:
         pass
 
+    # Workers share metric snapshots so any of them can serve the full view
+    metrics_dir = config.METRICS_DIR
+    if not metrics_dir and config.API_WORKERS > 1:
+        metrics_dir = tempfile.mkdtemp(prefix="dxf_metrics_")
+        os.environ["METRICS_DIR"] = metrics_dir
+    if metrics_dir:
+        SharedMetricsStore.prepare(metrics_dir)
+
     uvicorn.run(
         "dxf_generator.interface.web:app", 
         host=config.API_HOST, 
@@ -1,7 +1,16 @@
 import pytest
 from fastapi.testclient import TestClient
+from dxf_generator.interface import web
 from dxf_generator.interface.web import app
 
+@pytest.fixture(autouse=True)
+def metrics_history_db(tmp_path, monkeypatch):
+    """
+    Keep the app's metrics history in a per-test database, not in LOG_DIR.
+    """
+    if web.metrics_history is not None:
+        monkeypatch.setattr(web.metrics_history, "path", str(tmp_path / "metrics_history.db"))
+
 @pytest.fixture
 def client():
     """
@@ -0,0 +1,125 @@
+from dxf_generator.config.env_config import config
+from dxf_generator.monitoring.memory_profiler import memory_profiler
+from dxf_generator.monitoring.slow_requests import slow_request_recorder
+import pytest
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def admin_enabled(monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_ENDPOINTS_ENABLED", True)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", TOKEN)
+
+
+def test_admin_hidden_when_disabled(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_ENDPOINTS_ENABLED", False)
+    resp = client.post("/admin/profile?seconds=0.1", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 404
+
+
+def test_admin_requires_token(client, admin_enabled):
+    assert client.post("/admin/profile?seconds=0.1").status_code == 403
+    resp = client.post("/admin/profile?seconds=0.1", headers={"X-Admin-Token": "wrong"})
+    assert resp.status_code == 403
+
+
+def test_profile_json(client, admin_enabled):
+    resp = client.post(
+        "/admin/profile?seconds=0.2&interval_ms=2", headers={"X-Admin-Token": TOKEN}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["samples"] > 0
+    assert {"collapsed", "summary", "dxf_summary"} <= body.keys()
+
+
+def test_profile_collapsed_format(client, admin_enabled):
+    resp = client.post(
+        "/admin/profile?seconds=0.1&format=collapsed", headers={"X-Admin-Token": TOKEN}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+
+
+def test_profile_duration_capped(client, admin_enabled, monkeypatch):
+    monkeypatch.setattr(config, "PROFILER_MAX_SECONDS", 1)
+    resp = client.post("/admin/profile?seconds=5", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 400
+
+
+@pytest.fixture
+def memory_tracing():
+    yield
+    memory_profiler.stop()
+
+
+def test_memory_snapshot_and_diff(client, admin_enabled, memory_tracing):
+    headers = {"X-Admin-Token": TOKEN}
+    base = client.post("/admin/memory/snapshots", headers=headers).json()
+    client.post("/ibeam", json={
+        "total_depth": 310, "flange_width": 155, "web_thickness": 8, "flange_thickness": 12
+    })
+    target = client.post("/admin/memory/snapshots", headers=headers).json()
+
+    listed = client.get("/admin/memory/snapshots", headers=headers).json()
+    assert listed["tracing"] is True
+    assert [s["id"] for s in listed["snapshots"]][-2:] == [base["id"], target["id"]]
+
+    resp = client.get(f"/admin/memory/snapshots/{target['id']}?limit=5", headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["top"]) <= 5
+
+    resp = client.get(
+        f"/admin/memory/diff?base={base['id']}&target={target['id']}", headers=headers
+    )
+    assert resp.status_code == 200
+    assert {"total_diff_bytes", "top", "dxf_top"} <= resp.json().keys()
+
+    assert client.delete("/admin/memory/snapshots", headers=headers).json() == {"tracing": False}
+
+
+def test_memory_unknown_snapshot(client, admin_enabled, memory_tracing):
+    resp = client.get("/admin/memory/snapshots/99999", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 404
+
+
+def test_memory_cache_footprint(client, admin_enabled):
+    resp = client.get("/admin/memory/caches", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert {"generation", "parse", "parse_semantic", "batch"} == body["caches"].keys()
+    assert body["caches"]["generation"]["total_bytes"] >= body["caches"]["generation"]["container_bytes"]
+    assert body["live_ezdxf_documents"] >= 0
+
+
+def test_request_trace_export(client, admin_enabled):
+    payload = {"total_depth": 333, "flange_width": 150, "web_thickness": 8, "flange_thickness": 12}
+    rid = client.post("/api/v1/ibeam", json=payload).headers["x-request-id"]
+
+    resp = client.get(f"/admin/traces?trace_id={rid}", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 200
+    assert "attachment" in resp.headers["content-disposition"]
+    spans = [e for e in resp.json()["traceEvents"] if e["ph"] == "X"]
+    assert spans[0]["name"] == "POST /api/v1/ibeam"
+    assert {"validate", "cache_lock"} <= {e["name"] for e in spans}
+    assert all(e["args"]["trace_id"] == rid for e in spans)
+
+
+def test_unknown_trace(client, admin_enabled):
+    resp = client.get("/admin/traces?trace_id=missing", headers={"X-Admin-Token": TOKEN})
+    assert resp.status_code == 404
+
+
+def test_slow_requests(client, admin_enabled, monkeypatch):
+    monkeypatch.setattr(slow_request_recorder, "threshold_ms", 0.0)
+    payload = {"total_depth": 334, "flange_width": 150, "web_thickness": 8, "flange_thickness": 12}
+    rid = client.post("/api/v1/ibeam", json=payload).headers["x-request-id"]
+
+    headers = {"X-Admin-Token": TOKEN}
+    body = client.get("/admin/slow-requests?route=POST /api/v1/ibeam&limit=1", headers=headers).json()
+    assert body["threshold_ms"] == 0.0
+    assert body["requests"][0]["request_id"] == rid
+    entry = client.get(f"/admin/slow-requests/{rid}", headers=headers).json()
+    assert entry["json"]["total_depth"] == 334
+    assert client.get("/admin/slow-requests/missing", headers=headers).status_code == 404
@@ -1,3 +1,12 @@
+import io
+import threading
+import time
+import zipfile
+
+from dxf_generator.config.env_config import config
+from dxf_generator.services.batch_processor import BatchProcessor
+from dxf_generator.services.dxf_service import DXFService
+
 
 def test_root_endpoint(client):
     """Test the root endpoint."""
@@ -20,6 +29,29 @@ def test_generate_ibeam_endpoint(client):
     assert "ibeam_300x150" in response.headers["content-disposition"]
     assert ".dxf" in response.headers["content-disposition"]
 
+
+def test_generate_ibeam_server_timing(client):
+    """Test generation stages are reported in the Server-Timing header."""
+    payload = {
+        "total_depth": 310,
+        "flange_width": 150,
+        "web_thickness": 8,
+        "flange_thickness": 12
+    }
+    response = client.post("/api/v1/ibeam", json=payload)
+    stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert stages[0] == "validate"
+    assert {"cache_lock", "total"} <= set(stages)
+    if response.headers["x-cache"] == "MISS":
+        assert {"ezdxf_new", "polyline", "saveas", "readback"} <= set(stages)
+
+def test_request_id_header(client):
+    """Test every response carries a request id, keeping a well-formed client one."""
+    generated = client.get("/").headers["x-request-id"]
+    assert len(generated) == 16
+    assert client.get("/", headers={"X-Request-ID": "trace-42"}).headers["x-request-id"] == "trace-42"
+    assert client.get("/", headers={"X-Request-ID": "bad id\n"}).headers["x-request-id"] != "bad id\n"
+
 def test_generate_ibeam_invalid_payload(client):
     """Test I-Beam generation with invalid payload."""
     payload = {
@@ -78,6 +110,73 @@ def test_generate_ibeam_batch_exceed_limit(client):
     assert "Batch size exceeds maximum limit" in response.json()["detail"]
 
 
+def test_batch_rejected_when_queue_is_full(client, monkeypatch):
+    """Test a saturated background queue sheds batch work with 429 and Retry-After."""
+    processor = BatchProcessor(max_workers=1, max_queue=2)
+    monkeypatch.setattr(DXFService, "_batch_processor", processor)
+    release = threading.Event()
+    processor.submit(release.wait)
+    processor.submit(release.wait)
+    time.sleep(0.05)
+    items = [{"width": 211 + i, "height": 307} for i in range(2)]
+    try:
+        response = client.post("/api/v1/column/batch", json={"items": items})
+    finally:
+        release.set()
+        processor.shutdown(wait=True)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert "queue full" in response.json()["detail"]
+    assert DXFService.get_batch_stats()["rejected"] == 2
+
+
+def test_batch_larger_than_queue_is_not_retryable(client, monkeypatch):
+    """Test a batch that could never fit the lane's queue gets 413 without Retry-After."""
+    monkeypatch.setattr(DXFService, "_batch_processor", BatchProcessor(max_workers=1, max_queue=2))
+    items = [{"width": 221 + i, "height": 307} for i in range(3)]
+    response = client.post("/api/v1/column/batch", json={"items": items})
+    assert response.status_code == 413
+    assert "retry-after" not in response.headers
+    assert "exceeds the batch queue limit of 2" in response.json()["detail"]
+
+
+def test_routes_assign_lanes(client, monkeypatch):
+    """Test single requests run in the interactive lane and large batches in the bulk lane."""
+    monkeypatch.setattr(DXFService, "_batch_processor", BatchProcessor(max_workers=4))
+    response = client.post("/api/v1/column", json={"width": 233, "height": 307})
+    assert response.status_code == 200
+    for width, count in ((241, config.BATCH_BULK_MIN_ITEMS), (211, 2)):
+        items = [{"width": width + i, "height": 409} for i in range(count)]
+        response = client.post("/api/v1/column/batch", json={"items": items})
+        assert response.status_code == 200
+        # The ZIP is built only once every item has been generated
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert len(zf.namelist()) == count
+
+    lanes = DXFService.get_batch_stats()["lanes"]
+    assert lanes["interactive"]["submitted"] == 1
+    assert lanes["bulk"]["submitted"] == config.BATCH_BULK_MIN_ITEMS
+    assert lanes["batch"]["submitted"] == 2
+
+
+def test_failed_batch_item_is_not_cached(client, monkeypatch):
+    """Test a batch with a failed item returns 500 and leaves no partial ZIP in the cache."""
+    def save_cached(component, filename):
+        if component.data["width"] == 252:
+            raise ValueError("generation failed")
+        return original(component, filename)
+
+    original = DXFService.save_cached
+    monkeypatch.setattr(DXFService, "save_cached", save_cached)
+    items = [{"width": 251 + i, "height": 311} for i in range(3)]
+    assert client.post("/api/v1/column/batch", json={"items": items}).status_code == 500
+
+    monkeypatch.setattr(DXFService, "save_cached", original)
+    response = client.post("/api/v1/column/batch", json={"items": items})
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "MISS"
+
+
 def test_generate_column_batch_exceed_limit(client):
     """Test Column batch generation fails when exceeding system limit."""
     # Create 51 items (limit is 50)
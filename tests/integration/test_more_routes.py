@@ -1,6 +1,10 @@
 from io import BytesIO
+import os
+import time
 from unittest.mock import MagicMock, patch
 
+from dxf_generator.config.env_config import config
+
 
 def test_metrics_endpoint(client):
     resp = client.get("/metrics")
@@ -10,10 +14,47 @@ def test_metrics_endpoint(client):
     assert "metrics" in payload
 
 
+def test_metrics_endpoint_reports_route_percentiles(client):
+    client.get("/")
+    resp = client.get("/metrics")
+    endpoint = resp.json()["metrics"]["endpoints"]["GET /"]
+    assert endpoint["count"] >= 1
+    assert endpoint["p50_ms"] <= endpoint["p95_ms"] <= endpoint["p99_ms"]
+
+
+def test_prometheus_metrics_endpoint(client):
+    client.get("/")
+    resp = client.get("/metrics/prometheus")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'dxf_http_requests_total{route="GET /",status="2xx"}' in resp.text
+    assert 'dxf_cache_hits_total{cache="generation"}' in resp.text
+    assert "dxf_batch_queue_depth" in resp.text
+
+
 def test_metrics_summary_endpoint(client):
     resp = client.get("/metrics/summary")
     assert resp.status_code == 200
     assert "Total Requests" in resp.json()
+    assert set(resp.json()["Recent"]) == {"1m", "5m", "15m"}
+
+
+def test_metrics_history_endpoint(client):
+    now = time.time()
+    resp = client.get("/metrics/history", params={"start": now - 600, "end": now})
+    assert resp.status_code == 200
+    assert resp.json()["resolution"] == "10s"
+    assert resp.json()["step_seconds"] == 10
+    assert isinstance(resp.json()["points"], list)
+
+    resp = client.get("/metrics/history", params={"start": now - 30 * 86400, "end": now, "resolution": "1h"})
+    assert resp.json()["resolution"] == "1h"
+
+
+def test_metrics_history_rejects_bad_range(client):
+    now = time.time()
+    assert client.get("/metrics/history", params={"start": now, "end": now - 60}).status_code == 400
+    assert client.get("/metrics/history", params={"resolution": "5m"}).status_code == 422
 
 
 @patch("dxf_generator.interface.routes.parser.DXFService.parse")
@@ -53,14 +94,70 @@ def test_testcases_list_endpoint(client):
     assert isinstance(resp.json(), list)
 
 
-@patch("dxf_generator.interface.routes.benchmark.DXFService.save_batch")
-@patch("dxf_generator.interface.routes.benchmark.time.sleep")
-def test_benchmark_endpoint_fast(mock_sleep, mock_save_batch, client):
-    mock_sleep.return_value = None
-    mock_save_batch.return_value = []
+def test_benchmark_start_requires_admin(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_ENDPOINTS_ENABLED", False)
+    assert client.post("/api/v1/benchmark?only=cache").status_code == 404
+    monkeypatch.setattr(config, "ADMIN_ENDPOINTS_ENABLED", True)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "test-admin-token")
+    assert client.post("/api/v1/benchmark?only=cache").status_code == 403
+
+
+def test_benchmark_job_endpoint(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_ENDPOINTS_ENABLED", True)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "test-admin-token")
+    resp = client.post("/api/v1/benchmark?only=cache", headers={"X-Admin-Token": "test-admin-token"})
+    assert resp.status_code == 202
+    job_id = resp.json()["id"]
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        job = client.get(f"/api/v1/benchmark/jobs/{job_id}").json()
+        if job["status"] != "running":
+            break
+        time.sleep(0.05)
+    assert job["status"] == "finished"
+    assert job["report"]["results"][0]["name"] == "cache.contention"
 
     resp = client.get("/api/v1/benchmark")
     assert resp.status_code == 200
-    text = resp.text
-    assert "Starting Load Test Simulation" in text
-    assert "Users" in text
+    assert "cache.contention" in resp.text
+
+
+def test_benchmark_unknown_job(client):
+    assert client.get("/api/v1/benchmark/jobs/missing").status_code == 404
+
+
+@patch("dxf_generator.interface.routes.parser.DXFService.parse")
+def test_parse_endpoint_timeout_returns_408(mock_parse, client):
+    from dxf_generator.exceptions.parsing import ParseTimeoutError
+    mock_parse.side_effect = ParseTimeoutError("Parsing exceeded time budget of 10.0s")
+
+    resp = client.post(
+        "/api/v1/parse",
+        files={"file": ("slow.dxf", BytesIO(b"0\nSECTION\n"), "application/dxf")},
+    )
+    assert resp.status_code == 408
+    assert "time budget" in resp.json()["detail"]
+    # The upload is removed even though the error response skips background tasks
+    temp_filename = mock_parse.call_args.args[0]
+    assert temp_filename.endswith("_slow.dxf")
+    assert not os.path.exists(temp_filename)
+
+
+def test_parse_endpoint_large_file_mode(client, monkeypatch):
+    from dxf_generator.benchmarks.dxf_corpus import generate
+    from dxf_generator.services.dxf_parser import DXFParser
+    # In-process parsing, so the large-file path can be observed
+    monkeypatch.setattr(config, "PARSE_ISOLATION", False)
+    body = b"".join(generate(target_bytes=config.PARSE_LARGE_FILE_BYTES))
+    assert len(body) <= config.UPLOAD_MAX_SIZE_BYTES
+
+    with patch.object(DXFParser, "parse_large", wraps=DXFParser.parse_large) as parse_large:
+        resp = client.post(
+            "/api/v1/parse",
+            files={"file": ("large.dxf", BytesIO(body), "application/dxf")},
+        )
+
+    assert resp.status_code == 200
+    assert resp.json()["type"] == "column"
+    parse_large.assert_called_once()
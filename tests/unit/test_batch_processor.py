@@ -1,11 +1,13 @@
 """
 Unit tests for BatchProcessor component.
-Tests thread pool management, fire-and-forget submission, and callbacks.
+Tests thread pool management, fire-and-forget submission, callbacks, admission control and lanes.
 """
 import pytest
+import threading
 import time
 from unittest.mock import patch
-from dxf_generator.services.batch_processor import BatchProcessor
+from dxf_generator.exceptions.capacity import BatchTooLargeError, OverloadedError
+from dxf_generator.services.batch_processor import BatchProcessor, parse_lanes
 
 
 @pytest.fixture
@@ -18,13 +20,14 @@ def test_processor_initialization():
     """Test processor initializes with correct worker count."""
     proc = BatchProcessor(max_workers=8)
     assert proc._max_workers == 8
-    assert proc._submitted_count == 0
+    assert proc.submitted_count == 0
 
 
 def test_processor_uses_config_default():
     """Test processor uses config default when max_workers not specified."""
     with patch("dxf_generator.services.batch_processor.config") as mock_config:
         mock_config.MAX_THREADS = 20
+        mock_config.BATCH_LANES = "interactive:20:0,batch:12:1"
         proc = BatchProcessor()
         assert proc._max_workers == 20
 
@@ -122,6 +125,18 @@ def test_submit_batch(processor):
     assert processor.submitted_count == 3
 
 
+def test_run_batch_returns_futures(processor):
+    """Test waited-on batches hand back one future per task, in order."""
+    def fail():
+        raise ValueError("boom")
+    
+    futures = processor.run_batch([(str.upper, ("a",)), (fail,), (max, ([1, 2],), {"default": 0})])
+    
+    assert futures[0].result(timeout=5) == "A"
+    assert isinstance(futures[1].exception(timeout=5), ValueError)
+    assert futures[2].result(timeout=5) == 2
+
+
 def test_submit_batch_with_callbacks(processor):
     """Test batch submission with completion callbacks."""
     results = []
@@ -168,3 +183,157 @@ def test_shutdown(processor):
     processor.submit(lambda: time.sleep(0.1))
     processor.shutdown(wait=False)
     # Should not raise
+
+
+def test_queue_depth_and_active_workers():
+    """Test queued and running tasks are reported separately."""
+    proc = BatchProcessor(max_workers=1)
+    release = threading.Event()
+    
+    proc.submit(release.wait)
+    proc.submit(release.wait)
+    time.sleep(0.1)
+    
+    assert proc.active_workers == 1
+    assert proc.queue_depth == 1
+    
+    release.set()
+    proc.shutdown(wait=True)
+    stats = proc.stats
+    assert {k: stats[k] for k in ("max_workers", "queue_depth", "active_workers", "submitted", "rejected")} == {
+        "max_workers": 1, "queue_depth": 0, "active_workers": 0, "submitted": 2, "rejected": 0
+    }
+    assert stats["queue_wait_ms"] > 0
+    assert stats["overloaded"] is False
+
+
+def test_full_queue_rejects_batch_whole():
+    """Test a batch that would overflow the queue is refused without submitting any task."""
+    proc = BatchProcessor(max_workers=1, max_queue=3)
+    release = threading.Event()
+    proc.submit(release.wait)
+    time.sleep(0.05)
+    proc.submit_batch([(release.wait,), (release.wait,)])
+    
+    with pytest.raises(OverloadedError) as excinfo:
+        proc.submit_batch([(release.wait,), (release.wait,)])
+    
+    assert "queue full" in str(excinfo.value)
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    assert proc.queue_depth == 2
+    assert proc.stats["rejected"] == 2
+    proc.submit(release.wait)
+    release.set()
+    proc.shutdown(wait=True)
+
+
+def test_batch_larger_than_queue_is_refused_outright():
+    """Test a batch that can never fit the queue is refused as too large, even when idle."""
+    proc = BatchProcessor(max_workers=1, max_queue=3)
+    with pytest.raises(BatchTooLargeError) as excinfo:
+        proc.submit_batch([(time.sleep, (0,))] * 4)
+    assert excinfo.value.status_code == 413
+    assert proc.queue_depth == 0
+    assert proc.stats["rejected"] == 4
+    assert proc.submit_batch([(time.sleep, (0,))] * 3) == 3
+    proc.shutdown(wait=True)
+
+
+def test_standing_queue_sheds_until_it_drains():
+    """Test work is refused once every started task waited past target for an interval."""
+    proc = BatchProcessor(max_workers=1, max_queue=100, target_ms=10, interval_ms=60)
+    for _ in range(8):
+        proc.submit(time.sleep, 0.03)
+    time.sleep(0.15)
+    
+    assert proc.stats["overloaded"]
+    with pytest.raises(OverloadedError) as excinfo:
+        proc.submit(time.sleep, 0)
+    assert "above 10ms target" in str(excinfo.value)
+    
+    proc.shutdown(wait=True)
+    proc = BatchProcessor(max_workers=1, max_queue=100, target_ms=10, interval_ms=60)
+    proc._lanes["batch"].overloaded = True
+    # An empty queue is always admitted; a quickly started task clears the state
+    proc.submit(time.sleep, 0)
+    time.sleep(0.05)
+    assert not proc.stats["overloaded"]
+    proc.shutdown(wait=True)
+
+
+def test_short_burst_is_admitted():
+    """Test waits above target for less than an interval do not shed work."""
+    proc = BatchProcessor(max_workers=1, max_queue=100, target_ms=10, interval_ms=5000)
+    for _ in range(5):
+        proc.submit(time.sleep, 0.02)
+    time.sleep(0.06)
+    
+    proc.submit(time.sleep, 0)
+    assert not proc.stats["overloaded"]
+    proc.shutdown(wait=True)
+
+
+def test_parse_lanes():
+    """Test lane specs give each lane its concurrency limit and priority."""
+    assert parse_lanes("interactive:20:0, batch:12:1,bulk:4:2,") == {
+        "interactive": (20, 0), "batch": (12, 1), "bulk": (4, 2)
+    }
+
+
+def test_run_returns_result_and_raises_errors():
+    """Test run() hands back the task's result or exception through a future."""
+    proc = BatchProcessor(max_workers=2, lanes={"interactive": (2, 0), "batch": (2, 1)})
+    assert proc.run(lambda a, b=0: a + b, 2, b=3).result(timeout=1) == 5
+    
+    def failing_task():
+        raise ValueError("Test error")
+    
+    with pytest.raises(ValueError):
+        proc.run(failing_task).result(timeout=1)
+    with pytest.raises(ValueError, match="Unknown lane"):
+        proc.submit(failing_task, lane="nightly")
+    assert proc.stats["lanes"]["interactive"]["submitted"] == 2
+    proc.shutdown(wait=True)
+
+
+def test_higher_priority_lane_takes_the_next_free_thread():
+    """Test a queued interactive task starts before batch tasks queued earlier."""
+    proc = BatchProcessor(max_workers=1, lanes={"interactive": (1, 0), "batch": (1, 1)})
+    release = threading.Event()
+    order = []
+    proc.submit(release.wait)
+    for i in range(3):
+        proc.submit(order.append, f"batch-{i}")
+    future = proc.run(order.append, "interactive")
+    time.sleep(0.05)
+    
+    release.set()
+    future.result(timeout=1)
+    proc.shutdown(wait=True)
+    assert order == ["interactive", "batch-0", "batch-1", "batch-2"]
+
+
+def test_lower_lanes_yield_while_higher_lane_is_busy():
+    """Test batch work drops to one running task while interactive work is in flight."""
+    proc = BatchProcessor(max_workers=8, lanes={"interactive": (4, 0), "batch": (4, 1), "bulk": (4, 2)})
+    interactive, background = threading.Event(), threading.Event()
+    proc.run(interactive.wait)
+    proc.submit_batch([(background.wait,)] * 4)
+    proc.submit_batch([(background.wait,)] * 4, lane="bulk")
+    time.sleep(0.05)
+    
+    lanes = proc.stats["lanes"]
+    assert (lanes["batch"]["active"], lanes["batch"]["queue_depth"]) == (1, 3)
+    assert (lanes["bulk"]["active"], lanes["bulk"]["queue_depth"]) == (1, 3)
+    
+    interactive.set()
+    time.sleep(0.05)
+    # With the interactive lane idle, batch fills to its limit; bulk still yields to batch
+    lanes = proc.stats["lanes"]
+    assert lanes["batch"]["active"] == 4
+    assert lanes["bulk"]["active"] == 1
+    background.set()
+    proc.shutdown(wait=True)
+    assert proc.stats["submitted"] == 9
+
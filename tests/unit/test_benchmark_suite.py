@@ -0,0 +1,83 @@
+"""
+Unit tests for the benchmark suite.
+Tests case timing, baseline comparison, and background jobs.
+"""
+import time
+import pytest
+from unittest.mock import patch
+from dxf_generator.benchmarks import suite
+from dxf_generator.benchmarks.suite import (
+    FULL_BATCH_SIZES, BenchmarkRunner, bench_batch, compare, format_table, make_components, run, save_report, load_report
+)
+
+
+def _report(**p50):
+    return {"results": [{"name": name, "p50_ms": value} for name, value in p50.items()]}
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    """Test only cases slower than baseline by more than the tolerance regress."""
+    baseline = _report(**{"parse.small": 10.0, "zip.10": 4.0})
+    current = _report(**{"parse.small": 12.0, "zip.10": 6.0, "cache.contention": 0.1})
+    
+    result = compare(current, baseline, tolerance=0.25)
+    status = {c["name"]: c["status"] for c in result["cases"]}
+    
+    assert status == {"parse.small": "ok", "zip.10": "regressed", "cache.contention": "new"}
+    assert result["regressions"] == ["zip.10"]
+    assert result["passed"] is False
+
+
+def test_make_components_are_distinct():
+    """Test generated components all have different cache keys."""
+    components = make_components(2000)
+    assert len({str(sorted(c.data.items())) for c in components}) == 2000
+
+
+def test_run_selected_groups(tmp_path):
+    """Test a quick run of selected groups reports stats per case."""
+    report = run(quick=True, only=["generate", "zip"])
+    
+    names = [r["name"] for r in report["results"]]
+    assert names[:2] == ["generate.cold", "generate.warm"]
+    assert "zip.100" in names
+    assert report["meta"]["groups"] == ["generate", "zip"]
+    for r in report["results"]:
+        assert r["min_ms"] <= r["p50_ms"] <= r["p95_ms"] <= r["max_ms"]
+    
+    path = str(tmp_path / "baseline.json")
+    save_report(report, path)
+    assert compare(report, load_report(path))["passed"]
+    assert "generate.cold" in format_table(report)
+
+
+def test_batch_largest_size_is_admitted(tmp_path):
+    """Test the largest full-suite batch fits the benchmark processor's queue."""
+    largest = max(FULL_BATCH_SIZES)
+    with patch.object(suite.DXFGenerator, "generate", lambda component, filename: open(filename, "wb").close()):
+        results = bench_batch(str(tmp_path), [largest], repeats=1)
+    assert results[0]["name"] == f"batch.{largest}"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_rejects_unknown_group():
+    """Test selecting no known group is an error."""
+    with pytest.raises(ValueError):
+        run(quick=True, only=["nope"])
+
+
+def test_runner_one_job_at_a_time():
+    """Test a background job finishes with a report and blocks concurrent starts."""
+    runner = BenchmarkRunner()
+    job = runner.start(quick=True, only=["cache"])
+    with pytest.raises(RuntimeError):
+        runner.start(quick=True, only=["cache"])
+    
+    deadline = time.time() + 30
+    while runner.get(job["id"])["status"] == "running" and time.time() < deadline:
+        time.sleep(0.05)
+    
+    finished = runner.get(job["id"])
+    assert finished["status"] == "finished"
+    assert finished["report"]["results"][0]["name"] == "cache.contention"
+    assert runner.latest_finished()["id"] == job["id"]
@@ -0,0 +1,156 @@
+"""
+Unit tests for BlockResolver and INSERT parsing.
+Tests per-block memoization, insert transforms, and nested blocks.
+"""
+import ezdxf
+import pytest
+from unittest.mock import patch
+from ezdxf.math import Matrix44
+from dxf_generator.services.block_resolver import BlockResolver, BlockContent
+from dxf_generator.services.dxf_parser import DXFParser
+
+
+COLUMN_POINTS = [(0, 0), (300, 0), (300, 400), (0, 400)]
+
+
+@pytest.fixture
+def load_calls():
+    """Record how often each block definition is loaded."""
+    return []
+
+
+@pytest.fixture
+def resolver(load_calls):
+    blocks = {
+        "COL": BlockContent(profiles=[COLUMN_POINTS], inserts=[]),
+        "PAIR": BlockContent(
+            profiles=[],
+            inserts=[("COL", Matrix44()), ("COL", Matrix44.translate(1000, 0, 0))]
+        ),
+    }
+
+    def load_block(name):
+        load_calls.append(name)
+        return blocks.get(name)
+
+    return BlockResolver(load_block, DXFParser._classify_points)
+
+
+def test_block_classified_once(resolver, load_calls):
+    """Test repeated placements reuse the cached block classification."""
+    for i in range(100):
+        resolver.place("COL", Matrix44.translate(i * 500, 0, 0))
+
+    assert load_calls == ["COL"]
+    assert resolver.resolved_count == 1
+
+
+def test_place_applies_translation_and_scale(resolver):
+    """Test insert transforms move the instance and scale its dimensions."""
+    matrix = Matrix44.chain(Matrix44.scale(2, 0.5, 1), Matrix44.translate(50, 60, 0))
+
+    [instance] = resolver.place("COL", matrix)
+
+    assert instance["type"] == "column"
+    assert instance["data"] == {"width": 600.0, "height": 200.0}
+    assert instance["position"] == [50.0, 60.0]
+    assert instance["rotation"] == 0.0
+
+
+def test_place_reports_rotation(resolver):
+    """Test rotation is reported without distorting dimensions."""
+    [instance] = resolver.place("COL", Matrix44.z_rotate(1.5707963267948966))
+
+    assert instance["rotation"] == 90.0
+    assert instance["data"] == {"width": 300.0, "height": 400.0}
+
+
+def test_nested_blocks(resolver, load_calls):
+    """Test nested INSERTs are resolved through their parent block."""
+    instances = resolver.place("PAIR", Matrix44.translate(0, 100, 0))
+
+    assert [i["position"] for i in instances] == [[0.0, 100.0], [1000.0, 100.0]]
+    assert sorted(load_calls) == ["COL", "PAIR"]
+
+
+def test_undefined_block_yields_nothing(resolver):
+    """Test references to missing blocks are skipped."""
+    assert resolver.place("MISSING", Matrix44()) == []
+
+
+def test_parse_file_with_inserts(tmp_path):
+    """Test DXFParser reports every placed instance of a block."""
+    doc = ezdxf.new()
+    block = doc.blocks.new("IBEAM_200")
+    block.add_lwpolyline([
+        (0, 0), (100, 0), (100, 10), (54, 10), (54, 190), (100, 190),
+        (100, 200), (0, 200), (0, 190), (46, 190), (46, 10), (0, 10)
+    ], close=True)
+    msp = doc.modelspace()
+    for i in range(50):
+        msp.add_blockref("IBEAM_200", (i * 250, 0))
+    msp.add_blockref("IBEAM_200", (0, 1000), dxfattribs={"xscale": 2, "yscale": 2})
+    path = tmp_path / "inserts.dxf"
+    doc.saveas(path)
+
+    result = DXFParser.parse(str(path))
+
+    assert result["type"] == "ibeam"
+    assert result["data"]["total_depth"] == 200.0
+    assert len(result["instances"]) == 51
+    assert result["instances"][1]["position"] == [250.0, 0.0]
+    assert result["instances"][-1]["data"]["flange_width"] == 200.0
+    assert result["instances"][-1]["data"]["web_thickness"] == 16.0
+
+
+def test_parse_file_with_unsupported_block(tmp_path):
+    """Test blocks without recognisable profiles raise ValueError."""
+    doc = ezdxf.new()
+    doc.blocks.new("EMPTY").add_line((0, 0), (1, 1))
+    doc.modelspace().add_blockref("EMPTY", (0, 0))
+    path = tmp_path / "empty_block.dxf"
+    doc.saveas(path)
+
+    with pytest.raises(ValueError, match="No supported profile"):
+        DXFParser.parse(str(path))
+
+
+def test_parse_large_matches_ezdxf_path(tmp_path):
+    """Test large-file mode resolves rotated, scaled and nested inserts like ezdxf."""
+    doc = ezdxf.new()
+    column = doc.blocks.new("COL", base_point=(10, 10))
+    for start, end in [((10, 10), (310, 10)), ((310, 10), (310, 410)),
+                       ((310, 410), (10, 410)), ((10, 410), (10, 10))]:
+        column.add_line(start, end)
+    doc.blocks.new("PAIR").add_blockref("COL", (0, 0), dxfattribs={"rotation": 90})
+    msp = doc.modelspace()
+    msp.add_blockref("PAIR", (1000, 500), dxfattribs={"xscale": 2, "yscale": 2})
+    msp.add_blockref("COL", (0, 0), dxfattribs={"yscale": 0.5})
+    path = tmp_path / "nested.dxf"
+    doc.saveas(path)
+
+    expected = DXFParser.parse(str(path), large_file=False)
+    result = DXFParser.parse(str(path), large_file=True)
+
+    assert result["type"] == expected["type"] == "column"
+    assert len(result["instances"]) == 2
+    for got, want in zip(result["instances"], expected["instances"]):
+        assert got["data"] == pytest.approx(want["data"])
+        assert got["position"] == pytest.approx(want["position"])
+        assert got["rotation"] == pytest.approx(want["rotation"])
+
+
+def test_parse_large_selected_by_size(tmp_path, monkeypatch):
+    """Test files above PARSE_LARGE_FILE_BYTES take the memory-mapped path."""
+    from dxf_generator.config.env_config import config
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0), (250, 0), (250, 350), (0, 350)], close=True)
+    path = tmp_path / "column.dxf"
+    doc.saveas(path)
+    monkeypatch.setattr(config, "PARSE_LARGE_FILE_BYTES", 0)
+
+    with patch.object(DXFParser, "parse_large", wraps=DXFParser.parse_large) as parse_large:
+        result = DXFParser.parse(str(path))
+
+    parse_large.assert_called_once()
+    assert result == {"type": "column", "data": {"width": 250.0, "height": 350.0}}
@@ -129,6 +129,35 @@ def test_stats_hit_rate_calculation():
     assert stats["hit_rate"] == "75.0%"
 
 
+def test_stats_track_evictions_and_bytes(cache):
+    """Test evictions are counted and byte usage follows the cached values."""
+    for i in range(6):
+        cache.set(f"key{i}", b"x" * 1000)
+    
+    stats = cache.stats
+    assert stats["evictions"] == 1
+    assert 5000 <= stats["bytes"] < 6000
+    
+    cache.set("key5", b"x" * 10)  # Replacing a value updates its size
+    assert cache.stats["bytes"] < 5000
+    
+    cache.clear()
+    assert cache.stats["bytes"] == 0
+
+
+def test_footprint_counts_keys_and_values(cache):
+    """Test footprint walks keys and values and counts shared objects once."""
+    shared = {"entities": [b"x" * 2000]}
+    cache.set("a", shared)
+    cache.set("b", shared)
+    
+    fp = cache.footprint()
+    assert fp["entries"] == 2
+    assert fp["key_bytes"] > 0
+    assert 2000 <= fp["value_bytes"] < 4000
+    assert fp["total_bytes"] == fp["container_bytes"] + fp["key_bytes"] + fp["value_bytes"]
+
+
 def test_large_cache():
     """Test cache with larger size limit."""
     cache = CacheManager(max_size=1000, name="large")
@@ -0,0 +1,151 @@
+"""
+Unit tests for the cache policy simulator.
+Tests the eviction policies, trace/log access extraction, and miss-ratio analysis.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+from dxf_generator.benchmarks.cache_simulator import (
+    FIFOCache, LFUCache, LRUCache, TinyLFUCache, accesses_from_log, accesses_from_trace,
+    analyze, capacity_grid, simulate
+)
+
+
+def test_fifo_matches_cache_manager_eviction():
+    """Test FIFO ignores hits when choosing a victim, like CacheManager."""
+    cache = FIFOCache(2)
+    for key in ("a", "b", "a", "c"):
+        cache.access(key)
+    assert cache.access("a") is False  # 'a' was oldest despite the hit
+    assert cache.access("c") is True
+
+
+def test_lru_keeps_recently_used():
+    """Test LRU evicts the least recently used key."""
+    cache = LRUCache(2)
+    for key in ("a", "b", "a", "c"):
+        cache.access(key)
+    assert cache.access("a") is True
+    assert cache.access("b") is False
+
+
+def test_lfu_keeps_frequent():
+    """Test LFU evicts the least frequently used key."""
+    cache = LFUCache(2)
+    for key in ("a", "a", "a", "b", "c"):
+        cache.access(key)
+    assert cache.access("a") is True
+    assert cache.access("b") is False
+
+
+def test_tinylfu_resists_scans():
+    """Test a one-off scan does not flush popular keys from TinyLFU."""
+    hot = [f"hot{i}" for i in range(50)]
+    keys = hot * 20 + [f"scan{i}" for i in range(500)] + hot * 5
+    tail = len(hot) * 5
+    
+    def tail_misses(cache):
+        misses = [not cache.access(k) for k in keys]
+        return sum(misses[-tail:])
+    
+    assert tail_misses(TinyLFUCache(100)) < tail_misses(LRUCache(100))
+
+
+def test_skewed_trace_policy_ordering():
+    """Test frequency-aware policies beat FIFO on a Zipf workload."""
+    rng = random.Random(1)
+    weights = [1 / rank for rank in range(1, 2001)]
+    keys = [f"k{rng.choices(range(2000), weights)[0]}" for _ in range(10000)]
+    
+    fifo = simulate(keys, "fifo", 100)
+    assert simulate(keys, "lfu", 100) < fifo
+    assert simulate(keys, "tinylfu", 100) < fifo
+    assert simulate(keys, "lru", len(set(keys))) == len(set(keys)) / len(keys)
+
+
+def test_tinylfu_is_stable_across_processes():
+    """Test the same trace gives the same TinyLFU miss ratio whatever the hash seed."""
+    script = (
+        "import random\n"
+        "from dxf_generator.benchmarks.cache_simulator import simulate\n"
+        "rng = random.Random(1)\n"
+        "keys = [f'k{rng.choices(range(2000), [1 / r for r in range(1, 2001)])[0]}' for _ in range(5000)]\n"
+        "print(simulate(keys, 'tinylfu', 200))\n"
+    )
+    ratios = {
+        subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed}
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(ratios) == 1
+
+
+def test_accesses_from_log(tmp_path):
+    """Test cache hit/miss DEBUG lines become accesses; other lines are ignored."""
+    path = tmp_path / "app.json.log"
+    path.write_text("\n".join([
+        json.dumps({"message": "[generation] Cache miss: IBeam_1"}),
+        json.dumps({"message": "GET / - 200 (1.00ms)"}),
+        "garbage",
+        json.dumps({"message": "[generation] Cache hit: IBeam_1"}),
+        json.dumps({"message": "[parse] Cache miss: abc"}),
+    ]))
+    assert accesses_from_log(str(path)) == [
+        ("generation", "IBeam_1", 1), ("generation", "IBeam_1", 1), ("parse", "abc", 1)
+    ]
+
+
+def test_accesses_from_log_events(tmp_path):
+    """Test cache.hit/cache.miss events are read and sampled ones are refused."""
+    path = tmp_path / "app.json.log"
+    path.write_text("\n".join([
+        json.dumps({"event": "cache.miss", "fields": {"cache": "generation", "key": 42}}),
+        json.dumps({"event": "cache.evict", "fields": {"cache": "generation", "key": 7}}),
+        json.dumps({"event": "cache.hit", "fields": {"cache": "generation", "key": 42}}),
+    ]))
+    assert accesses_from_log(str(path)) == [("generation", "42", 1), ("generation", "42", 1)]
+
+    path.write_text(json.dumps({"event": "cache.hit", "fields": {"cache": "parse", "key": 1, "sample_rate": 0.1}}))
+    with pytest.raises(ValueError):
+        accesses_from_log(str(path))
+
+
+def test_accesses_from_trace():
+    """Test captured requests map to generation, batch and parse lookups."""
+    beam = {"total_depth": 300, "flange_width": 150}
+    records = [
+        {"path": "/api/v1/ibeam", "json": beam},
+        {"path": "/api/v1/ibeam/batch", "json": {"items": [beam, {"total_depth": 310, "flange_width": 150}]}},
+        {"path": "/api/v1/parse", "upload": {"filename": "a.dxf", "bytes": 10}},
+        {"path": "/", "method": "GET"},
+    ]
+    accesses = accesses_from_trace(records)
+    
+    assert [a[0] for a in accesses] == ["generation", "batch", "generation", "generation", "parse"]
+    assert accesses[1][2] == 2
+    assert accesses[0][1] in (accesses[2][1], accesses[3][1])
+
+
+def test_analyze_sizes_for_target_hit_rate():
+    """Test curves cover the configured capacity and sizing reports entries and bytes."""
+    keys = [f"k{i % 10}" for i in range(1000)]
+    report = analyze([("generation", k, 1) for k in keys], {"generation": 1000}, {"generation": 7},
+                     target_hit_rate=0.9, policies=("lru",))
+    
+    entry = report["generation"]
+    assert entry["distinct_keys"] == 10
+    assert 7 in [p["capacity"] for p in entry["curves"]["lru"]]
+    assert entry["sizing"]["lru"] == {"entries": 10, "bytes": 10_000}
+    assert entry["current_miss_ratio"]["lru"] == 1.0  # cyclic scan larger than the cache
+
+
+def test_capacity_grid():
+    """Test the grid spans 1 to the distinct key count and includes extras."""
+    grid = capacity_grid(1000, points=5, extra=[500])
+    assert grid[0] == 1 and grid[-1] == 1000 and 500 in grid
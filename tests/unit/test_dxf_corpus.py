@@ -0,0 +1,95 @@
+"""
+Unit tests for the synthetic DXF corpus generator.
+Tests determinism, sizing, entity mix, block nesting, binary output and malformed variants.
+"""
+import json
+
+import ezdxf
+import pytest
+
+from dxf_generator.benchmarks.dxf_corpus import (
+    BINARY_SENTINEL, MALFORMATIONS, build_corpus, corpus_specs, generate, parse_size, write_dxf
+)
+from dxf_generator.services.dxf_parser import DXFParser
+
+
+def test_same_parameters_give_identical_files(tmp_path):
+    """A seed fixes the bytes; another seed changes them."""
+    first = write_dxf(str(tmp_path / "a.dxf"), entities=500, block_depth=2, seed=7)
+    second = write_dxf(str(tmp_path / "b.dxf"), entities=500, block_depth=2, seed=7)
+    other = write_dxf(str(tmp_path / "c.dxf"), entities=500, block_depth=2, seed=8)
+    assert first["sha256"] == second["sha256"]
+    assert first["sha256"] != other["sha256"]
+    assert (tmp_path / "a.dxf").read_bytes() == (tmp_path / "b.dxf").read_bytes()
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_target_bytes_is_met_closely(tmp_path, binary):
+    """Files sized by bytes land just above the target."""
+    for target in (1024, 256 * 1024):
+        entry = write_dxf(str(tmp_path / "f.dxf"), target_bytes=target, binary=binary)
+        assert target <= entry["bytes"] < target * 1.1 + 1024
+
+
+def test_entity_count_and_mix(tmp_path):
+    """The requested number of filler entities is written in the requested mix."""
+    path = tmp_path / "mix.dxf"
+    entry = write_dxf(str(path), entities=300, mix={"CIRCLE": 1, "TEXT": 1})
+    doc = ezdxf.readfile(str(path))
+    types = [e.dxftype() for e in doc.modelspace()]
+    assert entry["filler_entities"] == 300
+    assert types.count("CIRCLE") + types.count("TEXT") == 300
+    assert types[-1] == "LWPOLYLINE"
+
+
+@pytest.mark.parametrize("large_file", [False, True])
+def test_nested_blocks_place_the_profile(tmp_path, large_file):
+    """The profile is found through every level of block nesting."""
+    path = tmp_path / "nested.dxf"
+    write_dxf(str(path), entities=50, block_depth=4)
+    result = DXFParser.parse(str(path), large_file=large_file)
+    assert result["type"] == "column"
+    assert len(result["instances"]) == 1
+
+
+def test_binary_file_is_readable(tmp_path):
+    """Binary output starts with the sentinel and parses like the ASCII file."""
+    path = tmp_path / "binary.dxf"
+    write_dxf(str(path), entities=100, binary=True, block_depth=1)
+    assert path.read_bytes().startswith(BINARY_SENTINEL)
+    assert DXFParser.parse(str(path), large_file=False)["type"] == "column"
+
+
+def test_malformed_variants_fail_strict_parsing(tmp_path):
+    """Each malformation breaks the ezdxf path."""
+    for kind in MALFORMATIONS:
+        path = tmp_path / f"{kind}.dxf"
+        write_dxf(str(path), entities=100, block_depth=1, malformed=kind)
+        with pytest.raises((ValueError, ezdxf.DXFError)):
+            DXFParser.parse(str(path), large_file=False)
+
+
+def test_invalid_combinations_are_rejected():
+    """Malformations that cannot apply raise before anything is written."""
+    with pytest.raises(ValueError):
+        next(generate(entities=10, binary=True, malformed="bad_number"))
+    with pytest.raises(ValueError):
+        next(generate(entities=10, malformed="unclosed_block"))
+    with pytest.raises(ValueError):
+        next(generate(entities=10, mix={"SPLINE": 1}))
+
+
+def test_build_corpus_writes_manifest(tmp_path):
+    """The manifest lists every file with its parameters and checksum."""
+    specs = corpus_specs([parse_size("2KB")], block_depths=(0, 1), binary=True, malformed=True)
+    manifest = build_corpus(str(tmp_path), specs)
+    assert len(manifest) == 4 + len(MALFORMATIONS)
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
+    assert all((tmp_path / entry["file"]).stat().st_size == entry["bytes"] for entry in manifest)
+
+
+def test_parse_size():
+    """Sizes accept plain bytes and KB/MB/GB suffixes."""
+    assert parse_size("512") == 512
+    assert parse_size("1KB") == 1024
+    assert parse_size("500MB") == 500 * 2**20
@@ -0,0 +1,119 @@
+"""
+Unit tests for DXFScanner.
+Tests tag iteration, section filtering, and LWPOLYLINE extraction.
+"""
+import pytest
+import ezdxf
+from dxf_generator.drawing.drawing import DXFDrawing
+from dxf_generator.services.dxf_scanner import DXFScanner
+
+MINIMAL = b"\n".join([
+    b"0", b"SECTION", b"2", b"ENTITIES",
+    b"0", b"LWPOLYLINE", b"8", b"0", b"90", b"4",
+    b"10", b"0.0", b"20", b"0.0",
+    b"10", b"300.0", b"20", b"0.0",
+    b"10", b"300.0", b"20", b"400.0",
+    b"10", b"0.0", b"20", b"400.0",
+    b"0", b"ENDSEC", b"0", b"EOF", b""
+])
+
+
+def test_iter_tags():
+    """Test tags are decoded as (int code, stripped value)."""
+    tags = list(DXFScanner.iter_tags(b"  0\r\nSECTION\r\n  2\r\nENTITIES\r\n"))
+    assert tags == [(0, b"SECTION"), (2, b"ENTITIES")]
+
+
+def test_iter_tags_rejects_bad_group_code():
+    """Test a non-integer group code raises ValueError."""
+    with pytest.raises(ValueError, match="invalid group code"):
+        list(DXFScanner.iter_tags(b"abc\nvalue\n"))
+
+
+def test_iter_entities_filters_sections():
+    """Test only entities of requested sections are reported."""
+    entities = list(DXFScanner.iter_entities(MINIMAL))
+
+    assert [(section, kind) for section, kind, _ in entities] == [(b"ENTITIES", b"LWPOLYLINE")]
+    assert list(DXFScanner.iter_entities(MINIMAL, sections=(b"BLOCKS",))) == []
+
+
+def test_find_lwpolyline_minimal(tmp_path):
+    """Test vertices are read from a hand-written file."""
+    path = tmp_path / "minimal.dxf"
+    path.write_bytes(MINIMAL)
+
+    assert DXFScanner.find_lwpolyline(str(path)) == [
+        (0.0, 0.0), (300.0, 0.0), (300.0, 400.0), (0.0, 400.0)
+    ]
+
+
+def test_find_lwpolyline_generated_file(tmp_path):
+    """Test vertices are read from an ezdxf-generated file."""
+    drawing = DXFDrawing()
+    drawing.draw_column({"width": 250, "height": 350})
+    path = tmp_path / "column.dxf"
+    drawing.save(str(path))
+
+    points = DXFScanner.find_lwpolyline(str(path))
+
+    assert points[:4] == [(0.0, 0.0), (250.0, 0.0), (250.0, 350.0), (0.0, 350.0)]
+
+
+def test_find_lwpolyline_defers_binary(tmp_path):
+    """Test binary DXF files are left to the full parser."""
+    path = tmp_path / "binary.dxf"
+    path.write_bytes(DXFScanner.BINARY_SENTINEL + b"\r\n\x1a\x00")
+
+    assert DXFScanner.find_lwpolyline(str(path)) is None
+
+
+def _save_column(path, width=300, height=400):
+    drawing = DXFDrawing()
+    drawing.draw_column({"width": width, "height": height})
+    drawing.save(str(path))
+    return path
+
+
+def test_semantic_digest_ignores_header_and_handles(tmp_path):
+    """Test re-exports of the same geometry share a digest."""
+    first = _save_column(tmp_path / "a.dxf")
+    second = tmp_path / "b.dxf"
+    # New GUIDs/timestamps, shifted handles and reformatted floats
+    content = _save_column(second).read_bytes()
+    content = content.replace(b"\n  5\n2F\n", b"\n  5\n9A\n").replace(b"\n300.0\n", b"\n300.000\n")
+    second.write_bytes(content)
+
+    assert DXFScanner.semantic_digest(str(first)) == DXFScanner.semantic_digest(str(second))
+
+
+def test_semantic_digest_detects_geometry_change(tmp_path):
+    """Test different geometry produces a different digest."""
+    first = _save_column(tmp_path / "a.dxf", width=300)
+    second = _save_column(tmp_path / "b.dxf", width=301)
+
+    assert DXFScanner.semantic_digest(str(first)) != DXFScanner.semantic_digest(str(second))
+
+
+def test_collect_geometry_segments_and_inserts(tmp_path):
+    """Test LINE/ARC segments and INSERTs are gathered per layout."""
+    doc = ezdxf.new()
+    doc.blocks.new("COL", base_point=(5, 5)).add_lwpolyline([(0, 0), (1, 0), (1, 1)])
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (10, 0))
+    msp.add_arc((0, 0), radius=10, start_angle=0, end_angle=90)
+    msp.add_blockref("COL", (100, 0), dxfattribs={"xscale": 2, "rotation": 90})
+    path = tmp_path / "geometry.dxf"
+    doc.saveas(path)
+
+    with DXFScanner.open_buffer(str(path)) as data:
+        modelspace, blocks = DXFScanner.collect_geometry(data)
+
+    assert modelspace.lwpolylines == []
+    assert len(modelspace.segments) == 2
+    assert modelspace.segments[1][1] == pytest.approx((0.0, 10.0))
+    assert modelspace.inserts[0].name == "COL"
+    assert modelspace.inserts[0].scale == (2.0, 1.0, 1.0)
+    assert modelspace.inserts[0].rotation == 90.0
+    assert blocks["COL"].base_point == (5.0, 5.0, 0.0)
+    assert blocks["COL"].lwpolylines == [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]]
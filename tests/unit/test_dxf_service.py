@@ -1,5 +1,12 @@
+import threading
+import time
+from concurrent.futures import wait
+
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
+from dxf_generator.exceptions.capacity import BatchTooLargeError
+from dxf_generator.exceptions.parsing import ParseTimeoutError
+from dxf_generator.services.batch_processor import BatchProcessor
 from dxf_generator.services.dxf_service import DXFService
 
 class MockComponent:
@@ -78,8 +85,9 @@ def test_get_cache_stats(dxf_service):
     stats = dxf_service.get_cache_stats()
     assert "generation" in stats
     assert "parse" in stats
-    assert set(stats["generation"].keys()) == {"hits", "misses", "size", "hit_rate"}
-    assert set(stats["parse"].keys()) == {"hits", "misses", "size", "hit_rate"}
+    keys = {"hits", "misses", "size", "hit_rate", "evictions", "bytes"}
+    assert set(stats["generation"].keys()) == keys
+    assert set(stats["parse"].keys()) == keys
 
 @patch("dxf_generator.services.dxf_generator.open", new_callable=mock_open, read_data=b"batch_data")
 def test_save_batch(mock_file, dxf_service):
@@ -97,8 +105,10 @@ def test_save_batch(mock_file, dxf_service):
     # Method should return immediately
     assert elapsed < 0.5, f"save_batch blocked for {elapsed}s, should return immediately"
     
-    # Returns only cache hits (none for new items)
-    assert generated == [], "New items should be submitted async, not returned"
+    # One future per queued (uncached) item, for the caller to wait on
+    assert len(generated) == 10
+    wait(generated)
+    assert all(f.exception() is None for f in generated)
 
 
 @patch("dxf_generator.services.dxf_service.DXFGenerator.write_content")
@@ -109,11 +119,70 @@ def test_save_batch_writes_cache_hits(mock_write_content, dxf_service):
     key0 = dxf_service.get_cache_key(components[0])
     dxf_service._generation_cache.set(key0, b"a")
 
-    returned = dxf_service.save_batch(components, filenames)
+    with patch.object(dxf_service, "save_cached") as mock_save_cached:
+        futures = dxf_service.save_batch(components, filenames)
+        wait(futures)
 
-    assert returned == ["a.dxf"]
+    # Only the uncached item is queued; the cached one is written straight away
+    assert len(futures) == 1
+    mock_save_cached.assert_called_once_with(components[1], "b.dxf")
     mock_write_content.assert_called_once_with(b"a", "a.dxf")
 
+@patch("dxf_generator.services.dxf_service.DXFGenerator.write_content")
+def test_save_batch_rejected_writes_nothing(mock_write_content, dxf_service, monkeypatch):
+    monkeypatch.setattr(dxf_service, "_batch_processor", BatchProcessor(max_workers=1, max_queue=1))
+    components = [MockComponent({"id": i}) for i in range(3)]
+    dxf_service._generation_cache.set(dxf_service.get_cache_key(components[0]), b"a")
+
+    with pytest.raises(BatchTooLargeError):
+        dxf_service.save_batch(components, ["a.dxf", "b.dxf", "c.dxf"])
+
+    mock_write_content.assert_not_called()
+    assert dxf_service.get_batch_stats()["submitted"] == 0
+
+def test_submit_cached_shares_concurrent_generation(dxf_service, monkeypatch):
+    processor = BatchProcessor(max_workers=2, lanes={"interactive": (2, 0)})
+    monkeypatch.setattr(dxf_service, "_batch_processor", processor)
+    calls = []
+
+    def slow_generate(component, filename):
+        calls.append(filename)
+        time.sleep(0.05)
+        return b"content"
+
+    with patch("dxf_generator.services.dxf_service.DXFGenerator.generate", side_effect=slow_generate):
+        component = MockComponent({"shared": 1})
+        first = dxf_service.submit_cached(component, "a.dxf")
+        second = dxf_service.submit_cached(component, "b.dxf")
+        assert second is not first
+        assert first.result(timeout=1) == b"content"
+        assert second.result(timeout=1) == b"content"
+        time.sleep(0.01)
+        # Once finished, later requests are served from the generation cache
+        assert dxf_service.submit_cached(component, "c.dxf").result(timeout=1) == b"content"
+
+    assert calls == ["a.dxf"]
+    assert processor.stats["lanes"]["interactive"]["submitted"] == 2
+    processor.shutdown(wait=True)
+
+def test_submit_cached_cancel_leaves_shared_generation(dxf_service, monkeypatch):
+    processor = BatchProcessor(max_workers=1, lanes={"interactive": (1, 0)})
+    monkeypatch.setattr(dxf_service, "_batch_processor", processor)
+    release = threading.Event()
+    processor.run(release.wait)
+
+    with patch("dxf_generator.services.dxf_service.DXFGenerator.generate", return_value=b"content"):
+        component = MockComponent({"cancelled": 1})
+        first = dxf_service.submit_cached(component, "a.dxf")
+        second = dxf_service.submit_cached(component, "b.dxf")
+        # The first client disconnects while the shared task is still queued
+        assert first.cancel()
+        release.set()
+        assert second.result(timeout=1) == b"content"
+
+    assert first.cancelled()
+    processor.shutdown(wait=True)
+
 @patch("dxf_generator.services.dxf_parser.ezdxf")
 def test_parse_cache_hit(mock_ezdxf, dxf_service):
     # Setup mock
@@ -161,3 +230,40 @@ def test_parse_new_file(mock_ezdxf, dxf_service):
         assert result["type"] == "column"
         assert result["data"]["width"] == 400
         assert result["data"]["height"] == 300
+
+
+def test_isolated_parse_digests_within_budget(dxf_service, tmp_path):
+    """Test an isolated parse computes the digest in a worker and surfaces its budget errors."""
+    path = tmp_path / "upload.dxf"
+    path.write_text("0\nEOF\n")
+
+    with patch("dxf_generator.services.dxf_service.TieredParser") as mock_tiered, \
+            patch("dxf_generator.services.dxf_service.DXFScanner.semantic_digest") as mock_digest:
+        mock_tiered.semantic_digest.side_effect = ParseTimeoutError("Parsing exceeded time budget of 10.0s")
+        with pytest.raises(ParseTimeoutError):
+            dxf_service.parse(str(path), isolated=True)
+
+    mock_digest.assert_not_called()
+    mock_tiered.parse.assert_not_called()
+
+
+def test_parse_semantic_cache_hit_for_reexport(dxf_service, tmp_path):
+    """Test a re-exported copy of a parsed file is served from the semantic cache."""
+    from dxf_generator.drawing.drawing import DXFDrawing
+
+    paths = []
+    for name in ("first.dxf", "second.dxf"):
+        drawing = DXFDrawing()
+        drawing.draw_column({"width": 300, "height": 400})
+        drawing.save(str(tmp_path / name))
+        paths.append(str(tmp_path / name))
+    with open(paths[1], "ab") as f:
+        f.write(b"\n")  # Guarantee the byte-level hashes differ
+
+    first = dxf_service.parse(paths[0])
+    with patch("dxf_generator.services.dxf_service.DXFParser.parse") as mock_parse:
+        second = dxf_service.parse(paths[1])
+
+    mock_parse.assert_not_called()
+    assert second == first
+    assert dxf_service._semantic_parse_cache.stats["hits"] == 1
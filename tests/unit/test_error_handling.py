@@ -1,4 +1,5 @@
 import pytest
+from concurrent.futures import wait
 from unittest.mock import MagicMock, patch
 from dxf_generator.services.dxf_service import DXFService
 import ezdxf
@@ -35,7 +36,7 @@ def test_save_cached_logs_error(mock_logger, dxf_service):
 @patch("dxf_generator.services.dxf_service.DXFService.save_cached")
 def test_save_batch_partial_failure(mock_save_cached, dxf_service):
     """
-    Test that partial failures in batch processing are handled via callbacks.
+    Test that partial failures in batch processing are reported through the returned futures.
     """
     def side_effect(comp, filename):
         if filename == "fail.dxf":
@@ -55,8 +56,10 @@ def test_save_batch_partial_failure(mock_save_cached, dxf_service):
     # Method should return immediately
     assert elapsed < 0.5, f"save_batch blocked for {elapsed}s"
     
-    # Returns empty for new items (fire-and-forget)
-    assert generated == [], "New items should be submitted async"
+    # Each item's outcome reaches the caller through its future
+    wait(generated)
+    assert generated[0].result() == b"success"
+    assert isinstance(generated[1].exception(), ValueError)
     
     # Wait briefly for background tasks
     time.sleep(0.5)
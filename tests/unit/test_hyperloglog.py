@@ -0,0 +1,72 @@
+"""
+Unit tests for HyperLogLog client cardinality.
+Tests estimate accuracy, merging, sliding windows, and serialization.
+"""
+import pytest
+from dxf_generator.monitoring.hyperloglog import (
+    HyperLogLog, UniqueClientEstimator, WindowedHyperLogLog, hash_item, merge_estimates
+)
+
+
+def test_small_counts_are_exact():
+    """Test linear counting keeps small cardinalities exact."""
+    hll = HyperLogLog()
+    for i in range(50):
+        hll.add(f"10.0.0.{i}")
+        hll.add(f"10.0.0.{i}")  # Duplicates do not count
+
+    assert hll.count() == 50
+
+
+def test_large_count_within_error():
+    """Test the estimate stays within a few standard errors at scale."""
+    hll = HyperLogLog()
+    for i in range(100_000):
+        hll.add(f"client-{i}")
+
+    assert hll.count() == pytest.approx(100_000, rel=4 * hll.relative_error)
+
+
+def test_memory_is_fixed():
+    """Test register storage does not grow with the number of items."""
+    hll = HyperLogLog(precision=10)
+    for i in range(10_000):
+        hll.add(str(i))
+
+    assert len(hll.registers) == 1024
+
+
+def test_merge_equals_union():
+    """Test merging two sketches estimates the union of their items."""
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        a.add(f"ip-{i}")
+    for i in range(2000, 5000):
+        b.add(f"ip-{i}")
+    a.merge(b)
+
+    assert a.count() == pytest.approx(5000, rel=4 * a.relative_error)
+
+
+def test_window_drops_expired_slots():
+    """Test clients fall out of the window once their slot ages out."""
+    window = WindowedHyperLogLog(slot_seconds=60, slot_count=5)
+    window.add_hash(hash_item("old"), now=0)
+    window.add_hash(hash_item("recent"), now=250)
+
+    assert window.count(now=250) == 2
+    assert window.count(now=300) == 1  # Slot at t=0 has left the 5-minute window
+
+
+def test_estimator_serializes_and_merges_across_workers():
+    """Test worker estimators round-trip and merge into a union estimate."""
+    first, second = UniqueClientEstimator(), UniqueClientEstimator()
+    for i in range(100):
+        first.add(f"a{i}", now=1000)
+        second.add(f"a{i + 50}", now=1000)
+
+    merged = merge_estimates([first.to_dict(now=1000), second.to_dict(now=1000)])
+
+    assert merged["lifetime"] == pytest.approx(150, abs=3)
+    assert merged["5m"] == merged["lifetime"]
+    assert merged["relative_error"] == pytest.approx(0.0163, abs=1e-4)
@@ -0,0 +1,26 @@
+"""
+Unit tests for the lane isolation benchmark.
+Tests the flat comparison lanes and a short in-process run.
+"""
+import asyncio
+import os
+
+from dxf_generator.benchmarks.lane_isolation import flat_lanes, run
+
+
+def test_flat_lanes_share_one_priority():
+    """Every lane gets the whole pool and the same priority."""
+    assert flat_lanes({"interactive": (20, 0), "bulk": (4, 2)}, 8) == {"interactive": (8, 0), "bulk": (8, 0)}
+
+
+def test_short_run_reports_each_mode():
+    """A short run measures idle, flat and laned configurations and restores the cwd."""
+    cwd = os.getcwd()
+    report = asyncio.run(run(duration=0.5, rate=10, bulk_clients=1, batch_items=3))
+    assert os.getcwd() == cwd
+    assert set(report["results"]) == {"idle", "flat", "lanes"}
+    for result in report["results"].values():
+        assert result["requests"] == 5
+        assert result["p99_ms"] > 0
+    assert report["results"]["idle"]["lanes"]["bulk"] == 0
+    assert report["results"]["lanes"]["lanes"]["interactive"] == 5
@@ -0,0 +1,67 @@
+"""
+Unit tests for LatencyHistogram.
+Tests bucketing, per-thread shard merging, and percentile estimation.
+"""
+import threading
+import pytest
+from dxf_generator.monitoring.latency_histogram import LatencyHistogram
+
+
+def test_record_buckets_values():
+    """Test values land in the first bucket whose bound is >= value."""
+    histogram = LatencyHistogram(buckets=(10, 100))
+    for value in (5, 10, 50, 500):
+        histogram.record("route", value)
+
+    snap = histogram.snapshot()["route"]
+
+    assert snap.counts == [2, 1, 1]
+    assert snap.total == 565
+    assert snap.max == 500
+
+
+def test_shards_merged_across_threads():
+    """Test observations from many threads are all counted."""
+    histogram = LatencyHistogram()
+
+    def worker():
+        for _ in range(1000):
+            histogram.record(("GET /", "2xx"), 3.0)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert histogram.snapshot()[("GET /", "2xx")].count == 8000
+
+
+def test_percentiles_interpolate_within_bucket():
+    """Test percentiles are estimated inside the bucket holding the rank."""
+    histogram = LatencyHistogram(buckets=(10, 20, 30))
+    for value in range(1, 101):
+        histogram.record("k", value * 0.3)  # Uniform over (0, 30]
+
+    snap = histogram.snapshot()["k"]
+
+    assert snap.percentile(0.5) == pytest.approx(15.0, abs=0.5)
+    assert snap.percentile(0.99) == pytest.approx(29.7, abs=0.5)
+    assert snap.percentile(1.0) <= snap.max
+
+
+def test_overflow_bucket_capped_at_max():
+    """Test values beyond the last bound are estimated up to the observed max."""
+    histogram = LatencyHistogram(buckets=(10,))
+    histogram.record("k", 1000.0)
+
+    assert histogram.snapshot()["k"].percentile(0.99) <= 1000.0
+
+
+def test_reset_clears_observations():
+    """Test reset empties every shard."""
+    histogram = LatencyHistogram()
+    histogram.record("k", 1.0)
+    histogram.reset()
+
+    assert histogram.snapshot() == {}
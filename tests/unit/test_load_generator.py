@@ -0,0 +1,82 @@
+"""
+Unit tests for the trace-replay load generator.
+Tests workload loading, open-loop scheduling, reporting, and in-process replay.
+"""
+import asyncio
+import json
+import pytest
+from dxf_generator.benchmarks.load_generator import (
+    build_report, load_workload, run_load, schedule, synthesize_workload
+)
+
+IBEAM = {"method": "POST", "path": "/api/v1/ibeam",
+         "json": {"total_depth": 300, "flange_width": 150, "web_thickness": 8, "flange_thickness": 12}}
+
+
+def test_load_workload_skips_non_request_lines(tmp_path):
+    """Test only records with method and path are replayed."""
+    path = tmp_path / "trace.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"t": 0.0, **IBEAM}),
+        json.dumps({"request_id": "user-001", "title": "not a request"}),
+        "not json",
+        "",
+        json.dumps({"t": 0.5, "method": "GET", "path": "/"}),
+    ]))
+    
+    records = load_workload(str(path))
+    assert [r["path"] for r in records] == ["/api/v1/ibeam", "/"]
+
+
+def test_schedule_fixed_rate_and_trace_offsets():
+    """Test rate spacing, recorded offsets and speed-up."""
+    records = [{"t": 10.0}, {"t": 10.5}, {"t": 12.0}]
+    assert schedule(records, rate=4) == [0.0, 0.25, 0.5]
+    assert schedule(records, rate=None, speed=2) == [0.0, 0.25, 1.0]
+    with pytest.raises(ValueError):
+        schedule([{"method": "GET"}], rate=None)
+
+
+def test_synthetic_workload_repeats_shapes():
+    """Test synthetic workloads are deterministic and contain repeats."""
+    first = synthesize_workload(200, seed=3)
+    assert first == synthesize_workload(200, seed=3)
+    bodies = [json.dumps(r["json"], sort_keys=True) for r in first]
+    assert len(set(bodies)) < len(bodies)
+
+
+def test_report_timeline_and_percentiles():
+    """Test samples are bucketed by completion time with per-bucket stats."""
+    samples = [
+        {"status": 200, "cache": "HIT", "latency_ms": 10.0, "service_ms": 5.0, "finished_at": 0.2},
+        {"status": 200, "cache": "MISS", "latency_ms": 30.0, "service_ms": 20.0, "finished_at": 0.8},
+        {"status": 500, "cache": None, "latency_ms": 100.0, "service_ms": 90.0, "finished_at": 1.5},
+    ]
+    report = build_report(samples, duration=2.0, interval=1.0, mode="test")
+    
+    overall = report["overall"]
+    assert overall["requests"] == 3
+    assert overall["error_rate"] == pytest.approx(1 / 3, abs=1e-3)
+    assert overall["cache_hit_ratio"] == 0.5
+    assert overall["p50_ms"] == 30.0 and overall["max_ms"] == 100.0
+    assert overall["service_p50_ms"] == 20.0
+    assert [b["requests"] for b in report["timeline"]] == [2, 1]
+
+
+def test_open_loop_in_process_replay():
+    """Test an open-loop replay against the app records cache hits."""
+    records = [dict(IBEAM) for _ in range(10)] + [{"method": "GET", "path": "/"}]
+    report = asyncio.run(run_load(records, rate=200))
+    
+    overall = report["overall"]
+    assert overall["requests"] == 11
+    assert overall["error_rate"] == 0
+    assert overall["cache_hit_ratio"] >= 0.8
+    assert report["target"] == "in-process"
+
+
+def test_closed_loop_in_process_replay():
+    """Test closed-loop workers send every record."""
+    report = asyncio.run(run_load([{"method": "GET", "path": "/"}] * 20, concurrency=4))
+    assert report["overall"]["requests"] == 20
+    assert report["mode"] == "closed-loop x4"
@@ -0,0 +1,189 @@
+"""
+Unit tests for the logging pipeline.
+Tests size/time rotation with compression, the dropping queue handler, handler levels
+and lazy structured events.
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+from dxf_generator.config import logging_config
+from dxf_generator.config.logging_config import (
+    DroppingQueueHandler,
+    SizeAndTimeRotatingFileHandler,
+    StructuredFormatter,
+    log_event,
+    parse_sample_rates,
+    request_id,
+)
+
+
+def _record(message, level=logging.INFO):
+    return logging.LogRecord("dxf_generator", level, __file__, 1, message, None, None)
+
+
+def test_size_rotation_compresses_and_keeps_backup_count(tmp_path):
+    """Files rotate at max_bytes, are gzipped and only backup_count are kept."""
+    path = tmp_path / "app.json.log"
+    handler = SizeAndTimeRotatingFileHandler(str(path), max_bytes=200, backup_count=2)
+    handler.setFormatter(StructuredFormatter())
+    for i in range(30):
+        handler.emit(_record(f"message {i}"))
+    handler.close()
+
+    rotated = sorted(name for name in os.listdir(tmp_path) if name != "app.json.log")
+    assert len(rotated) == 2
+    assert all(name.endswith(".gz") for name in rotated)
+    with gzip.open(tmp_path / rotated[0], "rt") as f:
+        assert json.loads(f.readline())["message"].startswith("message")
+    assert os.path.getsize(path) < 200
+
+
+def test_rotation_does_not_overwrite_existing_backup(tmp_path):
+    """A rotation after a restart gets a new sequence number instead of replacing a backup."""
+    path = tmp_path / "app.json.log"
+    backups = []
+    for _ in range(2):
+        handler = SizeAndTimeRotatingFileHandler(str(path), max_bytes=100, backup_count=10)
+        handler.setFormatter(StructuredFormatter())
+        for i in range(3):
+            handler.emit(_record(f"message {i}"))
+        handler.close()
+        backups.append({
+            name: (tmp_path / name).read_bytes() for name in os.listdir(tmp_path) if name != "app.json.log"
+        })
+    first, second = backups
+    assert len(second) > len(first) > 0
+    assert all(second[name] == content for name, content in first.items())
+
+
+def test_dropping_queue_handler_drops_when_full():
+    """A full queue drops and counts records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.emit(_record(f"message {i}"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_queued_record_is_formatted_by_the_listener():
+    """Records are queued unformatted; the message and traceback are rendered from them later."""
+    handler = DroppingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("dxf_generator", logging.ERROR, __file__, 1, "failed %s", ("x",), sys.exc_info())
+    handler.emit(record)
+
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("failed %s", ("x",))
+    assert queued.exc_info[0] is ValueError and queued.exc_text is None
+    data = json.loads(StructuredFormatter().format(queued))
+    assert data["message"] == "failed x"
+    assert "ValueError: boom" in data["exception"]
+
+
+def test_logger_level_is_most_verbose_handler(tmp_path):
+    """The logger passes records any handler wants and each handler filters its own."""
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    console.setLevel(logging.WARNING)
+    file_handler = logging.FileHandler(tmp_path / "out.log")
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        logger = logging_config.install_handlers([console, file_handler])
+        assert logger.level == logging.INFO
+        logger.debug("hidden")
+        logger.info("written")
+        logging_config.flush_logging()
+        assert (tmp_path / "out.log").read_text().splitlines() == ["written"]
+    finally:
+        logging_config.stop_logging()
+        logging_config.setup_logging()
+
+
+def _capture_events(tmp_path, level=logging.DEBUG):
+    file_handler = logging.FileHandler(tmp_path / "events.log")
+    file_handler.setLevel(level)
+    file_handler.setFormatter(StructuredFormatter())
+    logging_config.install_handlers([file_handler])
+    return tmp_path / "events.log"
+
+
+def _read_events(path):
+    logging_config.flush_logging()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_suppressed_event_is_never_rendered(tmp_path):
+    """Callable fields of an event below the logger level are not called."""
+    calls = []
+    try:
+        path = _capture_events(tmp_path, level=logging.INFO)
+        log_event("dxf.generate", data=lambda: calls.append(1))
+        log_event("dxf.generated", level=logging.INFO, data=lambda: calls.append(2) or "built")
+        events = _read_events(path)
+    finally:
+        logging_config.stop_logging()
+        logging_config.setup_logging()
+    assert calls == [2]
+    assert [e["event"] for e in events] == ["dxf.generated"]
+    assert events[0]["fields"] == {"data": "built"}
+    assert events[0]["message"] == "dxf.generated data=built"
+    assert events[0]["function"] == "test_suppressed_event_is_never_rendered"
+
+
+def test_event_fields_are_resolved_by_the_listener(tmp_path):
+    """An emitted event is queued as is; its callable fields run on the listener thread."""
+    threads = []
+    try:
+        path = _capture_events(tmp_path)
+        log_event("dxf.generate", data=lambda: threads.append(threading.current_thread()) or "built")
+        events = _read_events(path)
+    finally:
+        logging_config.stop_logging()
+        logging_config.setup_logging()
+    assert events[0]["fields"] == {"data": "built"}
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+
+
+def test_event_carries_request_id(tmp_path):
+    """Records logged while a request id is set carry it."""
+    token = request_id.set("req-123")
+    try:
+        path = _capture_events(tmp_path)
+        log_event("cache.hit", cache="generation", key=1)
+        events = _read_events(path)
+    finally:
+        request_id.reset(token)
+        logging_config.stop_logging()
+        logging_config.setup_logging()
+    assert events[0]["request_id"] == "req-123"
+    assert events[0]["fields"] == {"cache": "generation", "key": 1}
+
+
+def test_event_sampling(tmp_path, monkeypatch):
+    """Sampled events keep roughly their rate and record it; configured rates win."""
+    monkeypatch.setattr(logging_config, "_sample_rates", {"cache.hit": 0.0})
+    try:
+        path = _capture_events(tmp_path)
+        for _ in range(1000):
+            log_event("cache.hit", cache="generation", key=1, sample=1.0)
+            log_event("cache.miss", cache="generation", key=2, sample=0.25)
+        events = _read_events(path)
+    finally:
+        logging_config.stop_logging()
+        logging_config.setup_logging()
+    assert all(e["event"] == "cache.miss" for e in events)
+    assert all(e["fields"]["sample_rate"] == 0.25 for e in events)
+    assert 150 < len(events) < 350
+
+
+def test_parse_sample_rates():
+    """Rates are parsed per event name and clamped to [0, 1]."""
+    assert parse_sample_rates("cache.hit=0.01, request.start=2,bad,") == {"cache.hit": 0.01, "request.start": 1.0}
+    assert parse_sample_rates("") == {}
@@ -0,0 +1,75 @@
+"""
+Unit tests for MemoryProfiler.
+Tests snapshot retention, allocation site reports and snapshot diffs.
+"""
+import gc
+
+import pytest
+from dxf_generator.monitoring.memory_profiler import MemoryProfiler, count_live_objects
+
+
+@pytest.fixture
+def profiler():
+    """Fresh profiler that stops tracing afterwards."""
+    prof = MemoryProfiler(max_snapshots=3, frames=5)
+    yield prof
+    prof.stop()
+
+
+def test_first_snapshot_starts_tracing(profiler):
+    """Test tracing is off until the first snapshot."""
+    profiler.stop()
+    assert not profiler.tracing
+    
+    info = profiler.take_snapshot()
+    assert info["tracing_started"] is True
+    assert profiler.tracing
+    assert profiler.take_snapshot()["tracing_started"] is False
+
+
+def test_snapshots_are_bounded(profiler):
+    """Test only the newest max_snapshots are kept."""
+    ids = [profiler.take_snapshot()["id"] for _ in range(5)]
+    
+    assert [s["id"] for s in profiler.list_snapshots()] == ids[-3:]
+    with pytest.raises(KeyError):
+        profiler.top(ids[0])
+
+
+def test_diff_reports_growth(profiler):
+    """Test a diff attributes new allocations to the allocating line."""
+    base = profiler.take_snapshot()["id"]
+    retained = [bytearray(1024) for _ in range(500)]
+    target = profiler.take_snapshot()["id"]
+    
+    diff = profiler.diff(base, target, limit=5)
+    assert diff["total_diff_bytes"] >= 500 * 1024
+    assert "test_memory_profiler.py" in diff["top"][0]["site"]
+    assert diff["top"][0]["count_diff"] >= 500
+    del retained
+
+
+def test_top_separates_package_sites(profiler):
+    """Test dxf_top only lists dxf_generator allocation sites."""
+    from dxf_generator.services.dxf_service import DXFService
+    from dxf_generator.domain.ibeam import IBeam
+    
+    profiler.take_snapshot()
+    DXFService.get_cache_key(IBeam(300, 150, 8, 12))
+    report = profiler.top(profiler.take_snapshot()["id"], limit=10)
+    
+    assert report["top"]
+    assert all(row["site"].startswith("dxf_generator") for row in report["dxf_top"])
+
+
+def test_count_live_objects():
+    """Test live objects are counted by class name and module."""
+    import ezdxf
+    # Collect first, so cyclic garbage left by earlier tests cannot vanish between
+    # the counts; other threads may still hold documents, hence >= rather than ==
+    gc.collect()
+    before = count_live_objects("Drawing", "ezdxf")
+    doc = ezdxf.new()
+    gc.collect()
+    assert count_live_objects("Drawing", "ezdxf") >= before + 1
+    del doc
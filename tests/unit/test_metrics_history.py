@@ -0,0 +1,135 @@
+"""
+Unit tests for the metrics history store.
+Tests interval deltas, rollups into coarser tiers, retention, tier selection and
+summing over workers.
+"""
+import pytest
+
+from dxf_generator.monitoring.metrics_history import MetricsHistory, default_tiers
+from dxf_generator.monitoring.request_metrics import RequestMetrics
+
+T0 = 1_800_000_000  # a multiple of 3600
+
+
+@pytest.fixture
+def cache_stats():
+    return {"generation": {"hits": 0, "misses": 0, "bytes": 0, "size": 0}}
+
+
+def _history(tmp_path, metrics, cache_stats, tiers=None):
+    return MetricsHistory(
+        str(tmp_path / "history.db"), tiers or default_tiers(1, 1, 30), 10, metrics,
+        # A fresh dict per call, like the real cache stats
+        cache_stats=lambda: {name: dict(s) for name, s in cache_stats.items()},
+        batch_stats=lambda: {"submitted": 0, "queue_depth": 0, "active_workers": 0}
+    )
+
+
+def test_first_sample_sets_baseline(tmp_path, cache_stats):
+    """Requests before the first sample are not stored; later ones are stored as deltas."""
+    metrics = RequestMetrics()
+    history = _history(tmp_path, metrics, cache_stats)
+    conn = history.connect()
+    metrics.record("GET /", 200, 5.0)
+    history.write_sample(conn, now=T0 + 10)
+    for _ in range(3):
+        metrics.record("GET /", 200, 5.0)
+    metrics.record("GET /", 500, 5.0)
+    history.write_sample(conn, now=T0 + 20)
+
+    points = history.query(T0, T0 + 20, "10s", conn=conn)["points"]
+    assert [(p["ts"], p["requests"], p["errors"]) for p in points] == [(T0 + 10, 4, 1)]
+    assert points[0]["error_rate"] == 0.25
+    assert points[0]["rps"] == 0.4
+
+
+def test_samples_roll_up_into_coarser_tiers(tmp_path, cache_stats):
+    """1-minute and 1-hour rows hold the sums of their 10-second samples."""
+    metrics = RequestMetrics()
+    history = _history(tmp_path, metrics, cache_stats)
+    conn = history.connect()
+    history.write_sample(conn, now=T0)
+    for i in range(1, 13):
+        metrics.record("GET /", 200, 3.0)
+        history.write_sample(conn, now=T0 + i * 10)
+
+    assert [p["requests"] for p in history.query(T0, T0 + 120, "10s", conn=conn)["points"]] == [1] * 12
+    assert [p["requests"] for p in history.query(T0, T0 + 120, "1m", conn=conn)["points"]] == [6, 6]
+    hour = history.query(T0, T0 + 120, "1h", conn=conn)["points"]
+    assert [(p["ts"], p["requests"]) for p in hour] == [(T0, 12)]
+
+
+def test_percentiles_survive_rollup(tmp_path, cache_stats):
+    """Rolled-up bucket counts give the same percentiles as the raw samples."""
+    metrics = RequestMetrics()
+    history = _history(tmp_path, metrics, cache_stats)
+    conn = history.connect()
+    history.write_sample(conn, now=T0)
+    for i in range(1, 7):
+        for _ in range(9):
+            metrics.record("GET /", 200, 3.0)
+        metrics.record("GET /", 200, 800.0)
+        history.write_sample(conn, now=T0 + i * 10)
+
+    minute = history.query(T0, T0 + 60, "1m", conn=conn)["points"][0]
+    assert minute["requests"] == 60
+    assert minute["p50_ms"] <= 5
+    assert 500 <= minute["p99_ms"] <= 1000
+    assert minute["mean_ms"] == pytest.approx(82.7, abs=0.1)
+
+
+def test_cache_hit_ratio_and_gauges(tmp_path, cache_stats):
+    """Cache lookups are stored as deltas; size is the latest value."""
+    history = _history(tmp_path, RequestMetrics(), cache_stats)
+    conn = history.connect()
+    history.write_sample(conn, now=T0)
+    cache_stats["generation"].update(hits=3, misses=1, bytes=2048, size=4)
+    history.write_sample(conn, now=T0 + 10)
+
+    cache = history.query(T0, T0 + 10, "10s", conn=conn)["points"][0]["caches"]["generation"]
+    assert cache == {"hits": 3, "misses": 1, "hit_ratio": 0.75, "bytes": 2048, "entries": 4}
+
+
+def test_retention_prunes_old_rows(tmp_path, cache_stats):
+    """Rows older than their tier's retention are deleted on write."""
+    metrics = RequestMetrics()
+    history = _history(tmp_path, metrics, cache_stats, tiers=[("10s", 10, 60), ("1m", 60, 600), ("1h", 3600, 86400)])
+    conn = history.connect()
+    history.write_sample(conn, now=T0)
+    for i in range(1, 31):
+        metrics.record("GET /", 200, 3.0)
+        history.write_sample(conn, now=T0 + i * 10)
+
+    raw = history.query(T0, T0 + 300, "10s", conn=conn)["points"]
+    assert len(raw) == 6
+    assert raw[0]["ts"] >= T0 + 240
+    assert sum(p["requests"] for p in history.query(T0, T0 + 300, "1m", conn=conn)["points"]) == 30
+
+
+def test_workers_are_summed(tmp_path, cache_stats):
+    """Two workers sharing a file are added up per timestamp."""
+    histories = []
+    for worker in (1, 2):
+        metrics = RequestMetrics()
+        history = _history(tmp_path, metrics, cache_stats)
+        history.worker = worker
+        conn = history.connect()
+        history.write_sample(conn, now=T0)
+        for _ in range(worker):
+            metrics.record("GET /", 200, 3.0)
+        history.write_sample(conn, now=T0 + 10)
+        histories.append(history)
+
+    point = histories[0].query(T0, T0 + 10, "10s")["points"][0]
+    assert point["requests"] == 3
+    assert point["workers"] == 2
+
+
+def test_choose_tier():
+    """The finest tier retaining the start with few enough points is chosen."""
+    history = MetricsHistory("unused.db", default_tiers(24, 14, 365))
+    now = T0
+    assert history.choose_tier(now - 3600, now, now=now) == "10s"
+    assert history.choose_tier(now - 86400, now, now=now) == "1m"
+    assert history.choose_tier(now - 7 * 86400, now, now=now) == "1h"
+    assert history.choose_tier(now - 1000 * 86400, now, now=now) == "1h"
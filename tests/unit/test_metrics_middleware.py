@@ -0,0 +1,72 @@
+"""
+Unit tests for MetricsMiddleware.
+Tests route labelling, status classes, exclusions, and streaming passthrough.
+"""
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from dxf_generator.interface.middleware import MetricsMiddleware
+from dxf_generator.monitoring.request_metrics import RequestMetrics
+
+
+@pytest.fixture
+def metrics():
+    return RequestMetrics()
+
+
+@pytest.fixture
+def client(metrics):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/metrics")
+    async def scrape():
+        return {}
+
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return TestClient(app)
+
+
+def test_requests_grouped_by_route_template(client, metrics):
+    """Test path parameters collapse into the route template."""
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+
+    endpoint = metrics.endpoints()["GET /items/{item_id}"]
+
+    assert endpoint["count"] == 3
+    assert endpoint["status"] == {"2xx": 2, "4xx": 1}
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= endpoint.keys()
+    assert metrics.totals()["total_failures"] == 1
+
+
+def test_unmatched_and_excluded_paths(client, metrics):
+    """Test unknown paths share a label and /metrics is not counted."""
+    client.get("/nope")
+    client.get("/also-nope")
+    client.get("/metrics")
+
+    assert list(metrics.endpoints()) == ["GET <unmatched>"]
+    assert metrics.totals()["total_requests"] == 2
+
+
+def test_streaming_response_passthrough(client, metrics):
+    """Test streamed bodies arrive intact and are recorded once."""
+    resp = client.get("/stream")
+
+    assert resp.text == "chunk0\nchunk1\nchunk2\n"
+    assert metrics.endpoints()["GET /stream"]["count"] == 1
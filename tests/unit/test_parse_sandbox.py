@@ -0,0 +1,80 @@
+"""
+Unit tests for TieredParser and the isolated parse worker.
+Tests tier escalation, time budgets, and memory budgets.
+"""
+import time
+import pytest
+from dxf_generator.drawing.drawing import DXFDrawing
+from dxf_generator.exceptions.parsing import ParseLimitError, ParseTimeoutError
+from dxf_generator.services.dxf_scanner import DXFScanner
+from dxf_generator.services.parse_sandbox import TieredParser, run_isolated
+
+
+@pytest.fixture
+def column_file(tmp_path):
+    """A column DXF as produced by the generator."""
+    drawing = DXFDrawing()
+    drawing.draw_column({"width": 300, "height": 400})
+    path = tmp_path / "column.dxf"
+    drawing.save(str(path))
+    return path
+
+
+def test_run_isolated_returns_result():
+    """Test the worker result is returned to the caller."""
+    assert run_isolated(sum, ([1, 2, 3],), timeout=10, cpu_seconds=5, memory_bytes=0) == 6
+
+
+def test_run_isolated_reraises_worker_errors():
+    """Test exceptions raised in the worker propagate."""
+    with pytest.raises(ValueError):
+        run_isolated(int, ("not a number",), timeout=10, cpu_seconds=5, memory_bytes=0)
+
+
+def test_run_isolated_kills_on_timeout():
+    """Test a worker exceeding the wall-clock budget is killed."""
+    start = time.monotonic()
+    with pytest.raises(ParseTimeoutError) as exc:
+        run_isolated(time.sleep, (30,), timeout=0.5, cpu_seconds=5, memory_bytes=0)
+
+    assert time.monotonic() - start < 10
+    assert exc.value.status_code == 408
+
+
+def test_run_isolated_enforces_memory_budget():
+    """Test allocations beyond the memory budget fail with 422."""
+    with pytest.raises(ParseLimitError) as exc:
+        run_isolated(bytearray, (1024 ** 3,), timeout=10, cpu_seconds=5, memory_bytes=64 * 1024 * 1024)
+
+    assert exc.value.status_code == 422
+
+
+def test_tiered_parse_scanner_tier(column_file):
+    """Test a simple generated file is parsed."""
+    result = TieredParser.parse(str(column_file))
+
+    assert result == {"type": "column", "data": {"width": 300.0, "height": 400.0}}
+
+
+def test_tiered_parse_escalates_to_recover(column_file, tmp_path):
+    """Test files rejected by readfile are recovered."""
+    damaged = tmp_path / "damaged.dxf"
+    damaged.write_text(column_file.read_text().replace("SECTION", "section"))
+
+    result = TieredParser.parse(str(damaged))
+
+    assert result["type"] == "column"
+
+
+def test_tiered_parse_rejects_non_dxf(tmp_path):
+    """Test garbage input fails with ValueError after all tiers."""
+    path = tmp_path / "garbage.dxf"
+    path.write_text("hello world\n")
+
+    with pytest.raises(ValueError, match="Invalid or corrupt DXF"):
+        TieredParser.parse(str(path))
+
+
+def test_semantic_digest_in_worker(column_file):
+    """Test the isolated digest matches the in-process scanner."""
+    assert TieredParser.semantic_digest(str(column_file)) == DXFScanner.semantic_digest(str(column_file))
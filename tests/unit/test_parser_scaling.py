@@ -0,0 +1,49 @@
+"""
+Unit tests for the parser scaling benchmark.
+Tests exponent fitting, curve grouping and a measured parse in a child interpreter.
+"""
+import pytest
+
+from dxf_generator.benchmarks.dxf_corpus import build_corpus, corpus_specs
+from dxf_generator.benchmarks.parser_scaling import curves, run, scaling_exponent
+
+
+def test_scaling_exponent_recovers_power_law():
+    """The log-log slope of y = x^k is k."""
+    xs = [1e3, 1e4, 1e5, 1e6]
+    assert scaling_exponent(xs, [x for x in xs]) == pytest.approx(1.0)
+    assert scaling_exponent(xs, [x ** 2 for x in xs]) == pytest.approx(2.0)
+    assert scaling_exponent([1e3], [1.0]) is None
+    assert scaling_exponent(xs, [0, 0, 0, 0]) is None
+
+
+def test_curves_group_by_mode_depth_and_format():
+    """Well-formed results form one curve per mode, depth and format; malformed ones are left out."""
+    def result(mode, size, binary=False, malformed=None, outcome="column"):
+        return {"mode": mode, "bytes": size, "filler_entities": size // 100, "block_depth": 0,
+                "binary": binary, "malformed": malformed, "outcome": outcome,
+                "seconds": size / 1e6, "rss_mb": size / 1e5, "peak_rss_mb": 50.0}
+
+    results = [result("mmap", s) for s in (1e6, 1e4, 1e5)] + [
+        result("ezdxf", 1e4, binary=True), result("ezdxf", 1e5, binary=True, outcome="ValueError"),
+        result("mmap", 1e4, malformed="truncated"),
+    ]
+    by_key = {(c["mode"], c["format"]): c for c in curves(results)}
+    assert set(by_key) == {("mmap", "ascii"), ("ezdxf", "binary")}
+    mmap = by_key[("mmap", "ascii")]
+    assert [p["bytes"] for p in mmap["points"]] == [1e4, 1e5, 1e6]
+    assert mmap["time_exponent"] == pytest.approx(1.0)
+    assert by_key[("ezdxf", "binary")]["time_exponent"] is None
+
+
+def test_run_measures_corpus(tmp_path):
+    """Every file is parsed in a child interpreter; mmap skips binary files."""
+    build_corpus(str(tmp_path), corpus_specs([2048], block_depths=(1,), binary=True, malformed=False))
+    report = run(str(tmp_path), ["mmap", "ezdxf"])
+    modes = {(c["mode"], c["format"]) for c in report["curves"]}
+    assert modes == {("mmap", "ascii"), ("ezdxf", "ascii"), ("ezdxf", "binary")}
+    for curve in report["curves"]:
+        point = curve["points"][0]
+        assert point["outcome"] == "column"
+        assert point["seconds"] > 0
+        assert point["peak_rss_mb"] > 0
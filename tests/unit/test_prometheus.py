@@ -0,0 +1,134 @@
+"""
+Unit tests for the Prometheus exporter.
+Tests exposition format, cross-worker aggregation, and the shared snapshot directory.
+"""
+import subprocess
+import sys
+from dxf_generator.monitoring.prometheus import (
+    PrometheusExporter, SharedMetricsStore, collect_process_metrics, render
+)
+from dxf_generator.monitoring.request_metrics import RequestMetrics
+from dxf_generator.services.dxf_service import DXFService
+
+
+def _worker_snapshot(pid, requests=1, queue_depth=0, cache_bytes=100):
+    metrics = RequestMetrics()
+    for _ in range(requests):
+        metrics.record("GET /", 200, 3.0)
+    snapshot = collect_process_metrics(metrics, DXFService.get_cache_stats, DXFService.get_batch_stats)
+    snapshot["pid"] = pid
+    snapshot["batch"]["queue_depth"] = queue_depth
+    snapshot["caches"]["parse"]["bytes"] = cache_bytes
+    return snapshot
+
+
+def _sample(text, line_prefix):
+    """Return the value of the first sample line starting with line_prefix."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in exposition")
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_render_histogram_is_cumulative():
+    """Test buckets are cumulative and end with +Inf equal to the count."""
+    text = render([_worker_snapshot(1, requests=4)])
+
+    labels = 'route="GET /",status="2xx"'
+    assert _sample(text, f'dxf_http_request_duration_seconds_bucket{{{labels},le="0.002"}}') == 0
+    assert _sample(text, f'dxf_http_request_duration_seconds_bucket{{{labels},le="0.005"}}') == 4
+    assert _sample(text, f'dxf_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 4
+    assert _sample(text, f"dxf_http_request_duration_seconds_count{{{labels}}}") == 4
+    assert _sample(text, f"dxf_http_request_duration_seconds_sum{{{labels}}}") == 0.012
+    assert "# TYPE dxf_cache_evictions_total counter" in text
+
+
+def test_render_openmetrics_exemplars():
+    """Test OpenMetrics output links buckets to the latest exemplar across workers."""
+    older, newer = _worker_snapshot(1), _worker_snapshot(2)
+    older["exemplars"] = [{"route": "GET /", "status": "2xx", "bucket": 2, "labels": {"request_id": "old"},
+                           "value_ms": 3.0, "ts": 100.0}]
+    newer["exemplars"] = [{"route": "GET /", "status": "2xx", "bucket": 2, "labels": {"request_id": "new"},
+                           "value_ms": 4.0, "ts": 200.0}]
+
+    text = render([older, newer], openmetrics=True)
+
+    bucket = 'dxf_http_request_duration_seconds_bucket{route="GET /",status="2xx",le="0.005"} 2'
+    assert f'{bucket} # {{request_id="new"}} 0.004 200.000' in text.splitlines()
+    assert "# TYPE dxf_cache_evictions counter" in text
+    assert "dxf_cache_evictions_total{" in text
+    assert text.endswith("# EOF\n")
+    assert " # {" not in render([older, newer])
+
+
+def test_render_batch_admission_metrics():
+    """Test rejected tasks sum over workers and queue wait is the slowest live worker's."""
+    first, second = _worker_snapshot(1), _worker_snapshot(2)
+    first["batch"].update(rejected=3, queue_wait_ms=250.0, max_queue=100)
+    second["batch"].update(rejected=4, queue_wait_ms=40.0, max_queue=100)
+
+    text = render([first, second])
+
+    assert _sample(text, "dxf_batch_tasks_rejected_total") == 7
+    assert _sample(text, "dxf_batch_queue_wait_seconds") == 0.25
+    assert _sample(text, "dxf_batch_max_queue") == 200
+
+
+def test_render_lane_metrics():
+    """Test per-lane series are labelled by lane and summed over workers."""
+    first, second = _worker_snapshot(1), _worker_snapshot(2)
+    for snapshot, wait_ms in ((first, 5.0), (second, 120.0)):
+        snapshot["batch"]["lanes"] = {
+            "interactive": {"queue_depth": 0, "active": 1, "submitted": 10, "rejected": 0, "queue_wait_ms": 1.0},
+            "bulk": {"queue_depth": 4, "active": 1, "submitted": 40, "rejected": 2, "queue_wait_ms": wait_ms},
+        }
+
+    text = render([first, second])
+
+    assert _sample(text, 'dxf_batch_lane_active_tasks{lane="interactive"}') == 2
+    assert _sample(text, 'dxf_batch_lane_queue_depth{lane="bulk"}') == 8
+    assert _sample(text, 'dxf_batch_lane_tasks_submitted_total{lane="bulk"}') == 80
+    assert _sample(text, 'dxf_batch_lane_tasks_rejected_total{lane="bulk"}') == 4
+    assert _sample(text, 'dxf_batch_lane_queue_wait_seconds{lane="bulk"}') == 0.12
+
+
+def test_store_aggregates_workers(tmp_path):
+    """Test counters sum over all workers, gauges only over live ones."""
+    store = SharedMetricsStore(str(tmp_path))
+    store.write(_worker_snapshot(_dead_pid(), requests=2, queue_depth=5, cache_bytes=1000))
+    exporter = PrometheusExporter(
+        str(tmp_path), metrics=RequestMetrics(),
+        cache_stats=DXFService.get_cache_stats, batch_stats=DXFService.get_batch_stats
+    )
+    exporter.metrics.record("GET /", 200, 3.0)
+
+    text = exporter.scrape()
+
+    assert _sample(text, "dxf_worker_processes") == 1
+    assert _sample(text, 'dxf_http_requests_total{route="GET /",status="2xx"}') == 3
+    assert _sample(text, "dxf_batch_queue_depth") == 0
+    assert _sample(text, 'dxf_cache_bytes{cache="parse"}') == DXFService.get_cache_stats()["parse"]["bytes"]
+
+
+def test_prepare_removes_stale_snapshots(tmp_path):
+    """Test snapshots from a previous run are dropped at startup."""
+    SharedMetricsStore(str(tmp_path)).write(_worker_snapshot(1))
+    (tmp_path / "unrelated.txt").write_text("keep")
+
+    SharedMetricsStore.prepare(str(tmp_path))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["unrelated.txt"]
+
+
+def test_label_values_escaped():
+    """Test quotes and backslashes in labels are escaped."""
+    snapshot = _worker_snapshot(1)
+    snapshot["requests"][0]["route"] = 'GET /a"b\\c'
+
+    assert 'route="GET /a\\"b\\\\c"' in render([snapshot])
@@ -0,0 +1,71 @@
+"""
+Unit tests for SamplingProfiler.
+Tests stack sampling, collapsed output, and pstats-style summaries.
+"""
+import threading
+import time
+from dxf_generator.monitoring.sampling_profiler import SamplingProfiler
+
+
+def busy_loop(stop):
+    """Burn CPU until stopped."""
+    total = 0
+    while not stop.is_set():
+        total += sum(range(1000))
+    return total
+
+
+def _profile_busy_thread(seconds=0.3):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    time.sleep(seconds)
+    profiler.stop()
+    stop.set()
+    worker.join()
+    return profiler
+
+
+def test_collapsed_stacks_include_busy_function():
+    """Test folded stacks are rooted at the thread name and end in a count."""
+    profiler = _profile_busy_thread()
+
+    busy_lines = [line for line in profiler.collapsed().splitlines() if line.startswith("busy;")]
+
+    assert profiler.samples > 10
+    assert busy_lines
+    assert any("test_sampling_profiler:busy_loop" in line for line in busy_lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in busy_lines)
+
+
+def test_summary_ranks_cumulative_time():
+    """Test the busy function dominates cumulative samples of its thread."""
+    profiler = _profile_busy_thread()
+
+    busy = next(row for row in profiler.summary(limit=100) if row["function"].endswith(":busy_loop"))
+
+    assert busy["cum_pct"] > 50
+    assert busy["cum_samples"] >= busy["self_samples"]
+    assert "test_sampling_profiler.py" in busy["location"]
+
+
+def test_summary_package_filter():
+    """Test the package filter keeps only matching modules."""
+    profiler = _profile_busy_thread(seconds=0.1)
+
+    rows = profiler.summary(package="dxf_generator")
+    assert rows
+    assert all(row["function"].startswith("dxf_generator.") for row in rows)
+    assert "function (location)" in profiler.summary_text()
+
+
+def test_inactive_profiler_installs_nothing():
+    """Test constructing a profiler starts no thread and records nothing."""
+    before = threading.active_count()
+    profiler = SamplingProfiler()
+
+    assert threading.active_count() == before
+    assert profiler.samples == 0
+    assert profiler.collapsed() == ""
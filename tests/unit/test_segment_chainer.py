@@ -0,0 +1,132 @@
+"""
+Unit tests for SegmentChainer and segment-based parsing.
+Tests endpoint matching, loop normalization, and LINE/POLYLINE profiles.
+"""
+import random
+import ezdxf
+import pytest
+from dxf_generator.services.segment_chainer import SegmentChainer
+from dxf_generator.services.dxf_parser import DXFParser
+
+
+def rectangle_segments(x, y, w, h):
+    """Segments of an axis-aligned rectangle."""
+    corners = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+    return list(zip(corners, corners[1:] + corners[:1]))
+
+
+def test_chain_shuffled_rectangle():
+    """Test segments in random order and direction form one loop."""
+    segments = rectangle_segments(10, 20, 300, 400)
+    segments = [(b, a) if i % 2 else (a, b) for i, (a, b) in enumerate(segments)]
+    random.Random(1).shuffle(segments)
+
+    loops = SegmentChainer().chain(segments)
+
+    assert loops == [[(0, 0), (300, 0), (300, 400), (0, 400)]]
+
+
+def test_chain_matches_endpoints_within_tolerance():
+    """Test endpoints closer than the tolerance are joined."""
+    segments = [
+        ((0, 0), (100, 0)),
+        ((100.004, 0.003), (100, 50)),
+        ((100, 50), (0, 50)),
+        ((0, 50), (0.002, -0.004)),
+    ]
+
+    loops = SegmentChainer(tolerance=0.01).chain(segments)
+
+    assert len(loops) == 1
+    assert len(loops[0]) == 4
+
+
+def test_chain_skips_open_chains():
+    """Test open polylines do not produce loops."""
+    segments = [((0, 0), (10, 0)), ((10, 0), (10, 10))]
+    assert SegmentChainer().chain(segments) == []
+
+
+def test_chain_many_loops():
+    """Test many disjoint loops are all recovered."""
+    segments = []
+    for i in range(200):
+        segments.extend(rectangle_segments(i * 1000, 0, 300, 400))
+    random.Random(7).shuffle(segments)
+
+    loops = SegmentChainer().chain(segments)
+
+    assert len(loops) == 200
+
+
+def test_normalize_loop_drops_collinear_and_reorients():
+    """Test split edges are merged and clockwise loops are reversed."""
+    clockwise = [(5, 5), (5, 105), (55, 105), (105, 105), (105, 5)]
+
+    assert SegmentChainer.normalize_loop(clockwise) == [
+        (0, 0), (100, 0), (100, 100), (0, 100)
+    ]
+
+
+def test_collinear_loop_is_skipped():
+    """Test a closed chain with no area yields no loop instead of failing."""
+    flat = [((0, 0), (50, 0)), ((50, 0), (100, 0)), ((100, 0), (0, 0))]
+
+    assert SegmentChainer.normalize_loop([(0, 0), (50, 0), (100, 0)]) == []
+    assert SegmentChainer().chain(flat + rectangle_segments(0, 10, 30, 40)) == [
+        [(0, 0), (30, 0), (30, 40), (0, 40)]
+    ]
+
+
+def test_parse_ibeam_drawn_with_lines(tmp_path):
+    """Test an I-Beam drawn as loose LINEs is identified."""
+    b, tf, tw, h = 100, 10, 8, 200
+    points = [
+        (0, 0), (b, 0), (b, tf), ((b + tw) / 2, tf), ((b + tw) / 2, h - tf),
+        (b, h - tf), (b, h), (0, h), (0, h - tf), ((b - tw) / 2, h - tf),
+        ((b - tw) / 2, tf), (0, tf)
+    ]
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    edges = list(zip(points, points[1:] + points[:1]))
+    random.Random(3).shuffle(edges)
+    for start, end in edges:
+        msp.add_line((start[0] + 500, start[1] + 500), (end[0] + 500, end[1] + 500))
+    path = tmp_path / "lines.dxf"
+    doc.saveas(path)
+
+    result = DXFParser.parse(str(path))
+
+    assert result["type"] == "ibeam"
+    assert result["data"] == {
+        "total_depth": 200.0,
+        "flange_width": 100.0,
+        "web_thickness": 8.0,
+        "flange_thickness": 10.0
+    }
+
+
+def test_parse_column_drawn_as_polyline(tmp_path):
+    """Test an old-style closed POLYLINE is identified."""
+    doc = ezdxf.new()
+    doc.modelspace().add_polyline2d(
+        [(0, 0), (250, 0), (250, 350), (0, 350)], close=True
+    )
+    path = tmp_path / "polyline.dxf"
+    doc.saveas(path)
+
+    result = DXFParser.parse(str(path))
+
+    assert result["type"] == "column"
+    assert result["data"] == {"width": 250.0, "height": 350.0}
+
+
+def test_parse_unclosed_lines_raises(tmp_path):
+    """Test segments without a supported closed loop raise ValueError."""
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (10, 0))
+    path = tmp_path / "open.dxf"
+    doc.saveas(path)
+
+    with pytest.raises(ValueError, match="No supported profile"):
+        DXFParser.parse(str(path))
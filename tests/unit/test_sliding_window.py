@@ -0,0 +1,57 @@
+"""
+Unit tests for SlidingWindowStats.
+Tests per-window throughput, error rate, percentiles, and slot expiry.
+"""
+import pytest
+from dxf_generator.monitoring.sliding_window import SlidingWindowStats
+
+
+@pytest.fixture
+def stats():
+    return SlidingWindowStats(windows={"1m": 60, "5m": 300})
+
+
+def test_rps_and_error_rate(stats):
+    """Test a steady minute of traffic yields its rate and error share."""
+    t0 = int(stats.start_time) + 600
+    for second in range(60):
+        for i in range(10):
+            stats.record(5.0, failed=(i == 0), now=t0 + second)
+
+    window = stats.window(60, now=t0 + 59.5)
+
+    assert window["requests"] == 600
+    assert window["rps"] == 10.0
+    assert window["error_rate"] == 0.1
+
+
+def test_old_traffic_leaves_short_window(stats):
+    """Test requests older than the window are excluded but kept in longer ones."""
+    t0 = int(stats.start_time) + 600
+    stats.record(400.0, failed=False, now=t0)
+    stats.record(3.0, failed=False, now=t0 + 120)
+
+    summary = stats.summary(now=t0 + 120)
+
+    assert summary["1m"]["requests"] == 1
+    assert summary["1m"]["p99_ms"] <= 5.0
+    assert summary["5m"]["requests"] == 2
+    assert summary["5m"]["p99_ms"] > 200.0
+
+
+def test_ring_slots_reused(stats):
+    """Test a slot reused after wrapping forgets its previous second."""
+    t0 = int(stats.start_time) + 600
+    stats.record(1.0, failed=True, now=t0)
+    stats.record(1.0, failed=False, now=t0 + 300)  # Same ring position
+
+    assert stats.window(300, now=t0 + 300)["requests"] == 1
+    assert stats.window(300, now=t0 + 300)["error_rate"] == 0.0
+
+
+def test_young_process_rate_uses_uptime(stats):
+    """Test RPS is not diluted by the part of the window before startup."""
+    for i in range(20):
+        stats.record(1.0, failed=False, now=stats.start_time + 1 + i * 0.1)
+
+    assert stats.window(300, now=stats.start_time + 4)["rps"] == 5.0
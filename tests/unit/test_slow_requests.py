@@ -0,0 +1,88 @@
+"""
+Unit tests for slow request capture.
+Tests the bounded recorder, SlowRequestMiddleware entries and histogram exemplars.
+"""
+import time
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from dxf_generator.interface.middleware import SlowRequestMiddleware
+from dxf_generator.monitoring.request_metrics import RequestMetrics
+from dxf_generator.monitoring.slow_requests import SlowRequestRecorder
+from dxf_generator.monitoring.stage_timer import stage
+
+
+def test_recorder_keeps_most_recent():
+    """The buffer is bounded and lists the newest requests first."""
+    recorder = SlowRequestRecorder(threshold_ms=100, capacity=2)
+    for i in range(3):
+        recorder.record({"request_id": str(i), "route": "GET /" if i else "POST /x"})
+    assert [e["request_id"] for e in recorder.entries()] == ["2", "1"]
+    assert recorder.entries(route="POST /x") == []
+    assert recorder.get("1")["route"] == "GET /"
+    assert recorder.get("0") is None
+    assert recorder.recorded == 3
+    assert recorder.is_slow(100) and not recorder.is_slow(99.9)
+
+
+@pytest.fixture
+def metrics():
+    return RequestMetrics()
+
+
+@pytest.fixture
+def recorder():
+    return SlowRequestRecorder(threshold_ms=20)
+
+
+@pytest.fixture
+def client(metrics, recorder):
+    app = FastAPI()
+
+    @app.post("/items/{item_id}")
+    def create_item(item_id: int, spec: dict):
+        with stage("generate"):
+            time.sleep(spec.get("sleep", 0))
+        return Response(content=b"ok", headers={"X-Cache": "MISS"})
+
+    app.add_middleware(SlowRequestMiddleware, recorder=recorder, metrics=metrics)
+    return TestClient(app)
+
+
+def test_fast_requests_are_not_recorded(client, recorder, metrics):
+    """Requests under the threshold leave no entry or exemplar."""
+    client.post("/items/1", json={"sleep": 0})
+    assert recorder.entries() == []
+    assert metrics.exemplars() == []
+
+
+def test_slow_request_entry_and_exemplar(client, recorder, metrics):
+    """A slow request keeps its spec, stages, cache outcome and worker, and becomes an exemplar."""
+    client.post("/items/7", json={"sleep": 0.03, "b": [{"z": 1, "a": 2}], "a": 1})
+
+    [entry] = recorder.entries()
+    assert entry["route"] == "POST /items/{item_id}"
+    assert entry["status"] == 200
+    assert entry["cache"] == "MISS"
+    assert entry["duration_ms"] >= 20
+    assert entry["stages"]["generate"]["count"] == 1
+    assert entry["queue_wait_ms"] == 0.0
+    assert entry["worker"].isdigit()
+    assert list(entry["json"]) == ["a", "b", "sleep"]
+    assert list(entry["json"]["b"][0]) == ["a", "z"]
+
+    [exemplar] = metrics.exemplars()
+    assert exemplar["route"] == entry["route"] and exemplar["status"] == "2xx"
+    assert exemplar["labels"] == {"request_id": entry["request_id"], "worker": entry["worker"]}
+    assert metrics.latency.bounds[exemplar["bucket"] - 1] < exemplar["value_ms"] <= metrics.latency.bounds[exemplar["bucket"]]
+
+
+def test_slow_request_with_large_body_keeps_only_its_size(client, recorder):
+    """Bodies past the tap's cap are not kept; the entry records their size alone."""
+    client.post("/items/3", json={"sleep": 0.03, "pad": "x" * (32 * 1024)})
+
+    [entry] = recorder.entries()
+    assert entry["payload_bytes"] > 32 * 1024
+    assert "json" not in entry
@@ -0,0 +1,88 @@
+"""
+Unit tests for the soak test harness.
+Tests slope fitting, verdicts, orphan and cache-byte counting, process sampling
+and a short in-process run.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from dxf_generator.benchmarks.soak import (
+    cache_megabytes, count_orphans, evaluate, parse_duration, read_process, run_soak, slope_per_hour
+)
+
+
+def test_slope_per_hour():
+    """The least-squares slope is scaled to one hour and needs two distinct times."""
+    assert slope_per_hour([(0, 10), (60, 11), (120, 12)]) == pytest.approx(60.0)
+    assert slope_per_hour([(0, 5), (60, 3), (120, 5)]) == pytest.approx(0.0)
+    assert slope_per_hour([(0, 1)]) is None
+    assert slope_per_hour([(5, 1), (5, 2)]) is None
+
+
+def test_evaluate_skips_warmup_and_flags_growth():
+    """Growth during warm-up is ignored; growth afterwards over the limit fails."""
+    samples = [
+        {"t": t, "rss_mb": 100 + (min(t, 200) / 10) + (t / 3600 * 80 if t > 200 else 0), "fds": 12, "threads": None}
+        for t in range(0, 1001, 50)
+    ]
+    verdicts = {v["metric"]: v for v in evaluate(samples, {"rss_mb": 50, "fds": 1, "threads": 1}, warmup=0.3)}
+    assert not verdicts["rss_mb"]["passed"]
+    assert verdicts["rss_mb"]["slope_per_hour"] == pytest.approx(80, abs=1)
+    assert verdicts["fds"]["passed"] and verdicts["fds"]["slope_per_hour"] == 0
+    assert verdicts["threads"]["passed"] and verdicts["threads"]["slope_per_hour"] is None
+
+
+def test_count_orphans_uses_route_patterns_and_age(tmp_path):
+    """Only the routes' temp files older than the minimum age count."""
+    now = time.time()
+    old = (
+        "temp_1.dxf", "ibeams_batch_1.zip", "columns_batch_1.zip",
+        "ibeam_0a1b2c3d_1_300x150.dxf", "column_0a1b2c3d_2_400x300.dxf", "keep.dxf"
+    )
+    for name in old + ("temp_young.dxf",):
+        (tmp_path / name).write_text("x")
+    for name in old:
+        os.utime(tmp_path / name, (now - 120, now - 120))
+    assert count_orphans(str(tmp_path), min_age=60, now=now) == 5
+
+
+def test_cache_megabytes():
+    """Cache byte gauges are summed from a scrape."""
+    text = (
+        "# TYPE dxf_cache_bytes gauge\n"
+        'dxf_cache_bytes{cache="generation"} 1048576\n'
+        'dxf_cache_bytes{cache="parse"} 524288\n'
+        'dxf_cache_entries{cache="parse"} 3\n'
+    )
+    assert cache_megabytes(text) == 1.5
+
+
+def test_parse_duration():
+    """Durations accept plain seconds and s/m/h suffixes."""
+    assert parse_duration("90") == 90
+    assert parse_duration("15m") == 900
+    assert parse_duration("4h") == 14400
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+def test_read_process_own_pid():
+    """RSS, descriptors and threads are read for a live process."""
+    values = read_process([os.getpid()])
+    assert values["rss_mb"] > 0
+    assert values["fds"] > 0
+    assert values["threads"] >= 1
+
+
+def test_short_in_process_run():
+    """A short run samples every burst and reports a verdict per metric."""
+    cwd = os.getcwd()
+    report = asyncio.run(run_soak(duration=1.0, rate=20, sample_interval=0.5, orphan_age=0))
+    assert os.getcwd() == cwd
+    assert report["requests"] >= 10
+    assert report["error_rate"] == 0.0
+    assert len(report["samples"]) >= 3
+    assert report["samples"][-1]["cache_mb"] > 0
+    assert {v["metric"] for v in report["verdicts"]} == {"rss_mb", "fds", "threads", "temp_files", "cache_mb"}
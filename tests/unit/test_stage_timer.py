@@ -0,0 +1,71 @@
+"""
+Unit tests for stage timing.
+Tests accumulation, Server-Timing formatting, and propagation into executor threads.
+"""
+import contextvars
+import time
+from dxf_generator.monitoring import stage_timer
+from dxf_generator.monitoring.stage_timer import StageTimings, stage, start_request
+from dxf_generator.services.batch_processor import BatchProcessor
+
+
+def _in_fresh_context(func):
+    return contextvars.copy_context().run(func)
+
+
+def test_stage_is_noop_without_request():
+    """Test stages outside a timed request record nothing and still run."""
+    ran = []
+
+    def body():
+        with stage("validate"):
+            ran.append(True)
+        return stage_timer.current_timings()
+
+    assert _in_fresh_context(body) is None
+    assert ran == [True]
+
+
+def test_repeated_stages_accumulate():
+    """Test a stage timed several times reports its total and call count."""
+    def body():
+        timings = start_request()
+        for _ in range(3):
+            with stage("saveas"):
+                time.sleep(0.002)
+        return timings.as_dict()
+
+    saveas = _in_fresh_context(body)["saveas"]
+
+    assert saveas["count"] == 3
+    assert saveas["ms"] >= 6
+
+
+def test_header_format():
+    """Test the Server-Timing value lists stages, call counts and the total."""
+    timings = StageTimings()
+    timings.add("validate", 0.04)
+    timings.add("saveas", 1.0)
+    timings.add("saveas", 0.5)
+
+    assert timings.header(total_ms=9.8) == (
+        'validate;dur=0.04, saveas;dur=1.50;desc="x2", total;dur=9.80'
+    )
+
+
+def test_batch_tasks_report_into_request():
+    """Test BatchProcessor tasks add their stages to the submitting request."""
+    processor = BatchProcessor(max_workers=2)
+
+    def task():
+        with stage("saveas"):
+            pass
+
+    def body():
+        timings = start_request()
+        for _ in range(4):
+            processor.submit(task)
+        processor.shutdown(wait=True)
+        return timings.as_dict()
+
+    assert _in_fresh_context(body)["saveas"]["count"] == 4
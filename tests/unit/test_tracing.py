@@ -0,0 +1,105 @@
+"""
+Unit tests for request tracing.
+Tests span nesting, propagation into BatchProcessor tasks, span limits and Chrome trace export.
+"""
+import json
+import threading
+
+import pytest
+
+from dxf_generator.monitoring.stage_timer import stage
+from dxf_generator.monitoring.tracing import TraceRecorder, chrome_trace, current_trace, span, start_trace
+from dxf_generator.services.batch_processor import BatchProcessor
+
+
+def test_span_without_trace_is_noop():
+    """Spans outside a trace record nothing."""
+    assert current_trace() is None
+    with span("generate") as s:
+        assert s is None
+
+
+def test_spans_nest_under_active_span():
+    """Spans and stages nest under the span active when they open."""
+    with start_trace("t1", "POST /api/v1/ibeam") as trace:
+        with span("generate", component="IBeam"):
+            with stage("saveas"):
+                pass
+        with stage("zip"):
+            pass
+    names = {s.name: s for s in trace.spans}
+    assert names["generate"].parent_id == trace.root.span_id
+    assert names["saveas"].parent_id == names["generate"].span_id
+    assert names["zip"].parent_id == trace.root.span_id
+    assert names["generate"].attrs == {"component": "IBeam"}
+    assert all(s.end is not None for s in trace.spans)
+    assert current_trace() is None
+
+
+def test_span_records_error():
+    """An exception leaving a span is noted on it and re-raised."""
+    with start_trace("t1", "root") as trace:
+        with pytest.raises(ValueError):
+            with span("generate"):
+                raise ValueError("bad beam")
+    assert trace.spans[1].attrs["error"] == "ValueError: bad beam"
+
+
+def test_batch_tasks_join_the_submitting_trace():
+    """Executor tasks record their spans in the trace that submitted them."""
+    processor = BatchProcessor(max_workers=2)
+    done = threading.Semaphore(0)
+
+    def work():
+        with span("generate"):
+            pass
+
+    try:
+        with start_trace("t1", "POST /api/v1/ibeam/batch") as trace:
+            for _ in range(3):
+                processor.submit(work, on_success=done.release, on_error=lambda e: done.release())
+        for _ in range(3):
+            assert done.acquire(timeout=5)
+    finally:
+        processor.shutdown(wait=True)
+
+    tasks = [s for s in trace.spans if s.name == "batch.task"]
+    assert len(tasks) == 3
+    assert all(t.parent_id == trace.root.span_id and t.attrs["queued_ms"] >= 0 for t in tasks)
+    generates = [s for s in trace.spans if s.name == "generate"]
+    assert {g.parent_id for g in generates} == {t.span_id for t in tasks}
+    assert all(g.thread_id != trace.root.thread_id for g in generates)
+
+
+def test_span_limit_counts_dropped():
+    """Spans beyond max_spans are dropped and reported in the export."""
+    with start_trace("t1", "root", max_spans=3) as trace:
+        for _ in range(5):
+            with span("stage"):
+                pass
+    assert len(trace.spans) == 3
+    assert trace.dropped == 3
+    events = chrome_trace([trace])["traceEvents"]
+    assert any(e["name"] == "spans_dropped" and e["args"]["dropped"] == 3 for e in events)
+
+
+def test_chrome_trace_format(tmp_path):
+    """Export writes complete events with thread names, loadable as JSON."""
+    recorder = TraceRecorder(capacity=2)
+    for trace_id in ("a", "b", "c"):
+        with start_trace(trace_id, "GET /") as trace:
+            with span("validate"):
+                pass
+        recorder.add(trace)
+    assert [t.trace_id for t in recorder.traces()] == ["b", "c"]
+    assert [t.trace_id for t in recorder.traces(trace_id="c")] == ["c"]
+
+    path = tmp_path / "traces" / "trace.json"
+    assert recorder.export(str(path)) == 2
+    events = json.loads(path.read_text())["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == 4
+    root, child = complete[0], complete[1]
+    assert child["args"]["parent_id"] == root["args"]["span_id"]
+    assert root["ts"] <= child["ts"] and child["dur"] <= root["dur"]
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
@@ -0,0 +1,128 @@
+"""
+Unit tests for workload capture.
+Tests the ring-file recorder, the capture middleware, and merging worker files into a trace.
+"""
+import json
+import os
+from fastapi import FastAPI, File, Response, UploadFile
+from fastapi.testclient import TestClient
+from dxf_generator.benchmarks.load_generator import load_workload
+from dxf_generator.benchmarks.merge_captures import capture_files, merge
+from dxf_generator.interface.middleware import WorkloadCaptureMiddleware
+from dxf_generator.monitoring.workload_capture import CaptureRecorder, capture_paths, format_record
+
+
+def _raw(ts, path="/api/v1/ibeam", body=b'{"b":2,"a":1}', status=200, cache="MISS"):
+    return (ts, "POST", path, "application/json", body, len(body), False, status, cache, 4.2)
+
+
+def _read(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_recorder_writes_jsonl(tmp_path):
+    """Test queued records are written with canonical specs on stop."""
+    recorder = CaptureRecorder(str(tmp_path), max_bytes=1024 * 1024, worker="w1")
+    recorder.start()
+    recorder.record(_raw(100.0))
+    recorder.record(_raw(100.5, cache="HIT"))
+    recorder.stop()
+    
+    path = capture_paths(str(tmp_path), "w1")[0]
+    records = _read(path)
+    assert [r["cache"] for r in records] == ["MISS", "HIT"]
+    assert records[0]["json"] == {"a": 1, "b": 2}
+    assert records[0]["latency_ms"] == 4.2
+    assert '"json":{"a":1,"b":2}' in open(path).readline()
+    assert recorder.stats["recorded"] == 2
+
+
+def test_recorder_ring_is_size_capped(tmp_path):
+    """Test rotation keeps at most max_bytes and the newest records."""
+    recorder = CaptureRecorder(str(tmp_path), max_bytes=4000, worker="w1")
+    recorder.start()
+    for i in range(200):
+        recorder.record(_raw(float(i)))
+    recorder.stop()
+    
+    current, previous = capture_paths(str(tmp_path), "w1")
+    assert os.path.getsize(current) + os.path.getsize(previous) <= 4000
+    assert recorder.rotations > 0
+    assert _read(current)[-1]["ts"] == 199.0
+
+
+def test_recorder_drops_when_queue_full(tmp_path):
+    """Test record() never blocks: overflow is counted and dropped."""
+    recorder = CaptureRecorder(str(tmp_path), max_bytes=4000, queue_size=2, worker="w1")
+    for i in range(5):
+        recorder.record(_raw(float(i)))
+    assert recorder.dropped == 3
+
+
+def test_format_record_upload_keeps_filename_only():
+    """Test multipart uploads store filename and size, not content."""
+    body = b'--x\r\nContent-Disposition: form-data; name="file"; filename="part.dxf"\r\n\r\n0\nSECTION'
+    raw = (1.0, "POST", "/api/v1/parse", "multipart/form-data; boundary=x", body, 50_000, True, 200, None, 9.0)
+    record = format_record(raw, "w1")
+    assert record["upload"] == {"filename": "part.dxf", "bytes": 50_000}
+    assert "json" not in record
+
+
+def test_middleware_captures_generation_requests(tmp_path):
+    """Test only POSTs to generation/parse paths are captured, with status and X-Cache."""
+    recorder = CaptureRecorder(str(tmp_path), max_bytes=1024 * 1024, worker="w1")
+    app = FastAPI()
+
+    @app.post("/api/v1/ibeam")
+    async def ibeam(spec: dict):
+        return Response(b"dxf", headers={"X-Cache": "HIT"})
+
+    @app.post("/api/v1/parse")
+    async def parse(file: UploadFile = File(...)):
+        return {"name": file.filename}
+
+    @app.get("/")
+    async def root():
+        return {}
+
+    app.add_middleware(WorkloadCaptureMiddleware, recorder=recorder)
+    recorder.start()
+    with TestClient(app) as client:
+        client.post("/api/v1/ibeam", json={"total_depth": 300})
+        client.post("/api/v1/parse", files={"file": ("beam.dxf", b"0\nEOF\n" * 100, "application/dxf")})
+        client.get("/")
+    recorder.stop()
+    
+    records = _read(capture_paths(str(tmp_path), "w1")[0])
+    assert [r["path"] for r in records] == ["/api/v1/ibeam", "/api/v1/parse"]
+    assert records[0]["json"] == {"total_depth": 300}
+    assert records[0]["cache"] == "HIT" and records[0]["status"] == 200
+    assert records[1]["upload"]["filename"] == "beam.dxf"
+    assert records[1]["upload"]["bytes"] > 600
+
+
+def test_merge_workers_into_replayable_trace(tmp_path):
+    """Test worker files merge by timestamp into a trace the load generator reads."""
+    for worker, times in (("a", [10.0, 12.0]), ("b", [11.0])):
+        recorder = CaptureRecorder(str(tmp_path), max_bytes=1024 * 1024, worker=worker)
+        recorder.start()
+        for ts in times:
+            recorder.record(_raw(ts))
+        recorder.stop()
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    (uploads / "part.dxf").write_text("0\nEOF\n")
+    with open(capture_paths(str(tmp_path), "b")[0], "a") as f:
+        f.write(json.dumps({"ts": 13.0, "method": "POST", "path": "/api/v1/parse",
+                            "upload": {"filename": "part.dxf", "bytes": 6}}) + "\n")
+        f.write('{"ts": 14.0, "trunc')
+    
+    trace = merge(capture_files(str(tmp_path)), upload_dir=str(uploads))
+    assert [r["t"] for r in trace] == [0.0, 1.0, 2.0, 3.0]
+    assert [r["worker"] for r in trace[:3]] == ["a", "b", "a"]
+    assert trace[3]["file"].endswith("part.dxf")
+    
+    out = tmp_path / "trace.jsonl"
+    out.write_text("\n".join(json.dumps(r) for r in trace))
+    assert len(load_workload(str(out))) == 4